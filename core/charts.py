@@ -0,0 +1,60 @@
+# core/charts.py - RENDU DES FIGURES PLOTLY (PARTAGÉ PAR graphiques, timeseries ET maps)
+
+import hashlib
+import json
+import uuid
+
+import pandas as pd
+from django.core.cache import caches
+
+# Alias du cache des figures dans settings.CACHES
+FIGURE_CACHE = "figures"
+
+# Incrémenté quand le format du HTML rendu change (les entrées en cache deviennent obsolètes)
+RENDER_VERSION = 6
+
+
+def data_version(df):
+    """Empreinte du contenu d'un DataFrame (noms de colonnes, index et valeurs)"""
+    digest = hashlib.sha256(json.dumps([str(col) for col in df.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def figure_key(view, version, params=None):
+    """Clé de cache : vue, version des données et paramètres"""
+    params = json.dumps(params or {}, sort_keys=True, default=str)
+    return f"figure:{RENDER_VERSION}:{view}:{version}:{hashlib.sha256(params.encode()).hexdigest()[:16]}"
+
+
+def figure_html(fig):
+    """
+    Fragment HTML d'une figure : un conteneur et la spécification JSON, sans plotly.js
+    (chargé une seule fois par la page via la balise {% plotly_js %}).
+    """
+    div_id = f"chart-{uuid.uuid4().hex[:12]}"
+    # "</" échappé : la spécification ne peut pas fermer la balise <script>
+    spec = fig.to_json().replace("</", "<\\/")
+    return (
+        f'<div id="{div_id}" class="plotly-chart"></div>\n'
+        f'<script type="application/json" id="{div_id}-spec">{spec}</script>\n'
+        f'<script>(function () {{\n'
+        f'  var spec = JSON.parse(document.getElementById("{div_id}-spec").textContent);\n'
+        f'  Plotly.newPlot("{div_id}", spec.data, spec.layout, {{responsive: true}});\n'
+        f'}})();</script>'
+    )
+
+
+def render_figure(view, df, build, params=None, version=None):
+    """
+    HTML de la figure construite par build(df).
+    Si la même vue a déjà été rendue avec les mêmes données et paramètres,
+    le HTML est relu du cache : ni construction de la figure, ni sérialisation.
+    """
+    cache = caches[FIGURE_CACHE]
+    key = figure_key(view, version or data_version(df), params)
+    html = cache.get(key)
+    if html is None:
+        html = figure_html(build(df))
+        cache.set(key, html)
+    return html
@@ -0,0 +1,276 @@
+# core/figure_api.py - API JSON DES FIGURES (AGRÉGATION CÔTÉ SERVEUR)
+#
+# Chaque type de figure lit uniquement les colonnes nécessaires dans le cache
+# colonnaire, agrège côté serveur et renvoie une figure Plotly JSON compacte
+# (sans le thème, appliqué par plotly.js côté client).
+
+import hashlib
+
+import pandas as pd
+import plotly.graph_objects as go
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+from core import charts
+from datasets import store
+from utils import boxstats, dataset_store, density, hierarchy, histograms
+
+# Incrémenté quand le format des réponses change (invalide ETag et cache)
+API_VERSION = 4
+
+AGGREGATIONS = ("count", "sum", "mean", "median", "min", "max")
+
+# Pas de temps acceptés pour les séries temporelles (début de période)
+FREQUENCIES = {"D": "D", "W": "W-MON", "M": "MS", "Q": "QS", "Y": "YS"}
+
+DEFAULT_TOP = 50
+MAX_BINS = 1000
+MAX_GRID = 2000
+
+# Les réponses adressées par empreinte de dataset ne changent pas : cache partagé autorisé
+PUBLIC_MAX_AGE = 3600
+
+
+class FigureRequestError(ValueError):
+    """Paramètres invalides (réponse 400)"""
+
+
+def _columns_param(params, name, required=True):
+    columns = [col.strip() for col in params.get(name, "").split(",") if col.strip()]
+    if required and not columns:
+        raise FigureRequestError(f"Paramètre '{name}' obligatoire")
+    return columns
+
+
+def _choice(params, name, choices, default):
+    value = params.get(name, default)
+    if value not in choices:
+        raise FigureRequestError(f"'{name}' doit valoir l'une de : {', '.join(choices)}")
+    return value
+
+
+def _int_param(params, name, default, minimum=1, maximum=None):
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise FigureRequestError(f"'{name}' doit être un entier")
+    if value < minimum or (maximum is not None and value > maximum):
+        raise FigureRequestError(f"'{name}' hors limites")
+    return value
+
+
+def _numeric(series):
+    return pd.to_numeric(series, errors="coerce")
+
+
+def aggregate(df, by, y, agg):
+    """Agrégation groupée ; 'count' compte les lignes (ou les valeurs de y si fourni)"""
+    groups = df.groupby(by, observed=True, sort=False, dropna=True)
+    if agg == "count":
+        return groups[y].count() if y else groups.size()
+    if not y:
+        raise FigureRequestError(f"Paramètre 'y' obligatoire pour l'agrégation '{agg}'")
+    return _numeric(df[y]).groupby(df[by], observed=True, sort=False, dropna=True).agg(agg)
+
+
+def _grouped(df, params):
+    x = _columns_param(params, "x")[0]
+    y = params.get("y")
+    agg = _choice(params, "agg", AGGREGATIONS, "count" if not y else "sum")
+    return x, y, agg, aggregate(df, x, y, agg)
+
+
+def _bar(df, params):
+    x, y, agg, values = _grouped(df, params)
+    values = values.nlargest(_int_param(params, "top", DEFAULT_TOP))
+    fig = go.Figure(go.Bar(x=values.index.astype(str), y=values.to_numpy()))
+    fig.update_layout(xaxis_title=x, yaxis_title=f"{agg}({y})" if y else "count")
+    return fig
+
+
+def _pie(df, params):
+    _, _, _, values = _grouped(df, params)
+    values = values.nlargest(_int_param(params, "top", DEFAULT_TOP))
+    return go.Figure(go.Pie(labels=values.index.astype(str), values=values.to_numpy()))
+
+
+def _line(df, params):
+    x, y, agg, values = _grouped(df, params)
+    values = values.sort_index()
+    fig = go.Figure(go.Scatter(x=values.index, y=values.to_numpy(), mode="lines+markers"))
+    fig.update_layout(xaxis_title=x, yaxis_title=f"{agg}({y})" if y else "count")
+    return fig
+
+
+def _histogram(digest, params):
+    x = _columns_param(params, "x")[0]
+    bins = _int_param(params, "bins", histograms.DEFAULT_BINS, maximum=MAX_BINS)
+    try:
+        counts, edges = histograms.dataset_histogram(digest, x, bins, by=params.get("by"),
+                                                     weights=params.get("weights"))
+    except ValueError as e:
+        raise FigureRequestError(str(e))
+    return histograms.histogram_figure(counts, edges, xaxis_title=x,
+                                       yaxis_title=f"sum({params['weights']})" if params.get("weights") else "count")
+
+
+def _scatter(df, params):
+    x, y = _columns_param(params, "x")[0], _columns_param(params, "y")[0]
+    if not density.should_rasterize(len(df)):
+        fig = go.Figure(go.Scattergl(x=_numeric(df[x]).to_numpy(), y=_numeric(df[y]).to_numpy(), mode="markers"))
+        fig.update_layout(xaxis_title=x, yaxis_title=y)
+        return fig
+    grid, x_edges, y_edges = density.density_grid(
+        df[x], df[y],
+        width=_int_param(params, "width", density.GRID_WIDTH, maximum=MAX_GRID),
+        height=_int_param(params, "height", density.GRID_HEIGHT, maximum=MAX_GRID))
+    return density.density_figure(grid, x_edges, y_edges, xaxis_title=x, yaxis_title=y)
+
+
+def _box(df, params):
+    y = _columns_param(params, "y")[0]
+    by = params.get("by")
+    values = _numeric(df[y])
+    if not values.notna().any():
+        raise FigureRequestError(f"La colonne '{y}' n'est pas numérique")
+    stats, outliers = boxstats.box_summary(values, df[by] if by else None)
+    fig = go.Figure(boxstats.box_traces(stats, outliers, name=y))
+    fig.update_layout(xaxis_title=by, yaxis_title=y, showlegend=False)
+    return fig
+
+
+def _hierarchy(kind):
+    def build(df, params):
+        path = _columns_param(params, "path")
+        nodes = hierarchy.aggregate_nodes(df, path, params.get("values"), params.get("color"))
+        return hierarchy.hierarchy_figure(hierarchy.prune(nodes, _int_param(params, "top", DEFAULT_TOP)), kind)
+    return build
+
+
+def _hierarchy_columns(params):
+    return (_columns_param(params, "path") + _columns_param(params, "values", required=False)
+            + _columns_param(params, "color", required=False))
+
+
+def _heatmap(df, params):
+    corr = df.select_dtypes("number").corr()
+    return go.Figure(go.Heatmap(z=corr.to_numpy(), x=corr.columns.astype(str), y=corr.index.astype(str),
+                                zmin=-1, zmax=1, colorscale="RdBu_r"))
+
+
+def resample(df, params):
+    """Séries rééchantillonnées au pas demandé : un point par période et par colonne"""
+    date = _columns_param(params, "date")[0]
+    ys = _columns_param(params, "y")
+    rule = FREQUENCIES[_choice(params, "freq", tuple(FREQUENCIES), "D")]
+    agg = _choice(params, "agg", AGGREGATIONS, "sum")
+
+    dates = df[date] if pd.api.types.is_datetime64_any_dtype(df[date]) else pd.to_datetime(df[date], errors="coerce")
+    values = df[ys].apply(_numeric).set_index(dates)
+    values = values[values.index.notna()]
+    return values.resample(rule).agg(agg)
+
+
+def _timeseries(mode):
+    def build(df, params):
+        values = resample(df, params)
+        fig = go.Figure()
+        for col in values.columns:
+            trace = {"mode": "lines"}
+            if mode == "area":
+                trace["fill"] = "tozeroy"
+            elif mode == "stacked_area":
+                trace["stackgroup"] = "one"
+            fig.add_trace(go.Scatter(x=values.index, y=values[col].to_numpy(), name=str(col), **trace))
+        return fig
+    return build
+
+
+def _grouped_columns(params):
+    return _columns_param(params, "x") + _columns_param(params, "y", required=False)
+
+
+# Types de figures : paramètres pris en compte, colonnes à lire, construction
+# (à partir du DataFrame des colonnes lues, ou directement du dataset pour les lectures par tranches)
+CHART_KINDS = {
+    "bar": {"params": ("x", "y", "agg", "top"), "columns": _grouped_columns, "build": _bar},
+    "pie": {"params": ("x", "y", "agg", "top"), "columns": _grouped_columns, "build": _pie},
+    "line": {"params": ("x", "y", "agg"), "columns": _grouped_columns, "build": _line},
+    "histogram": {"params": ("x", "bins", "by", "weights"),
+                  "columns": lambda p: _columns_param(p, "x") + _columns_param(p, "by", required=False)
+                  + _columns_param(p, "weights", required=False),
+                  "build_dataset": _histogram},
+    "scatter": {"params": ("x", "y", "width", "height"),
+                "columns": lambda p: _columns_param(p, "x") + _columns_param(p, "y"), "build": _scatter},
+    "box": {"params": ("y", "by"),
+            "columns": lambda p: _columns_param(p, "y") + _columns_param(p, "by", required=False), "build": _box},
+    **{kind: {"params": ("path", "values", "color", "top"), "columns": _hierarchy_columns, "build": _hierarchy(kind)}
+       for kind in ("treemap", "sunburst")},
+    "heatmap": {"params": ("columns",), "columns": lambda p: _columns_param(p, "columns", required=False) or None,
+                "build": _heatmap},
+}
+
+TIMESERIES_KINDS = {
+    mode: {"params": ("date", "y", "freq", "agg"),
+           "columns": lambda p: _columns_param(p, "date") + _columns_param(p, "y"),
+           "build": _timeseries(mode)}
+    for mode in ("line", "area", "stacked_area")
+}
+
+
+def build_figure_json(digest, spec, params):
+    """Lit les colonnes utiles, construit la figure et la sérialise sans le thème"""
+    columns = spec["columns"](params)
+    if columns is not None:
+        missing = [col for col in columns if col not in dataset_store.dataset_columns(digest)]
+        if missing:
+            raise FigureRequestError(f"Colonnes inconnues : {', '.join(missing)}")
+        columns = list(dict.fromkeys(columns))
+
+    if "build_dataset" in spec:
+        fig = spec["build_dataset"](digest, params)
+    else:
+        fig = spec["build"](dataset_store.open_dataset(digest, columns), params)
+    fig.layout.template = None
+    return fig.to_json()
+
+
+def figure_response(request, app, kind, kinds):
+    """
+    Réponse JSON d'une figure, avec ETag :
+    un client qui renvoie If-None-Match reçoit 304 sans que les données soient relues.
+    """
+    spec = kinds.get(kind)
+    if spec is None:
+        return JsonResponse({"error": f"Type de figure inconnu : {kind}", "kinds": list(kinds)}, status=404)
+
+    digest = store.resolve_digest(request)
+    if digest is None:
+        return JsonResponse({"error": "Aucun dataset : importez un fichier ou passez ?dataset=<empreinte>"},
+                            status=404)
+
+    params = {name: request.GET[name] for name in spec["params"] if request.GET.get(name)}
+    key = charts.figure_key(f"api{API_VERSION}.{app}.{kind}", digest, params)
+    etag = f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        cache = caches[charts.FIGURE_CACHE]
+        body = cache.get(key)
+        if body is None:
+            try:
+                body = build_figure_json(digest, spec, params)
+            except FigureRequestError as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            cache.set(key, body)
+        response = HttpResponse(body, content_type="application/json")
+
+    response["ETag"] = etag
+    if "dataset" in request.GET:
+        patch_cache_control(response, public=True, max_age=PUBLIC_MAX_AGE)
+    else:
+        # Dataset de la session : la même URL dépend du cookie
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ("Cookie",))
+    return response
@@ -0,0 +1,16 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from plotly.offline import get_plotlyjs_version
+
+register = template.Library()
+
+
+@register.simple_tag
+def plotly_js():
+    """
+    Balise <script> vers plotly.js, servi comme fichier statique unique.
+    La version dans l'URL permet au navigateur de le garder en cache entre les pages.
+    """
+    return format_html('<script src="{}?v={}" charset="utf-8"></script>',
+                       static("plotly/plotly.min.js"), get_plotlyjs_version())
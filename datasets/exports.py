@@ -0,0 +1,208 @@
+# datasets/exports.py - EXPORTS EN FLUX DU DATASET DE LA SESSION
+
+import pandas as pd
+import xlsxwriter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from utils import column_stats, dataset_store
+
+# Lignes sérialisées à la fois : borne la mémoire de chaque export
+EXPORT_BATCH_ROWS = 10_000
+
+# Limite d'une feuille Excel (en-tête compris)
+EXCEL_MAX_ROWS = 1_048_576
+
+# PDF : un petit tableau par page, et un nombre de lignes plafonné
+PDF_ROWS_PER_PAGE = 35
+PDF_MAX_ROWS = 20_000
+PDF_CELL_CHARS = 30
+PDF_MARGIN = 30
+PDF_SUMMARY_ROWS = 15
+
+PDF_TABLE_STYLE = TableStyle([
+    ("BACKGROUND", (0,0), (-1,0), colors.grey),
+    ("TEXTCOLOR", (0,0), (-1,0), colors.whitesmoke),
+    ("ALIGN", (0,0), (-1,-1), "CENTER"),
+    ("GRID", (0,0), (-1,-1), 0.5, colors.black),
+    ("FONTSIZE", (0,0), (-1,-1), 8),
+])
+
+
+def iter_csv(digest, batch_rows=EXPORT_BATCH_ROWS):
+    """Génère le CSV tranche par tranche : le premier octet part avant la fin de la sérialisation"""
+    yield pd.DataFrame(columns=dataset_store.dataset_columns(digest)).to_csv(index=False)
+    for batch in dataset_store.iter_dataset_batches(digest, batch_rows):
+        yield batch.to_csv(index=False, header=False)
+
+
+def _excel_rows(batch):
+    """Lignes Python prêtes pour xlsxwriter (NaN / NaT → cellule vide)"""
+    batch = batch.astype(object).where(batch.notna(), None)
+    return batch.itertuples(index=False, name=None)
+
+
+def write_excel(digest, path, batch_rows=EXPORT_BATCH_ROWS):
+    """
+    Écrit le classeur en mode mémoire constante : chaque ligne est vidée sur disque
+    dès qu'elle est écrite. Au-delà de la limite d'Excel, une nouvelle feuille est ouverte.
+    """
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+        'remove_timezone': True,
+        'nan_inf_to_errors': True,
+    })
+    header_format = workbook.add_format({'bold': True, 'border': 1})
+    columns = dataset_store.dataset_columns(digest)
+    sheets = 0
+
+    def new_sheet():
+        nonlocal sheets
+        sheets += 1
+        worksheet = workbook.add_worksheet("Données" if sheets == 1 else f"Données ({sheets})")
+        worksheet.write_row(0, 0, columns, header_format)
+        return worksheet
+
+    try:
+        worksheet = new_sheet()
+        row = 1
+        for batch in dataset_store.iter_dataset_batches(digest, batch_rows):
+            for values in _excel_rows(batch):
+                if row == EXCEL_MAX_ROWS:
+                    worksheet = new_sheet()
+                    row = 1
+                worksheet.write_row(row, 0, values)
+                row += 1
+    finally:
+        workbook.close()
+    return path
+
+
+def _pdf_cell(value):
+    """Texte d'une cellule, tronqué pour garder des tableaux de largeur raisonnable"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    text = str(value)
+    return text if len(text) <= PDF_CELL_CHARS else text[:PDF_CELL_CHARS - 1] + "…"
+
+
+class _PdfPages:
+    """
+    Écrit le PDF page par page avec le canevas ReportLab : chaque page reçoit
+    son propre petit tableau, dessiné puis libéré (pas de tableau géant en mémoire).
+    """
+
+    def __init__(self, path, title):
+        self.pdf = canvas.Canvas(path, pagesize=landscape(A4), pageCompression=1)
+        self.width, self.height = landscape(A4)
+        self.title = title
+        self.page = 0
+        self.y = None
+
+    def _start_page(self):
+        self.page += 1
+        self.pdf.setFont("Helvetica-Bold", 11)
+        self.pdf.drawString(PDF_MARGIN, self.height - PDF_MARGIN, self.title)
+        self.pdf.setFont("Helvetica", 8)
+        self.pdf.drawRightString(self.width - PDF_MARGIN, PDF_MARGIN / 2, f"Page {self.page}")
+        self.y = self.height - PDF_MARGIN - 20
+
+    def end_page(self):
+        if self.y is not None:
+            self.pdf.showPage()
+            self.y = None
+
+    def text(self, line, bold=False):
+        if self.y is None or self.y < PDF_MARGIN + 20:
+            self.end_page()
+            self._start_page()
+        self.pdf.setFont("Helvetica-Bold" if bold else "Helvetica", 9)
+        self.pdf.drawString(PDF_MARGIN, self.y, line)
+        self.y -= 16
+
+    def table(self, rows):
+        """Dessine un tableau, réduit si besoin pour tenir dans la page"""
+        if self.y is None:
+            self._start_page()
+        table = Table(rows)
+        table.setStyle(PDF_TABLE_STYLE)
+        avail_width = self.width - 2 * PDF_MARGIN
+        avail_height = self.y - PDF_MARGIN
+        width, height = table.wrapOn(self.pdf, avail_width, avail_height)
+        scale = min(1.0, avail_width / width, avail_height / height)
+
+        self.pdf.saveState()
+        self.pdf.translate(PDF_MARGIN, self.y - height * scale)
+        self.pdf.scale(scale, scale)
+        table.drawOn(self.pdf, 0, 0)
+        self.pdf.restoreState()
+        self.y -= height * scale + 20
+
+    def save(self):
+        self.end_page()
+        self.pdf.save()
+
+
+def write_pdf(digest, path, rows_per_page=PDF_ROWS_PER_PAGE, max_rows=PDF_MAX_ROWS):
+    """
+    Export PDF du tableau complet : les lignes sont lues par tranches et découpées
+    en tableaux d'une page. Au-delà de `max_rows`, une note renvoie au mode résumé.
+    """
+    columns = [_pdf_cell(col) for col in dataset_store.dataset_columns(digest)]
+    total = dataset_store.dataset_num_rows(digest)
+    pages = _PdfPages(path, f"Export des données ({total} lignes × {len(columns)} colonnes)")
+
+    rows = []
+    written = 0
+    for batch in dataset_store.iter_dataset_batches(digest, rows_per_page * 20):
+        batch = batch.iloc[:max_rows - written]
+        for values in batch.itertuples(index=False, name=None):
+            rows.append([_pdf_cell(value) for value in values])
+            if len(rows) == rows_per_page:
+                pages.table([columns] + rows)
+                pages.end_page()
+                rows = []
+        written += len(batch)
+        if written >= max_rows:
+            break
+
+    if rows or written == 0:
+        pages.table([columns] + rows)
+    if total > written:
+        pages.text(f"{total - written} lignes supplémentaires non affichées : "
+                   "utilisez l'export PDF en mode résumé ou l'export CSV / Excel.", bold=True)
+    pages.save()
+    return path
+
+
+def _frame_rows(df):
+    return [[_pdf_cell(col) for col in df.columns]] + \
+           [[_pdf_cell(value) for value in values] for values in df.itertuples(index=False, name=None)]
+
+
+def write_pdf_summary(digest, path, rows=PDF_SUMMARY_ROWS):
+    """Export PDF résumé : dimensions, premières et dernières lignes, statistiques descriptives"""
+    summary = column_stats.dataset_summary(digest)
+    total = summary['rows']
+    pages = _PdfPages(path, f"Résumé des données ({total} lignes × {len(summary['columns'])} colonnes)")
+
+    pages.text(f"{rows} premières lignes", bold=True)
+    pages.table(_frame_rows(dataset_store.read_rows(digest, 0, rows)))
+    pages.end_page()
+
+    pages.text(f"{rows} dernières lignes", bold=True)
+    pages.table(_frame_rows(dataset_store.read_rows(digest, max(total - rows, 0), rows)))
+    pages.end_page()
+
+    stats = column_stats.describe_summary(summary).transpose().reset_index().rename(columns={"index": "colonne"})
+    stats = stats.map(lambda v: round(v, 4) if isinstance(v, float) else v)
+    pages.text("Statistiques descriptives", bold=True)
+    for start in range(0, len(stats), PDF_ROWS_PER_PAGE):
+        pages.table(_frame_rows(stats.iloc[start:start + PDF_ROWS_PER_PAGE]))
+        pages.end_page()
+
+    pages.save()
+    return path
@@ -0,0 +1,60 @@
+# datasets/store.py - DATASET DE LA SESSION, STOCKÉ CÔTÉ SERVEUR
+#
+# La session ne garde qu'une poignée (empreinte + nom du fichier) ;
+# les données sont dans le cache colonnaire de utils.dataset_store.
+
+import re
+
+import pandas as pd
+
+from utils import dataset_store
+
+SESSION_KEY = "dataset"
+
+# Empreinte SHA-256 (hexadécimal) transmise explicitement, par exemple ?dataset=...
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def save_upload(file, preview_rows=10):
+    """
+    Enregistre un fichier importé (CSV ou Excel) dans le cache, une seule fois par contenu.
+    Le CSV est écrit bloc par bloc, sans jamais être chargé en entier.
+    Retourne (empreinte, aperçu des `preview_rows` premières lignes).
+    """
+    digest = dataset_store.hash_upload(file)
+    if not dataset_store.has_dataset(digest):
+        if file.name.endswith(".csv"):
+            dataset_store.save_csv(file, digest)
+        else:
+            dataset_store.save_dataset(pd.read_excel(file), digest)
+    return digest, dataset_store.read_rows(digest, 0, preview_rows)
+
+
+def remember(request, digest, name):
+    """Associe le dataset à la session (quelques octets au lieu du JSON complet)"""
+    request.session[SESSION_KEY] = {"digest": digest, "name": name}
+
+
+def session_handle(request):
+    """Poignée du dataset de la session, ou None s'il n'existe pas (ou plus) dans le cache"""
+    handle = request.session.get(SESSION_KEY)
+    if not handle or not dataset_store.has_dataset(handle["digest"]):
+        return None
+    return handle
+
+
+def resolve_digest(request):
+    """Empreinte passée en paramètre (?dataset=...) ou, à défaut, celle de la session ; None si inconnue"""
+    digest = request.GET.get("dataset")
+    if digest:
+        return digest if DIGEST_PATTERN.fullmatch(digest) and dataset_store.has_dataset(digest) else None
+    handle = session_handle(request)
+    return handle["digest"] if handle else None
+
+
+def load_session_dataset(request, columns=None):
+    """DataFrame de la session relu par mappage mémoire, ou None"""
+    handle = session_handle(request)
+    if handle is None:
+        return None
+    return dataset_store.open_dataset(handle["digest"], columns)
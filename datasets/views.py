@@ -1,9 +1,9 @@
 from django.shortcuts import render
-from django.http import HttpResponse
-import pandas as pd
-import io
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-from reportlab.lib import colors
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+import os
+import tempfile
+
+from datasets import exports, store
 
 
 def index(request):
@@ -11,26 +11,22 @@ def index(request):
     Page principale du module Datasets :
     - Permet d'importer un fichier CSV/Excel
     - Affiche un aperçu des 10 premières lignes
-    - Sauvegarde les données en session pour export
+    - Enregistre les données côté serveur (seule une poignée est gardée en session)
     """
     context = {}
     if request.method == "POST" and request.FILES.get("file"):
         file = request.FILES["file"]
         try:
-            # Lecture du fichier selon son extension
-            if file.name.endswith(".csv"):
-                df = pd.read_csv(file)
-            elif file.name.endswith((".xls", ".xlsx")):
-                df = pd.read_excel(file)
-            else:
+            if not file.name.endswith((".csv", ".xls", ".xlsx")):
                 return HttpResponse("❌ Format non supporté. Utilisez CSV ou Excel.")
 
-            # Sauvegarde en session (JSON)
-            request.session["data"] = df.to_json()
+            # Lecture une seule fois par contenu, puis sauvegarde dans le cache colonnaire
+            digest, preview = store.save_upload(file)
+            store.remember(request, digest, file.name)
 
             # Aperçu des 10 premières lignes (convertis en listes pour éviter l'erreur)
-            context["columns"] = df.columns.tolist()
-            context["rows"] = df.head(10).values.tolist()
+            context["columns"] = preview.columns.tolist()
+            context["rows"] = preview.values.tolist()
 
         except Exception as e:
             return HttpResponse(f"⚠️ Erreur lors de la lecture du fichier : {e}")
@@ -38,71 +34,63 @@ def index(request):
     return render(request, "datasets/index.html", context)
 
 
+def _no_data():
+    return HttpResponse("❌ Aucune donnée à exporter. Importez d'abord un fichier.")
+
+
 def export_csv(request):
     """
-    Exporte les données importées en CSV
+    Exporte les données importées en CSV, en flux (transfert par morceaux)
     """
-    if "data" not in request.session:
-        return HttpResponse("❌ Aucune donnée à exporter. Importez d'abord un fichier.")
-
-    df = pd.read_json(request.session["data"])
-
-    buffer = io.StringIO()
-    df.to_csv(buffer, index=False)
+    handle = store.session_handle(request)
+    if handle is None:
+        return _no_data()
 
-    response = HttpResponse(buffer.getvalue(), content_type="text/csv")
+    response = StreamingHttpResponse(exports.iter_csv(handle["digest"]), content_type="text/csv")
     response['Content-Disposition'] = 'attachment; filename="export.csv"'
     return response
 
 
+def _temp_file_response(write, digest, filename, content_type):
+    """Écrit l'export dans un fichier temporaire puis l'envoie par morceaux"""
+    suffix = os.path.splitext(filename)[1]
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        path = tmp.name
+    try:
+        write(digest, path)
+        output = open(path, "rb")
+    finally:
+        # Le fichier ouvert reste lisible jusqu'à la fin de l'envoi
+        os.remove(path)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type=content_type)
+
+
 def export_excel(request):
     """
-    Exporte les données importées en Excel
+    Exporte les données importées en Excel (écriture en mémoire constante, envoi en flux)
     """
-    if "data" not in request.session:
-        return HttpResponse("❌ Aucune donnée à exporter. Importez d'abord un fichier.")
-
-    df = pd.read_json(request.session["data"])
-
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False, sheet_name="Données")
-
-    response = HttpResponse(
-        buffer.getvalue(),
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    handle = store.session_handle(request)
+    if handle is None:
+        return _no_data()
+
+    return _temp_file_response(
+        exports.write_excel,
+        handle["digest"],
+        "export.xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
-    response['Content-Disposition'] = 'attachment; filename="export.xlsx"'
-    return response
 
 
 def export_pdf(request):
     """
-    Exporte les données importées en PDF (tableau simple)
+    Exporte les données importées en PDF :
+    - par défaut, le tableau découpé en pages (nombre de lignes plafonné)
+    - avec ?mode=summary, un résumé (premières / dernières lignes et statistiques)
     """
-    if "data" not in request.session:
-        return HttpResponse("❌ Aucune donnée à exporter. Importez d'abord un fichier.")
-
-    df = pd.read_json(request.session["data"])
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer)
+    handle = store.session_handle(request)
+    if handle is None:
+        return _no_data()
 
-    # Construire le tableau (colonnes + données)
-    data = [df.columns.tolist()] + df.values.tolist()
-    table = Table(data)
-
-    # Style du tableau
-    table.setStyle(TableStyle([
-        ("BACKGROUND", (0,0), (-1,0), colors.grey),
-        ("TEXTCOLOR", (0,0), (-1,0), colors.whitesmoke),
-        ("ALIGN", (0,0), (-1,-1), "CENTER"),
-        ("GRID", (0,0), (-1,-1), 0.5, colors.black),
-        ("FONTSIZE", (0,0), (-1,-1), 8),
-    ]))
-
-    doc.build([table])
-
-    response = HttpResponse(buffer.getvalue(), content_type="application/pdf")
-    response['Content-Disposition'] = 'attachment; filename="export.pdf"'
-    return response
+    if request.GET.get("mode") == "summary":
+        return _temp_file_response(exports.write_pdf_summary, handle["digest"], "resume.pdf", "application/pdf")
+    return _temp_file_response(exports.write_pdf, handle["digest"], "export.pdf", "application/pdf")
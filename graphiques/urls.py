@@ -9,6 +9,7 @@ urlpatterns = [
     path("pie/", views.pie_view, name="pie"),  # ✅ nouveau
     path("line/", views.line_view, name="line"),
     path("heatmap/", views.heatmap_view, name="heatmap"),
+    path("api/<str:kind>/", views.api_figure, name="graphiques_api"),
 
 ]
 
@@ -1,7 +1,17 @@
 from django.shortcuts import render
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 
+from core import charts, figure_api
+from utils import boxstats, density, histograms
+
+
+def _histogram_figure(df):
+    # Classes calculées ici : seuls les effectifs sont envoyés au navigateur
+    counts, edges = histograms.histogram(df["magnitude"], bins=10)
+    return histograms.histogram_figure(counts, edges, title="Distribution des magnitudes", xaxis_title="magnitude")
+
 
 def histogram_view(request):
     data = {
@@ -10,19 +20,18 @@ def histogram_view(request):
     }
     df = pd.DataFrame(data)
 
-    fig = px.histogram(df, x="magnitude", nbins=10, title="Distribution des magnitudes")
-    graph_html = fig.to_html(full_html=False)
+    graph_html = charts.render_figure("graphiques.histogram", df, _histogram_figure)
     return render(request, "graphiques/histogram.html", {"graph": graph_html})
 
 
-def scatter_view(request):
-    data = {
-        "magnitude": [7.0, 6.9, 7.0, 7.3, 6.6, 7.0, 6.8, 6.7, 6.8, 7.6],
-        "depth": [14, 25, 579, 37, 624, 660, 630, 20, 20, 26]
-    }
-    df = pd.DataFrame(data)
+def _scatter_figure(df):
+    # Au-delà du seuil, grille de densité plutôt qu'un marqueur par point
+    if density.should_rasterize(len(df)):
+        grid, x_edges, y_edges = density.density_grid(df["depth"], df["magnitude"])
+        return density.density_figure(grid, x_edges, y_edges, title="Magnitude en fonction de la profondeur",
+                                      xaxis_title="Profondeur (km)", yaxis_title="Magnitude")
 
-    fig = px.scatter(
+    return px.scatter(
         df,
         x="depth",
         y="magnitude",
@@ -31,102 +40,126 @@ def scatter_view(request):
         color="magnitude",
         size="magnitude"
     )
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "graphiques/scatter.html", {"graph": graph_html})
 
 
-def boxplot_view(request):
+def scatter_view(request):
     data = {
         "magnitude": [7.0, 6.9, 7.0, 7.3, 6.6, 7.0, 6.8, 6.7, 6.8, 7.6],
         "depth": [14, 25, 579, 37, 624, 660, 630, 20, 20, 26]
     }
     df = pd.DataFrame(data)
 
-    fig = px.box(
-        df,
-        y="magnitude",
-        points="all",
-        title="Distribution des magnitudes (Boxplot)",
-        labels={"magnitude": "Magnitude"}
-    )
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "graphiques/boxplot.html", {"graph": graph_html})
+    graph_html = charts.render_figure("graphiques.scatter", df, _scatter_figure)
+    return render(request, "graphiques/scatter.html", {"graph": graph_html})
 
 
-def bar_view(request):
+def _boxplot_figure(df):
+    # Quartiles et moustaches calculés ici : seuls le résumé et un échantillon d'aberrants sont envoyés
+    stats, outliers = boxstats.box_summary(df["magnitude"])
+    fig = go.Figure(boxstats.box_traces(stats, outliers, name="Magnitude"))
+    fig.update_layout(title="Distribution des magnitudes (Boxplot)", yaxis_title="Magnitude", showlegend=False)
+    return fig
+
+
+def boxplot_view(request):
     data = {
-        "region": ["Nord", "Sud", "Est", "Ouest"],
-        "seismes": [12, 7, 5, 9]
+        "magnitude": [7.0, 6.9, 7.0, 7.3, 6.6, 7.0, 6.8, 6.7, 6.8, 7.6],
+        "depth": [14, 25, 579, 37, 624, 660, 630, 20, 20, 26]
     }
     df = pd.DataFrame(data)
 
-    fig = px.bar(
+    graph_html = charts.render_figure("graphiques.boxplot", df, _boxplot_figure)
+    return render(request, "graphiques/boxplot.html", {"graph": graph_html})
+
+
+def _bar_figure(df):
+    return px.bar(
         df,
         x="region",
         y="seismes",
         title="Nombre de séismes par région",
         color="region"
     )
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "graphiques/bar.html", {"graph": graph_html})
 
 
-def pie_view(request):
+def bar_view(request):
     data = {
         "region": ["Nord", "Sud", "Est", "Ouest"],
         "seismes": [12, 7, 5, 9]
     }
     df = pd.DataFrame(data)
 
-    fig = px.pie(
+    graph_html = charts.render_figure("graphiques.bar", df, _bar_figure)
+    return render(request, "graphiques/bar.html", {"graph": graph_html})
+
+
+def _pie_figure(df):
+    return px.pie(
         df,
         names="region",
         values="seismes",
         title="Répartition des séismes par région",
         hole=0.3  # si tu veux un donut chart, mets 0.3 ; sinon enlève
     )
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "graphiques/pie.html", {"graph": graph_html})
 
 
-def line_view(request):
+def pie_view(request):
     data = {
-        "annee": [2015, 2016, 2017, 2018, 2019, 2020],
-        "seismes": [5, 7, 6, 8, 4, 9]
+        "region": ["Nord", "Sud", "Est", "Ouest"],
+        "seismes": [12, 7, 5, 9]
     }
     df = pd.DataFrame(data)
 
-    fig = px.line(
+    graph_html = charts.render_figure("graphiques.pie", df, _pie_figure)
+    return render(request, "graphiques/pie.html", {"graph": graph_html})
+
+
+def _line_figure(df):
+    return px.line(
         df,
         x="annee",
         y="seismes",
         title="Évolution du nombre de séismes par année",
         markers=True
     )
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "graphiques/line.html", {"graph": graph_html})
 
 
-def heatmap_view(request):
-    # Exemple de dataset
-    df = pd.DataFrame({
-        "Magnitude": [7.0, 6.9, 7.0, 7.3, 6.6, 7.0, 6.8, 6.7, 6.8, 7.6],
-        "Profondeur": [14, 25, 579, 37, 624, 660, 630, 20, 20, 26],
-        "Victimes": [120, 80, 300, 50, 400, 200, 150, 90, 60, 500]
-    })
+def line_view(request):
+    data = {
+        "annee": [2015, 2016, 2017, 2018, 2019, 2020],
+        "seismes": [5, 7, 6, 8, 4, 9]
+    }
+    df = pd.DataFrame(data)
 
+    graph_html = charts.render_figure("graphiques.line", df, _line_figure)
+    return render(request, "graphiques/line.html", {"graph": graph_html})
+
+
+def _heatmap_figure(df):
     # Matrice de corrélation
     corr = df.corr()
 
     # Création de la heatmap
-    fig = px.imshow(
+    return px.imshow(
         corr,
         text_auto=True,
         color_continuous_scale="RdBu_r",
         title="Carte thermique des corrélations"
     )
 
-    graph_html = fig.to_html(full_html=False)
+
+def heatmap_view(request):
+    # Exemple de dataset
+    df = pd.DataFrame({
+        "Magnitude": [7.0, 6.9, 7.0, 7.3, 6.6, 7.0, 6.8, 6.7, 6.8, 7.6],
+        "Profondeur": [14, 25, 579, 37, 624, 660, 630, 20, 20, 26],
+        "Victimes": [120, 80, 300, 50, 400, 200, 150, 90, 60, 500]
+    })
+
+    graph_html = charts.render_figure("graphiques.heatmap", df, _heatmap_figure)
     return render(request, "graphiques/heatmap.html", {"graph": graph_html})
 
 
+def api_figure(request, kind):
+    """Figure JSON agrégée sur un dataset importé (types : core.figure_api.CHART_KINDS)"""
+    return figure_api.figure_response(request, "graphiques", kind, figure_api.CHART_KINDS)
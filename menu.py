@@ -1,10 +1,31 @@
 
 # menu.py
+import os
+
 import pandas as pd
 from modules.plots.time_series import plot_time_series, plot_time_series_multi
+from utils import batch, parallel
 
 def lancer_nettoyage():
-    print("Nettoyage: en attente de branchement au module cleaning.")
+    print("\n=== NETTOYAGE PAR LOTS ===")
+    input_dir = input("Dossier des CSV à nettoyer: ").strip()
+    if not os.path.isdir(input_dir):
+        print("Dossier introuvable.")
+        return
+
+    output_dir = input("Dossier de sortie [nettoyes]: ").strip() or "nettoyes"
+    workers = input(f"Nombre de processus [{parallel.default_workers()}]: ").strip()
+    try:
+        workers = int(workers) if workers else None
+    except ValueError:
+        print("Nombre de processus invalide.")
+        return
+
+    if not batch.list_csv_files(input_dir):
+        print("Aucun fichier CSV dans ce dossier.")
+        return
+
+    batch.run_batch(input_dir, output_dir, workers=workers)
 
 def menu_graphiques():
     print("\n=== MENU GRAPHIQUES ===")
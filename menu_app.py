@@ -4,7 +4,7 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import plotly.express as px
-from utils import cleaning
+from utils import cleaning_ui, dataset_store, parallel
 from modules.plots.time_series import plot_time_series, plot_time_series_multi
 
 # CSS POUR CACHER UNIQUEMENT LE LOGO GITHUB
@@ -43,13 +43,16 @@ if 'user' not in st.session_state:
 
 from utils.db import load_users
 
-@st.cache_data
-def load_csv(file):
-    """Charge un fichier CSV avec gestion d'encodage"""
-    try:
-        return pd.read_csv(file, encoding="latin1")
-    except Exception:
-        return pd.read_csv(file)
+def dataset_digest(file):
+    """Empreinte d'un fichier importé ; écrit dans le cache colonnaire bloc par bloc au premier import"""
+    digest = dataset_store.hash_upload(file)
+    if not dataset_store.has_dataset(digest):
+        dataset_store.save_csv(file, digest)
+    return digest
+
+def load_csv(file, columns=None):
+    """Relit un fichier CSV depuis le cache colonnaire (mappage mémoire, seulement `columns` si données)"""
+    return dataset_store.open_dataset(dataset_digest(file), columns)
 
 users = load_users()
 user_row = users[users['username'].str.lower() == st.session_state['user'].lower()]
@@ -324,17 +327,30 @@ def main():
                         )
                     else:
                         outlier_threshold = 1.5
+                    
+                    workers = st.number_input(
+                        "Processus parallèles :",
+                        min_value=1,
+                        max_value=parallel.default_workers(),
+                        value=1,
+                        help="Répartit le nettoyage des colonnes sur plusieurs cœurs"
+                    )
+                    compare_serial = workers > 1 and st.checkbox(
+                        "Mesurer le gain par rapport au séquentiel", value=False
+                    )
                 
                 if st.button("🚀 Lancer le Nettoyage Complet", type="primary"):
                     with st.spinner("Nettoyage en cours..."):
                         try:
-                            df_clean = cleaning.prepare_dataset(
+                            df_clean = cleaning_ui.prepare_dataset(
                                 df,
                                 missing_strategy=missing_strategy,
                                 remove_duplicates_flag=remove_duplicates,
                                 convert_types_flag=convert_types,
                                 remove_outliers_flag=remove_outliers,
-                                outlier_threshold=outlier_threshold
+                                outlier_threshold=outlier_threshold,
+                                workers=int(workers),
+                                compare_serial=compare_serial
                             )
                             
                             st.subheader("🎉 Résultats du Nettoyage")
@@ -487,9 +503,10 @@ def main():
             st.write("📊 Graphiques démographiques")
             fichier = st.file_uploader("Importer un dataset démographique", type=["csv"], key="demo")
             if fichier:
-                df = load_csv(fichier)
-                st.dataframe(df.head())
-                if "Age" in df.columns and "Gender" in df.columns:
+                digest = dataset_digest(fichier)
+                st.dataframe(dataset_store.read_rows(digest, 0, 5))
+                if {"Age", "Gender"} <= set(dataset_store.dataset_columns(digest)):
+                    df = dataset_store.open_dataset(digest, ["Age", "Gender"])
                     fig, ax = plt.subplots()
                     df[df["Gender"] == "Male"]["Age"].hist(alpha=0.5, label="Male", bins=20)
                     df[df["Gender"] == "Female"]["Age"].hist(alpha=0.5, label="Female", bins=20)
@@ -5,6 +5,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.express as px
 
+from utils import grouping
+
 def run(df):
     st.header("📊 Diagramme en Barres Groupées")
     
@@ -76,21 +78,16 @@ def run(df):
             if type_graphique == "Matplotlib":
                 fig, ax = plt.subplots(figsize=(10, 6))
                 
-                # Préparation des données pour matplotlib
-                categories = data_grouped[colonne_categorie].unique()
-                groups = data_grouped[colonne_grouping].unique()
+                # Préparation des données pour matplotlib : tableau groupes x catégories en une affectation
+                groups, categories, table = grouping.pivot_values(
+                    data_grouped[colonne_grouping], data_grouped[colonne_categorie], data_grouped[colonne_valeur])
                 
                 bar_width = 0.8 / len(groups)
                 x_pos = range(len(categories))
                 
                 colors = ['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7']
                 
-                for i, group in enumerate(groups):
-                    group_data = data_grouped[data_grouped[colonne_grouping] == group]
-                    values = [group_data[group_data[colonne_categorie] == cat][colonne_valeur].values[0] 
-                             if cat in group_data[colonne_categorie].values else 0 
-                             for cat in categories]
-                    
+                for i, (group, values) in enumerate(zip(groups, table)):
                     if orientation == "Vertical":
                         positions = [x + i * bar_width for x in x_pos]
                         ax.bar(positions, values, bar_width, label=group, color=colors[i % len(colors)])
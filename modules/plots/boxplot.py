@@ -4,13 +4,15 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
+from utils import boxstats
+
 def run(df):
     st.subheader("📦 Box Plot")
     
     st.info("Visualisez la distribution et les valeurs aberrantes")
 
     # Colonnes numériques
-    colonnes_numeriques = df.select_dtypes(include=["int64", "float64"]).columns
+    colonnes_numeriques = df.select_dtypes("number").columns
     if len(colonnes_numeriques) == 0:
         st.error("❌ Aucune colonne numérique trouvée.")
         return
@@ -24,21 +26,17 @@ def run(df):
     with col2:
         orientation = st.radio("Orientation :", ["Vertical", "Horizontal"])
     
-    # Tracer le boxplot
+    # Tracer le boxplot à partir du résumé précalculé (quartiles, moustaches, échantillon d'aberrants)
     fig, ax = plt.subplots(figsize=(10, 6))
     
     data = df[colonne].dropna()
+    stats, outliers = boxstats.box_summary(data)
     
-    if orientation == "Vertical":
-        box_plot = ax.boxplot(data, vert=True, patch_artist=True, 
-                             boxprops=dict(facecolor='lightblue', alpha=0.7),
-                             flierprops=dict(marker='o', markerfacecolor='red', markersize=5),
-                             medianprops=dict(color='black', linewidth=2))
-    else:
-        box_plot = ax.boxplot(data, vert=False, patch_artist=True,
-                             boxprops=dict(facecolor='lightblue', alpha=0.7),
-                             flierprops=dict(marker='o', markerfacecolor='red', markersize=5),
-                             medianprops=dict(color='black', linewidth=2))
+    if len(stats) > 0:
+        ax.bxp(boxstats.bxp_stats(stats, outliers, labels=False), vert=orientation == "Vertical", patch_artist=True,
+               boxprops=dict(facecolor='lightblue', alpha=0.7),
+               flierprops=dict(marker='o', markerfacecolor='red', markersize=5),
+               medianprops=dict(color='black', linewidth=2))
     
     ax.set_title(f"Box Plot de {colonne}", fontsize=14, fontweight='bold')
     
@@ -49,26 +47,27 @@ def run(df):
     
     ax.grid(True, alpha=0.3)
     
-    # Statistiques détaillées
-    if len(data) > 0:
-        Q1 = data.quantile(0.25)
-        Q3 = data.quantile(0.75)
-        IQR = Q3 - Q1
+    # Statistiques détaillées (issues du même résumé)
+    if len(stats) > 0:
+        summary = stats.iloc[0]
         
         st.subheader("📈 Statistiques détaillées")
         col_stat1, col_stat2, col_stat3 = st.columns(3)
         
         with col_stat1:
-            st.metric("Médiane", f"{data.median():.2f}")
-            st.metric("Moyenne", f"{data.mean():.2f}")
+            st.metric("Médiane", f"{summary['median']:.2f}")
+            st.metric("Moyenne", f"{summary['mean']:.2f}")
         
         with col_stat2:
-            st.metric("Q1 (25%)", f"{Q1:.2f}")
-            st.metric("Q3 (75%)", f"{Q3:.2f}")
+            st.metric("Q1 (25%)", f"{summary['q1']:.2f}")
+            st.metric("Q3 (75%)", f"{summary['q3']:.2f}")
         
         with col_stat3:
-            st.metric("IQR", f"{IQR:.2f}")
-            st.metric("Valeurs aberrantes", f"{(data < (Q1 - 1.5*IQR)) | (data > (Q3 + 1.5*IQR))}.sum()")
+            st.metric("IQR", f"{summary['q3'] - summary['q1']:.2f}")
+            st.metric("Valeurs aberrantes", f"{int(summary['outliers'])}")
+        
+        if summary['outliers'] > len(outliers.get(None, ())):
+            st.caption(f"⚡ {len(outliers[None]):,} valeurs aberrantes tracées sur {int(summary['outliers']):,}")
 
     plt.tight_layout()
     st.pyplot(fig)
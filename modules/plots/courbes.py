@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
+from utils import downsampling
+
 def run(df):
     st.subheader("📈 Courbes")
     
@@ -13,7 +15,7 @@ def run(df):
     date_candidates = [col for col in df.columns 
                 if 'date' in col.lower() or 'time' in col.lower() or 'jour' in col.lower()]
     
-    colonnes_numeriques = df.select_dtypes(include=["int64", "float64"]).columns
+    colonnes_numeriques = df.select_dtypes("number").columns
     
     if len(colonnes_numeriques) == 0:
         st.error("❌ Aucune colonne numérique trouvée.")
@@ -48,6 +50,10 @@ def run(df):
         line_width = st.slider("Épaisseur de ligne", 1.0, 5.0, 2.0)
         show_grid = st.checkbox("Afficher la grille", value=True)
         sort_data = st.checkbox("Trier par axe X", value=True)
+        reduction = st.selectbox("Réduction des points :", list(downsampling.LABELS),
+                                 format_func=downsampling.LABELS.get, key="line_reduction")
+        resolution = st.slider("Points affichés (max)", 500, 10000, downsampling.DEFAULT_POINTS, 500,
+                               key="line_resolution", disabled=reduction is None)
     
     # Préparation des données
     plot_data = df[[x_col, y_col]].dropna()
@@ -62,17 +68,24 @@ def run(df):
         except:
             pass
     
+    # Points tracés (abscisses triées uniquement, les statistiques restent sur toute la série)
+    shown = plot_data
+    if reduction:
+        shown = downsampling.downsample_frame(plot_data, x_col, y_col, resolution, reduction)
+        if len(shown) < len(plot_data):
+            st.caption(f"⚡ {len(shown):,} points tracés sur {len(plot_data):,} ({downsampling.LABELS[reduction]})")
+    
     # Création du graphique
     fig, ax = plt.subplots(figsize=(12, 6))
     
     # Tracer la courbe
     if marker_style != "none":
-        ax.plot(plot_data[x_col], plot_data[y_col], 
+        ax.plot(shown[x_col], shown[y_col], 
                 linestyle=line_style, marker=marker_style, 
                 color=color, linewidth=line_width, markersize=4,
                 markerfacecolor=color, markeredgecolor='white', markeredgewidth=0.5)
     else:
-        ax.plot(plot_data[x_col], plot_data[y_col], 
+        ax.plot(shown[x_col], shown[y_col], 
                 linestyle=line_style, color=color, linewidth=line_width)
     
     ax.set_xlabel(x_col, fontsize=12)
@@ -83,7 +96,7 @@ def run(df):
         ax.grid(True, alpha=0.3)
     
     # Rotation des labels X si trop longs
-    if plot_data[x_col].dtype == 'object' and any(len(str(x)) > 10 for x in plot_data[x_col]):
+    if shown[x_col].dtype == 'object' and any(len(str(x)) > 10 for x in shown[x_col]):
         plt.xticks(rotation=45, ha='right')
     
     plt.tight_layout()
@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
+from utils import histograms
+
 def run(df):
     st.subheader("📊 Histogramme")
     
@@ -11,7 +13,7 @@ def run(df):
     st.info("Visualisez la distribution d'une variable numérique")
     
     # Colonnes numériques
-    colonnes_numeriques = df.select_dtypes(include=["int64", "float64"]).columns
+    colonnes_numeriques = df.select_dtypes("number").columns
     if len(colonnes_numeriques) == 0:
         st.error("❌ Aucune colonne numérique trouvée dans le dataset.")
         return
@@ -37,9 +39,10 @@ def run(df):
     # Nettoyage des données
     data = df[colonne].dropna()
     
-    # Histogramme
-    n, bins, patches = ax.hist(data, bins=bins, color=color, alpha=0.7, 
-                              edgecolor='black', linewidth=0.5)
+    # Histogramme : classes calculées avec bincount, seules les barres sont tracées
+    counts, edges = histograms.histogram(data, bins=bins)
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color=color, alpha=0.7,
+           edgecolor='black', linewidth=0.5)
     
     ax.set_title(f"Histogramme de {colonne}", fontsize=14, fontweight='bold')
     ax.set_xlabel(colonne, fontsize=12)
@@ -5,6 +5,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
+from utils import age_pyramid
+
 def run(df):
     st.subheader("📐 Pyramide des Âges")
     
@@ -68,8 +70,8 @@ def run(df):
             st.write(f"**Colonne âge sélectionnée :** {age_col}")
             st.write(f"**Colonne genre sélectionnée :** {gender_col}")
             
-            # Aperçu des valeurs uniques pour le genre
-            unique_genders = df[gender_col].astype(str).unique()
+            # Aperçu des valeurs uniques pour le genre (conversion en texte des seules valeurs distinctes)
+            unique_genders = pd.Index(df[gender_col].unique()).astype(str).unique()
             st.write(f"**Valeurs de genre détectées :** {', '.join(unique_genders)}")
             
             # Options de mapping flexible
@@ -117,43 +119,29 @@ def run(df):
         st.warning("⚠️ Sélectionnez les colonnes âge et genre pour continuer")
 
 def create_age_pyramid(df, age_col, gender_col, gender_mapping, bin_size, max_age, color_male, color_female):
-    """Crée une pyramide des âges adaptative"""
-    
-    # Nettoyage et préparation
-    df_clean = df[[age_col, gender_col]].copy()
-    df_clean[age_col] = pd.to_numeric(df_clean[age_col], errors='coerce')
-    df_clean = df_clean.dropna()
-    df_clean = df_clean[df_clean[age_col] <= max_age]
+    """Crée une pyramide des âges adaptative (effectifs par bincount, en un passage par blocs)"""
     
-    # Application du mapping genre
-    df_clean['gender_mapped'] = df_clean[gender_col].astype(str).str.lower().map(gender_mapping)
-    df_clean = df_clean.dropna(subset=['gender_mapped'])
+    pyramid = age_pyramid.frame_pyramid(df, age_col, gender_col, gender_mapping, max_age)
     
-    if df_clean.empty:
+    if pyramid.total == 0:
         st.error("❌ Aucune donnée valide après le mapping des genres")
         return
     
-    # Création des groupes d'âge
-    df_clean['age_group'] = (df_clean[age_col] // bin_size) * bin_size
-    
-    # Agrégation
-    pyramid_data = df_clean.groupby(['age_group', 'gender_mapped']).size().unstack(fill_value=0)
+    # Tranches d'âge tirées du tableau des effectifs par année
+    age_groups, counts = pyramid.binned(bin_size)
+    male_counts, female_counts = counts
     
     # Création du graphique
     fig, ax = plt.subplots(figsize=(10, 8))
     
-    age_groups = pyramid_data.index
-    
     # Hommes (gauche)
-    if 'Homme' in pyramid_data.columns:
-        male_data = -pyramid_data['Homme']
-        ax.barh(age_groups, male_data, bin_size*0.8, 
+    if male_counts.any():
+        ax.barh(age_groups, -male_counts, bin_size*0.8, 
                 color=color_male, alpha=0.8, label='Hommes', edgecolor='white')
     
     # Femmes (droite)
-    if 'Femme' in pyramid_data.columns:
-        female_data = pyramid_data['Femme']
-        ax.barh(age_groups, female_data, bin_size*0.8,
+    if female_counts.any():
+        ax.barh(age_groups, female_counts, bin_size*0.8,
                 color=color_female, alpha=0.8, label='Femmes', edgecolor='white')
     
     # Personnalisation
@@ -162,7 +150,7 @@ def create_age_pyramid(df, age_col, gender_col, gender_mapping, bin_size, max_ag
     ax.set_title('Pyramide des Âges', fontsize=14, fontweight='bold')
     
     # Configuration des axes
-    x_max = max(pyramid_data.max().max() if not pyramid_data.empty else 10, 10)
+    x_max = max(int(counts.max()), 10)
     ax.set_xlim(-x_max, x_max)
     
     x_ticks = np.arange(-x_max, x_max + 1, x_max // 5)
@@ -178,15 +166,15 @@ def create_age_pyramid(df, age_col, gender_col, gender_mapping, bin_size, max_ag
     plt.close(fig)  # 🔥 FERME LA FIGURE POUR ÉVITER LES CONFLITS
     
     # Statistiques
-    show_pyramid_stats(df_clean, age_col)
+    show_pyramid_stats(pyramid)
 
-def show_pyramid_stats(df, age_col):
-    """Affiche les statistiques adaptatives"""
+def show_pyramid_stats(pyramid):
+    """Affiche les statistiques, tirées des effectifs de la pyramide"""
     st.subheader("📊 Statistiques démographiques")
     
-    total_pop = len(df)
-    male_count = (df['gender_mapped'] == 'Homme').sum()
-    female_count = (df['gender_mapped'] == 'Femme').sum()
+    total_pop = pyramid.total
+    male_count, female_count = pyramid.totals
+    avg_age_male, avg_age_female = pyramid.mean_ages()
     
     col1, col2, col3 = st.columns(3)
     
@@ -209,9 +197,7 @@ def show_pyramid_stats(df, age_col):
     
     # Âges moyens
     if male_count > 0:
-        avg_age_male = df[df['gender_mapped'] == 'Homme'][age_col].mean()
         st.write(f"**Âge moyen Hommes :** {avg_age_male:.1f} ans")
     
     if female_count > 0:
-        avg_age_female = df[df['gender_mapped'] == 'Femme'][age_col].mean()
-        st.write(f"**Âge moyen Femmes :** {avg_age_female:.1f} ans")
\ No newline at end of file
+        st.write(f"**Âge moyen Femmes :** {avg_age_female:.1f} ans")
@@ -3,13 +3,17 @@ import streamlit as st
 import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from matplotlib.colors import to_rgb
+from matplotlib.patches import Patch
+
+from utils import density, grouping
 
 def run(df):
     st.subheader("☁️ Nuage de points")
     
     st.info("Explorez la relation entre deux variables numériques")
 
-    colonnes_numeriques = df.select_dtypes(include=["int64", "float64"]).columns
+    colonnes_numeriques = df.select_dtypes("number").columns
     if len(colonnes_numeriques) < 2:
         st.error("❌ Il faut au moins deux colonnes numériques.")
         return
@@ -37,6 +41,8 @@ def run(df):
     
     with col5:
         color_by = st.selectbox("Colorer par :", ["Aucun"] + list(df.select_dtypes(include=['object']).columns))
+        seuil = st.number_input("Densité au-delà de (points) :", min_value=1000,
+                                value=density.RASTER_THRESHOLD, step=10000)
     
     # Préparation des données
     scatter_data = df[[x_col, y_col]].dropna()
@@ -46,14 +52,30 @@ def run(df):
     
     # Création du graphique
     fig, ax = plt.subplots(figsize=(10, 6))
+    colorer = color_by != "Aucun" and color_by in scatter_data.columns
     
-    if color_by != "Aucun" and color_by in scatter_data.columns:
-        # Scatter plot avec coloration catégorielle
-        categories = scatter_data[color_by].unique()
+    if density.should_rasterize(len(scatter_data), seuil):
+        # Trop de points : comptage sur une grille et affichage en image
+        st.caption(f"⚡ {len(scatter_data):,} points : affichage en densité "
+                   f"({density.GRID_WIDTH}×{density.GRID_HEIGHT} pixels)")
+        grid, x_edges, y_edges = density.density_grid(scatter_data[x_col], scatter_data[y_col],
+                                                      groups=scatter_data[color_by] if colorer else None)
+        if colorer:
+            categories, grids = grid
+            colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
+            image = density.category_image(grids, colors)
+            ax.legend(handles=[Patch(color=colors[i], label=str(category)) for i, category in enumerate(categories)],
+                      title=color_by)
+        else:
+            image = density.rgba_image(grid, to_rgb(color))
+        ax.imshow(image, extent=(x_edges[0], x_edges[-1], y_edges[0], y_edges[-1]),
+                  origin='lower', aspect='auto', interpolation='nearest')
+    elif colorer:
+        # Scatter plot avec coloration catégorielle (découpage par catégorie en un passage)
+        categories, groups = grouping.split_by(scatter_data[color_by], scatter_data[[x_col, y_col]])
         colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
         
-        for i, category in enumerate(categories):
-            category_data = scatter_data[scatter_data[color_by] == category]
+        for i, (category, category_data) in enumerate(zip(categories, groups)):
             ax.scatter(category_data[x_col], category_data[y_col], 
             c=[colors[i]], alpha=alpha, s=size, label=str(category))
         
@@ -67,7 +89,8 @@ def run(df):
     if show_regression and len(scatter_data) > 1:
         z = np.polyfit(scatter_data[x_col], scatter_data[y_col], 1)
         p = np.poly1d(z)
-        ax.plot(scatter_data[x_col], p(scatter_data[x_col]), "r--", alpha=0.8, linewidth=2)
+        x_line = np.array([scatter_data[x_col].min(), scatter_data[x_col].max()])
+        ax.plot(x_line, p(x_line), "r--", alpha=0.8, linewidth=2)
         
         # Calcul du coefficient de corrélation
         correlation = scatter_data[x_col].corr(scatter_data[y_col])
@@ -5,28 +5,55 @@ import matplotlib.pyplot as plt
 import plotly.graph_objects as go
 import numpy as np
 
+# Au-delà de ce nombre de points, les traces Plotly passent en WebGL
+WEBGL_THRESHOLD = 5000
+
+def stem_segments(positions, heights, baseline=0.0):
+    """
+    Toutes les tiges d'une série en un seul tracé : pour chaque point,
+    (position, base) -> (position, hauteur) puis une rupture (NaN).
+    """
+    heights = np.asarray(heights, dtype=float)
+    seg_positions = np.repeat(np.asarray(positions), 3)
+    seg_heights = np.column_stack([np.full(len(heights), baseline), heights,
+                                   np.full(len(heights), np.nan)]).ravel()
+    return seg_positions, seg_heights
+
+def _sorted_by(df, col):
+    """Données triées par la colonne si elle est numérique"""
+    if pd.api.types.is_numeric_dtype(df[col]):
+        return df.sort_values(col)
+    return df
+
+def _axis_values(axis, values):
+    """Valeurs converties en coordonnées de l'axe (catégories texte -> 0, 1, 2... comme ax.stem)"""
+    axis.update_units(values)
+    return np.asarray(axis.convert_units(values))
+
+def _draw_stems(ax, positions, heights, color, marker, markersize=6, linewidth=1.5,
+                alpha=0.7, marker_color=None, label=None, horizontal=False):
+    """Tiges (une seule ligne brisée) et marqueurs (une seule ligne sans trait) d'une série"""
+    heights = _axis_values(ax.xaxis if horizontal else ax.yaxis, heights)
+    seg_positions, seg_heights = stem_segments(positions, heights)
+    if horizontal:
+        ax.plot(seg_heights, seg_positions, color=color, linewidth=linewidth, alpha=alpha)
+        ax.plot(heights, positions, linestyle='none', marker=marker, markersize=markersize,
+                color=marker_color or color, label=label)
+    else:
+        ax.plot(seg_positions, seg_heights, color=color, linewidth=linewidth, alpha=alpha)
+        ax.plot(positions, heights, linestyle='none', marker=marker, markersize=markersize,
+                color=marker_color or color, label=label)
+
 def plot_stem_matplotlib(df, x_col, y_col, title="Parcelle de Tiges"):
     """Version Matplotlib - Stem Plot classique"""
     fig, ax = plt.subplots(figsize=(12, 6))
     
     # Trier les données par x_col si numérique
-    if pd.api.types.is_numeric_dtype(df[x_col]):
-        df_sorted = df.sort_values(x_col)
-    else:
-        df_sorted = df.copy()
+    df_sorted = _sorted_by(df, x_col)
     
     # Créer le stem plot
-    markerline, stemlines, baseline = ax.stem(
-        df_sorted[x_col], 
-        df_sorted[y_col],
-        linefmt='grey', 
-        markerfmt='D', 
-        basefmt=' '
-    )
-    
-    # Personnaliser l'apparence
-    plt.setp(markerline, markersize=6, color='red', markerfacecolor='red')
-    plt.setp(stemlines, linewidth=1.5, color='blue', alpha=0.7)
+    _draw_stems(ax, df_sorted[x_col].to_numpy(), df_sorted[y_col].to_numpy(),
+                color='blue', marker='D', marker_color='red')
     
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel(x_col)
@@ -41,30 +68,31 @@ def plot_stem_matplotlib(df, x_col, y_col, title="Parcelle de Tiges"):
     return fig
 
 def plot_stem_plotly(df, x_col, y_col, title="Parcelle de Tiges"):
-    """Version Plotly - Stem Plot interactif"""
+    """Version Plotly - Stem Plot interactif (deux traces, quel que soit le nombre de points)"""
     # Trier les données
-    if pd.api.types.is_numeric_dtype(df[x_col]):
-        df_sorted = df.sort_values(x_col)
-    else:
-        df_sorted = df.copy()
+    df_sorted = _sorted_by(df, x_col)
+    x_values = df_sorted[x_col].to_numpy()
+    y_values = df_sorted[y_col].to_numpy()
+    scatter = go.Scattergl if len(df_sorted) > WEBGL_THRESHOLD else go.Scatter
     
     fig = go.Figure()
     
-    # Ajouter les tiges
-    for i, (x_val, y_val) in enumerate(zip(df_sorted[x_col], df_sorted[y_col])):
-        fig.add_trace(go.Scatter(
-            x=[x_val, x_val],
-            y=[0, y_val],
-            mode='lines',
-            line=dict(color='blue', width=2),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
+    # Ajouter les tiges : une seule trace, segments séparés par des NaN
+    seg_x, seg_y = stem_segments(x_values, y_values)
+    fig.add_trace(scatter(
+        x=seg_x,
+        y=seg_y,
+        mode='lines',
+        line=dict(color='blue', width=2),
+        connectgaps=False,
+        showlegend=False,
+        hoverinfo='skip'
+    ))
     
     # Ajouter les marqueurs
-    fig.add_trace(go.Scatter(
-        x=df_sorted[x_col],
-        y=df_sorted[y_col],
+    fig.add_trace(scatter(
+        x=x_values,
+        y=y_values,
         mode='markers',
         marker=dict(color='red', size=8, symbol='diamond'),
         name=y_col,
@@ -86,30 +114,16 @@ def plot_stem_multiple(df, x_col, y_columns, title="Parcelle de Tiges Multiples"
     fig, ax = plt.subplots(figsize=(14, 8))
     
     # Trier les données
-    if pd.api.types.is_numeric_dtype(df[x_col]):
-        df_sorted = df.sort_values(x_col)
-    else:
-        df_sorted = df.copy()
+    df_sorted = _sorted_by(df, x_col)
+    x_values = df_sorted[x_col].to_numpy()
     
     colors = ['red', 'blue', 'green', 'orange', 'purple']
     markers = ['o', 's', 'D', '^', 'v']
     
     for i, y_col in enumerate(y_columns):
-        color = colors[i % len(colors)]
-        marker = markers[i % len(markers)]
-        
-        # Créer le stem plot pour chaque série
-        markerline, stemlines, baseline = ax.stem(
-            df_sorted[x_col], 
-            df_sorted[y_col],
-            linefmt=f'{color}-', 
-            markerfmt=marker, 
-            basefmt=' ',
-            label=y_col
-        )
-        
-        plt.setp(markerline, markersize=6, color=color, markerfacecolor=color)
-        plt.setp(stemlines, linewidth=1.2, color=color, alpha=0.7)
+        # Une ligne de tiges et une ligne de marqueurs par série
+        _draw_stems(ax, x_values, df_sorted[y_col].to_numpy(), color=colors[i % len(colors)],
+                    marker=markers[i % len(markers)], linewidth=1.2, label=y_col)
     
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel(x_col)
@@ -128,22 +142,9 @@ def plot_stem_vertical_horizontal(df, x_col, y_col, orientation="vertical", titl
     fig, ax = plt.subplots(figsize=(12, 6))
     
     if orientation == "vertical":
-        # Trier les données
-        if pd.api.types.is_numeric_dtype(df[x_col]):
-            df_sorted = df.sort_values(x_col)
-        else:
-            df_sorted = df.copy()
-        
-        markerline, stemlines, baseline = ax.stem(
-            df_sorted[x_col], 
-            df_sorted[y_col],
-            linefmt='grey', 
-            markerfmt='D', 
-            basefmt=' '
-        )
-        
-        plt.setp(markerline, markersize=6, color='red', markerfacecolor='red')
-        plt.setp(stemlines, linewidth=1.5, color='blue', alpha=0.7)
+        df_sorted = _sorted_by(df, x_col)
+        _draw_stems(ax, df_sorted[x_col].to_numpy(), df_sorted[y_col].to_numpy(),
+                    color='blue', marker='D', marker_color='red')
         
         ax.set_xlabel(x_col)
         ax.set_ylabel(y_col)
@@ -151,24 +152,10 @@ def plot_stem_vertical_horizontal(df, x_col, y_col, orientation="vertical", titl
         if not pd.api.types.is_numeric_dtype(df[x_col]):
             plt.xticks(rotation=45)
     
-    else:  # Horizontal
-        # Trier les données
-        if pd.api.types.is_numeric_dtype(df[y_col]):
-            df_sorted = df.sort_values(y_col)
-        else:
-            df_sorted = df.copy()
-        
-        markerline, stemlines, baseline = ax.stem(
-            df_sorted[y_col], 
-            df_sorted[x_col],
-            linefmt='grey', 
-            markerfmt='D', 
-            basefmt=' ',
-            orientation='horizontal'
-        )
-        
-        plt.setp(markerline, markersize=6, color='red', markerfacecolor='red')
-        plt.setp(stemlines, linewidth=1.5, color='blue', alpha=0.7)
+    else:  # Horizontal : tiges le long de l'axe X, positionnées selon y_col
+        df_sorted = _sorted_by(df, y_col)
+        _draw_stems(ax, df_sorted[y_col].to_numpy(), df_sorted[x_col].to_numpy(),
+                    color='blue', marker='D', marker_color='red', horizontal=True)
         
         ax.set_ylabel(x_col)
         ax.set_xlabel(y_col)
@@ -4,17 +4,20 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 import plotly.express as px
+import plotly.graph_objects as go
 import numpy as np
 
+from utils import grouping, kde, swarm
+
 def plot_strip_plot(df, x_col, y_col, title="Strip Plot", jitter=True):
     """Strip Plot - Points dispersés avec jitter"""
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    # Créer le strip plot manuellement avec jitter
-    categories = df[x_col].unique()
+    # Créer le strip plot manuellement avec jitter (découpage par catégorie en un passage)
+    categories, groups = grouping.split_by(df[x_col], df[y_col])
     
-    for i, category in enumerate(categories):
-        category_data = df[df[x_col] == category][y_col].dropna()
+    for i, (category, category_data) in enumerate(zip(categories, groups)):
+        category_data = category_data.dropna()
         
         if not category_data.empty:
             # Ajouter du jitter aléatoire sur l'axe X
@@ -33,37 +36,58 @@ def plot_strip_plot(df, x_col, y_col, title="Strip Plot", jitter=True):
     plt.tight_layout()
     return fig
 
-def plot_swarm_plot(df, x_col, y_col, title="Swarm Plot"):
-    """Swarm Plot - Points empilés sans chevauchement (version manuelle)"""
+# Taille approximative de la zone de tracé Plotly (pixels), pour le diamètre des marqueurs
+PLOTLY_PLOT_AREA = (900, 400)
+PLOTLY_MARKER_SIZE = 8
+
+def _marker_diameters(ax, size):
+    """Diamètre d'un marqueur scatter (taille s en points²) en unités de données (y, x)"""
+    diameter_px = np.sqrt(size) * ax.figure.dpi / 72
+    bbox = ax.get_window_extent()
+    (x_min, x_max), (y_min, y_max) = ax.get_xlim(), ax.get_ylim()
+    return diameter_px * (y_max - y_min) / bbox.height, diameter_px * (x_max - x_min) / bbox.width
+
+def _value_limits(groups):
+    """Bornes de l'axe des valeurs (marge de 5 %)"""
+    values = np.concatenate([group.to_numpy(dtype=float) for group in groups]) if groups else np.zeros(1)
+    low, high = (values.min(), values.max()) if values.size else (0.0, 1.0)
+    margin = (high - low) * 0.05 or 0.5
+    return low - margin, high + margin
+
+def plot_swarm_plot(df, x_col, y_col, title="Swarm Plot", size=40):
+    """Swarm Plot - Points empilés sans chevauchement (bande de densité pour les grosses catégories)"""
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    categories = df[x_col].unique()
-    
-    for i, category in enumerate(categories):
-        category_data = df[df[x_col] == category][y_col].dropna().sort_values()
-        
-        if not category_data.empty:
-            # Algorithme simple pour éviter les chevauchements
-            x_positions = []
-            for j, value in enumerate(category_data):
-                # Position de base
-                base_x = i
-                # Petit décalage pour éviter les chevauchements
-                offset = (j % 3 - 1) * 0.15
-                x_positions.append(base_x + offset)
-            
-            ax.scatter(x_positions, category_data, alpha=0.6, s=40, label=category)
+    categories, groups = grouping.split_by(df[x_col], df[y_col])
+    groups = [group.dropna() for group in groups]
     
+    # Axes fixés avant le placement : le diamètre des points en unités de données en dépend
     ax.set_xticks(range(len(categories)))
     ax.set_xticklabels(categories)
+    ax.set_xlim(-0.5, len(categories) - 0.5)
+    ax.set_ylim(*_value_limits(groups))
     ax.set_xlabel(x_col)
     ax.set_ylabel(y_col)
     ax.set_title(title, fontsize=14, fontweight='bold')
-    ax.grid(True, alpha=0.3)
-    ax.legend()
-    
     plt.xticks(rotation=45)
     plt.tight_layout()
+    diameter_y, diameter_x = _marker_diameters(ax, size)
+    
+    density_categories = []
+    for i, (category, category_data) in enumerate(zip(categories, groups)):
+        if category_data.empty:
+            continue
+        offsets, is_swarm = swarm.category_offsets(category_data.to_numpy(), diameter_y, diameter_x)
+        if not is_swarm:
+            density_categories.append(str(category))
+        ax.scatter(i + offsets, category_data, alpha=0.6, s=size, label=category,
+                   rasterized=len(category_data) > swarm.SWARM_BUDGET)
+    
+    if density_categories:
+        ax.text(0.01, 0.01, "Bande de densité (trop de points pour un essaim) : " + ", ".join(density_categories),
+                transform=ax.transAxes, fontsize=8, alpha=0.7)
+    ax.grid(True, alpha=0.3)
+    ax.legend()
     return fig
 
 def plot_strip_swarm_plotly(df, x_col, y_col, title="Strip/Swarm Plot", plot_type="strip"):
@@ -71,9 +95,24 @@ def plot_strip_swarm_plotly(df, x_col, y_col, title="Strip/Swarm Plot", plot_typ
     if plot_type == "strip":
         fig = px.strip(df, x=x_col, y=y_col, title=title, color=x_col)
     else:
-        # Pour swarm plot avec Plotly, on utilise strip avec ajustement
-        fig = px.strip(df, x=x_col, y=y_col, title=title, color=x_col)
-        fig.update_traces(jitter=0.3)  # Plus de jitter pour ressembler à swarm
+        # Essaim calculé côté Python : positions x = indice de la catégorie + décalage
+        categories, groups = grouping.split_by(df[x_col], df[y_col])
+        groups = [group.dropna() for group in groups]
+        low, high = _value_limits(groups)
+        diameter_y = (high - low) * PLOTLY_MARKER_SIZE / PLOTLY_PLOT_AREA[1]
+        diameter_x = max(len(categories), 1) * PLOTLY_MARKER_SIZE / PLOTLY_PLOT_AREA[0]
+        
+        fig = go.Figure()
+        for i, (category, category_data) in enumerate(zip(categories, groups)):
+            offsets, _ = swarm.category_offsets(category_data.to_numpy(), diameter_y, diameter_x)
+            scatter = go.Scattergl if len(category_data) > swarm.SWARM_BUDGET else go.Scatter
+            fig.add_trace(scatter(x=i + offsets, y=category_data.to_numpy(), mode='markers', name=str(category),
+                                  marker=dict(size=PLOTLY_MARKER_SIZE - 2, opacity=0.7),
+                                  hovertemplate=f'{category}<br>{y_col}: %{{y}}<extra></extra>'))
+        fig.update_layout(title=title)
+        fig.update_xaxes(tickmode='array', tickvals=list(range(len(categories))),
+                         ticktext=[str(category) for category in categories])
+        fig.update_yaxes(range=[low, high])
     
     fig.update_layout(
         xaxis_title=x_col,
@@ -98,20 +137,20 @@ def plot_violin_strip_combo(df, x_col, y_col, title="Violin + Strip Plot"):
     """Combinaison Violin Plot + Strip Plot"""
     fig, ax = plt.subplots(figsize=(12, 6))
     
-    # Violin plot
-    categories = df[x_col].unique()
-    data_by_category = [df[df[x_col] == cat][y_col].dropna() for cat in categories]
+    # Violin plot (densités précalculées par KDE binnée)
+    categories, groups = grouping.split_by(df[x_col], df[y_col])
+    data_by_category = [group.dropna() for group in groups]
     
-    parts = ax.violinplot(data_by_category, showmeans=False, showmedians=True)
+    curves = kde.violin_curves(df[y_col], df[x_col], column=y_col)
+    kde.draw_violins(ax, curves, colors=['#1f77b4'], positions=range(1, len(curves) + 1), alpha=0.3)
     
-    # Personnaliser les violons
-    for pc in parts['bodies']:
-        pc.set_facecolor('#1f77b4')
-        pc.set_alpha(0.3)
+    # Médianes
+    for i, category_data in enumerate(data_by_category):
+        if not category_data.empty:
+            ax.hlines(category_data.median(), i + 0.8, i + 1.2, color='#1f77b4', linewidth=1.5)
     
     # Strip plot superposé
-    for i, category in enumerate(categories):
-        category_data = df[df[x_col] == category][y_col].dropna()
+    for i, category_data in enumerate(data_by_category):
         if not category_data.empty:
             x_pos = np.random.normal(i+1, 0.1, len(category_data))
             ax.scatter(x_pos, category_data, alpha=0.6, s=30, color='red', edgecolors='black', linewidth=0.5)
@@ -245,12 +284,13 @@ def run(df):
                     else:
                         axes = axes.flatten()
                     
+                    # Découpage par catégorie une seule fois pour toutes les variables
+                    categories, groups = grouping.split_by(df_clean[x_column], df_clean[y_columns])
+                    
                     for i, y_col in enumerate(y_columns):
                         if i < len(axes):
-                            categories = df_clean[x_column].unique()
-                            
-                            for j, category in enumerate(categories):
-                                category_data = df_clean[df_clean[x_column] == category][y_col].dropna()
+                            for j, (category, group) in enumerate(zip(categories, groups)):
+                                category_data = group[y_col].dropna()
                                 if not category_data.empty:
                                     x_pos = np.random.normal(j, 0.1, len(category_data))
                                     axes[i].scatter(x_pos, category_data, alpha=0.6, s=30, label=category)
@@ -6,6 +6,8 @@ import matplotlib.pyplot as plt
 import numpy as np
 from scipy import signal
 
+from utils import downsampling
+
 def run_simple(df):
     """Interface Streamlit pour série temporelle simple"""
     st.subheader("⏱️ Série Temporelle Simple")
@@ -71,6 +73,9 @@ def run_simple(df):
             show_confidence = st.checkbox("Bandes de confiance", False, key="ts_confidence")
             if show_confidence:
                 confidence_level = st.slider("Niveau confiance (%)", 80, 99, 95, key="ts_conf_level")
+        
+        # Réduction des points tracés (les calculs portent toujours sur la série complète)
+        reduction, resolution = downsampling_options("ts")
     
     # Génération du graphique
     if st.button("📈 Générer la série temporelle", type="primary", key="ts_generate"):
@@ -93,6 +98,10 @@ def run_simple(df):
             
             dates = df_clean[date_col]
             values = df_clean[value_col]
+            keep = plotted_points(dates, values, reduction, resolution)
+            plot_dates, plot_values = dates.iloc[keep], values.iloc[keep]
+            if len(keep) < len(dates):
+                st.caption(f"⚡ {len(keep):,} points tracés sur {len(dates):,} ({downsampling.LABELS[reduction]})")
             
             # Lissage si demandé
             if smooth_data and len(df_clean) > window_size:
@@ -100,11 +109,11 @@ def run_simple(df):
                     y_smooth = signal.savgol_filter(values, 
                                                    window_length=min(window_size, len(df_clean)//2*2-1), 
                                                    polyorder=2)
-                    ax.plot(dates, y_smooth, linestyle=line_style, color=color, 
+                    ax.plot(plot_dates, y_smooth[keep], linestyle=line_style, color=color, 
                            linewidth=line_width, label=f"{value_col} (lissé)")
                     # Données originales en transparence
                     if marker_style != "none":
-                        ax.plot(dates, values, linestyle='', marker=marker_style, 
+                        ax.plot(plot_dates, plot_values, linestyle='', marker=marker_style, 
                                markersize=marker_size, color=color, alpha=0.3,
                                label=f"{value_col} (original)")
                 except:
@@ -114,11 +123,11 @@ def run_simple(df):
             if not smooth_data:
                 # Données normales
                 if marker_style != "none":
-                    ax.plot(dates, values, linestyle=line_style, marker=marker_style, 
+                    ax.plot(plot_dates, plot_values, linestyle=line_style, marker=marker_style, 
                            color=color, linewidth=line_width, markersize=marker_size, 
                            label=value_col)
                 else:
-                    ax.plot(dates, values, linestyle=line_style, color=color, 
+                    ax.plot(plot_dates, plot_values, linestyle=line_style, color=color, 
                            linewidth=line_width, label=value_col)
             
             # Ligne de tendance
@@ -126,8 +135,9 @@ def run_simple(df):
                 x_numeric = pd.to_numeric(dates)
                 z = np.polyfit(x_numeric, values, 1)
                 p = np.poly1d(z)
-                trend_line = p(x_numeric)
-                ax.plot(dates, trend_line, "r--", alpha=0.8, linewidth=2, label="Tendance linéaire")
+                # Droite : ses deux extrémités suffisent
+                ends = [0, len(dates) - 1]
+                ax.plot(dates.iloc[ends], p(x_numeric.iloc[ends]), "r--", alpha=0.8, linewidth=2, label="Tendance linéaire")
                 
                 # Calcul pente
                 slope = z[0] * (x_numeric.max() - x_numeric.min()) / (len(x_numeric) * 86400000000000)  # pente par jour
@@ -143,7 +153,7 @@ def run_simple(df):
                 upper_bound = mean + z_score * std
                 lower_bound = mean - z_score * std
                 
-                ax.fill_between(dates, lower_bound, upper_bound, alpha=0.2, color=color,
+                ax.fill_between(plot_dates, lower_bound, upper_bound, alpha=0.2, color=color,
                                label=f"Intervalle de confiance {confidence_level}%")
             
             ax.set_title(f"Série temporelle : {value_col}", fontsize=14, fontweight='bold')
@@ -221,6 +231,9 @@ def run_multiple(df):
                              key="ts_multi_type")
         show_correlation = st.checkbox("Matrice de corrélation", True, key="ts_multi_corr")
     
+    with st.expander("⚙️ Options avancées"):
+        reduction, resolution = downsampling_options("ts_multi")
+    
     # Génération du graphique
     if st.button("📊 Générer les séries multiples", type="primary", key="ts_multi_generate"):
         try:
@@ -242,19 +255,26 @@ def run_multiple(df):
             # Création du graphique
             fig, ax = plt.subplots(figsize=(14, 8))
             
-            dates = df_clean[date_col]
+            # Points tracés : union des points retenus pour chaque série
+            plot_data = df_clean
+            if reduction:
+                plot_data = downsampling.downsample_frame(df_clean, date_col, value_cols, resolution, reduction)
+                if len(plot_data) < len(df_clean):
+                    st.caption(f"⚡ {len(plot_data):,} points tracés sur {len(df_clean):,} ({downsampling.LABELS[reduction]})")
+            
+            dates = plot_data[date_col]
             colors = plt.cm.Set3(np.linspace(0, 1, len(value_cols)))
             
             if chart_type == "Aires empilées":
-                ax.stackplot(dates, [df_clean[col] for col in value_cols], 
+                ax.stackplot(dates, [plot_data[col] for col in value_cols], 
                            labels=value_cols, colors=colors, alpha=0.7)
             else:
                 for i, col in enumerate(value_cols):
                     if chart_type == "Lignes + Points":
-                        ax.plot(dates, df_clean[col], linestyle=line_style, marker='o',
+                        ax.plot(dates, plot_data[col], linestyle=line_style, marker='o',
                                color=colors[i], linewidth=2, markersize=4, label=col)
                     else:
-                        ax.plot(dates, df_clean[col], linestyle=line_style,
+                        ax.plot(dates, plot_data[col], linestyle=line_style,
                                color=colors[i], linewidth=2, label=col)
             
             title = f"Séries temporelles multiples"
@@ -304,6 +324,23 @@ def run_multiple(df):
         except Exception as e:
             st.error(f"❌ Erreur lors de la génération : {str(e)}")
 
+def downsampling_options(key):
+    """Choix de la réduction des points tracés et de la résolution visée"""
+    col_r1, col_r2 = st.columns(2)
+    with col_r1:
+        reduction = st.selectbox("Réduction des points :", list(downsampling.LABELS),
+                                 format_func=downsampling.LABELS.get, key=f"{key}_reduction")
+    with col_r2:
+        resolution = st.slider("Points affichés (max)", 500, 10000, downsampling.DEFAULT_POINTS, 500,
+                               key=f"{key}_resolution", disabled=reduction is None)
+    return reduction, resolution
+
+def plotted_points(x, y, reduction, resolution):
+    """Positions des points à tracer (toutes si aucune réduction)"""
+    if reduction is None:
+        return np.arange(len(y))
+    return downsampling.downsample_indices(x, y, resolution, reduction)
+
 def display_time_series_stats(df, date_col, value_col):
     """Affiche les statistiques détaillées d'une série temporelle"""
     st.subheader("📊 Analyse Statistique")
@@ -373,12 +410,14 @@ def display_multi_series_stats(df, date_col, value_cols):
     st.dataframe(stats_df, use_container_width=True)
 
 # Fonctions originales conservées pour compatibilité
-def plot_time_series(df, x_col, y_col, title="Série temporelle", xlabel=None, ylabel=None):
+def plot_time_series(df, x_col, y_col, title="Série temporelle", xlabel=None, ylabel=None,
+                     max_points=downsampling.DEFAULT_POINTS, method="minmax"):
     """
     Trace une série temporelle simple.
     - df : DataFrame Pandas
     - x_col : colonne pour l'axe des X (dates ou périodes)
     - y_col : colonne pour l'axe des Y (valeurs numériques)
+    - max_points / method : réduction des points tracés (None pour tout tracer)
     """
     if x_col not in df.columns or y_col not in df.columns:
         raise ValueError(f"Colonnes {x_col} ou {y_col} introuvables dans le DataFrame")
@@ -386,8 +425,10 @@ def plot_time_series(df, x_col, y_col, title="Série temporelle", xlabel=None, y
     if not pd.api.types.is_datetime64_any_dtype(df[x_col]):
         df[x_col] = pd.to_datetime(df[x_col], errors="coerce")
 
+    data = df if not max_points else downsampling.downsample_frame(df, x_col, y_col, max_points, method)
+
     plt.figure(figsize=(10, 5))
-    plt.plot(df[x_col], df[y_col], marker="o", linestyle="-", color="blue")
+    plt.plot(data[x_col], data[y_col], marker="o", linestyle="-", color="blue")
     plt.title(title)
     plt.xlabel(xlabel if xlabel else x_col)
     plt.ylabel(ylabel if ylabel else y_col)
@@ -395,12 +436,14 @@ def plot_time_series(df, x_col, y_col, title="Série temporelle", xlabel=None, y
     plt.tight_layout()
     return plt
 
-def plot_time_series_multi(df, x_col, y_cols, title="Séries temporelles multiples", xlabel=None, ylabel=None):
+def plot_time_series_multi(df, x_col, y_cols, title="Séries temporelles multiples", xlabel=None, ylabel=None,
+                           max_points=downsampling.DEFAULT_POINTS, method="minmax"):
     """
     Trace plusieurs séries temporelles sur une même figure.
     - df : DataFrame Pandas
     - x_col : colonne pour l'axe des X (dates ou périodes)
     - y_cols : liste de colonnes pour l'axe des Y
+    - max_points / method : réduction des points tracés (None pour tout tracer)
     """
     if x_col not in df.columns:
         raise ValueError(f"Colonne {x_col} introuvable dans le DataFrame")
@@ -412,9 +455,11 @@ def plot_time_series_multi(df, x_col, y_cols, title="Séries temporelles multipl
     if not pd.api.types.is_datetime64_any_dtype(df[x_col]):
         df[x_col] = pd.to_datetime(df[x_col], errors="coerce")
 
+    data = df if not max_points else downsampling.downsample_frame(df, x_col, y_cols, max_points, method)
+
     plt.figure(figsize=(10, 5))
     for col in y_cols:
-        plt.plot(df[x_col], df[col], marker="o", linestyle="-", label=col)
+        plt.plot(data[x_col], data[col], marker="o", linestyle="-", label=col)
 
     plt.title(title)
     plt.xlabel(xlabel if xlabel else x_col)
@@ -2,63 +2,62 @@
 # modules/plots/treemap.py
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import matplotlib.pyplot as plt
-import squarify  # Pour la version matplotlib
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import Rectangle
 
-def plot_treemap_plotly(df, path_columns, value_column, title="Treemap", color_column=None):
-    """Version Plotly - Treemap interactif"""
-    if color_column:
-        fig = px.treemap(df, 
-                        path=path_columns,
-                        values=value_column,
-                        color=color_column,
-                        title=title,
-                        color_continuous_scale='Viridis')
-    else:
-        fig = px.treemap(df, 
-                        path=path_columns,
-                        values=value_column,
-                        title=title)
-    
-    fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
-    return fig
+from utils import hierarchy
 
-def plot_treemap_matplotlib(df, path_columns, value_column, title="Treemap"):
-    """Version Matplotlib - Treemap avec squarify"""
-    # Préparer les données pour squarify
-    if len(path_columns) == 1:
-        # Une seule hiérarchie
-        df_grouped = df.groupby(path_columns[0])[value_column].sum().reset_index()
-        labels = [f"{row[path_columns[0]]}\n{row[value_column]:.0f}" 
-                 for _, row in df_grouped.iterrows()]
-        sizes = df_grouped[value_column].values
-    else:
-        # Hiérarchie multiple - on utilise le dernier niveau
-        last_level = path_columns[-1]
-        df_grouped = df.groupby(last_level)[value_column].sum().reset_index()
-        labels = [f"{row[last_level]}\n{row[value_column]:.0f}" 
-                 for _, row in df_grouped.iterrows()]
-        sizes = df_grouped[value_column].values
+# Enfants gardés par nœud en mode top-N (les suivants sont regroupés en « Autres »)
+DEFAULT_TOP = 20
+
+def treemap_nodes(df, path_columns, value_column, color_column=None, top=None):
+    """Table des nœuds (tous niveaux agrégés, en cache), élaguée en top-N + « Autres » si demandé"""
+    nodes = hierarchy.node_table(df, path_columns, value_column, color_column)
+    return hierarchy.prune(nodes, top)
+
+def plot_treemap_plotly(df, path_columns, value_column, title="Treemap", color_column=None, top=None):
+    """Version Plotly - Treemap interactif construit depuis la table des nœuds"""
+    nodes = treemap_nodes(df, path_columns, value_column, color_column, top)
+    return hierarchy.hierarchy_figure(nodes, "treemap", title)
+
+def plot_treemap_matplotlib(df, path_columns, value_column, title="Treemap", top=None):
+    """Version Matplotlib - Treemap squarifié imbriqué (couleur par branche de premier niveau)"""
+    nodes = hierarchy.layout(treemap_nodes(df, path_columns, value_column, top=top))
+    leaves = nodes[hierarchy.leaf_mask(nodes)]
+    roots = nodes[nodes["level"] == 0]
+    
+    # Couleur de chaque feuille : celle de sa racine
+    palette = plt.get_cmap("tab20").colors
+    root_index = {root: i for i, root in enumerate(roots["id"])}
+    colors = [palette[root_index[root] % len(palette)] for root in leaves["root"]]
     
-    # Créer le treemap
     fig, ax = plt.subplots(figsize=(12, 8))
-    squarify.plot(sizes=sizes, label=labels, alpha=0.8, ax=ax)
+    ax.add_collection(PatchCollection(
+        [Rectangle((x, y), dx, dy) for x, y, dx, dy in leaves[["x", "y", "dx", "dy"]].to_numpy()],
+        facecolors=colors, edgecolors="white", linewidths=0.5, alpha=0.8))
+    if len(path_columns) > 1:
+        ax.add_collection(PatchCollection(
+            [Rectangle((x, y), dx, dy) for x, y, dx, dy in roots[["x", "y", "dx", "dy"]].to_numpy()],
+            facecolors="none", edgecolors="white", linewidths=3))
+    
+    # Étiquettes des rectangles assez grands pour être lisibles
+    readable = leaves[(leaves["dx"] > 6) & (leaves["dy"] > 4)]
+    for label, value, x, y, dx, dy in readable[["label", "value", "x", "y", "dx", "dy"]].itertuples(index=False):
+        ax.text(x + dx / 2, y + dy / 2, f"{label}\n{value:.0f}", ha="center", va="center", fontsize=9)
+    
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 100)
     ax.set_title(title, fontsize=16, fontweight='bold')
     ax.axis('off')  # Enlever les axes
     
     plt.tight_layout()
     return fig
 
-def plot_sunburst_plotly(df, path_columns, value_column, title="Sunburst"):
-    """Sunburst - Alternative au treemap"""
-    fig = px.sunburst(df, 
-                     path=path_columns,
-                     values=value_column,
-                     title=title)
-    fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
-    return fig
+def plot_sunburst_plotly(df, path_columns, value_column, title="Sunburst", top=None):
+    """Sunburst - Alternative au treemap, depuis la même table des nœuds"""
+    nodes = treemap_nodes(df, path_columns, value_column, top=top)
+    return hierarchy.hierarchy_figure(nodes, "sunburst", title)
 
 def prepare_treemap_data(df, theme):
     """Prépare les données selon le thème sélectionné"""
@@ -136,8 +135,8 @@ def run(df):
         color_column = None
         if color_option:
             color_column = st.selectbox(
-                "Colonne pour les couleurs:",
-                options=df.columns.tolist(),
+                "Colonne pour les couleurs (numérique):",
+                options=numeric_columns,
                 key="treemap_color"
             )
     
@@ -170,8 +169,8 @@ def run(df):
         color_column = None
         if color_option:
             color_column = st.selectbox(
-                "Colonne pour les couleurs:",
-                options=df.columns.tolist(),
+                "Colonne pour les couleurs (numérique):",
+                options=numeric_columns,
                 key="treemap_color"
             )
     
@@ -195,6 +194,9 @@ def run(df):
     with col2:
         title = st.text_input("Titre du graphique:", f"Treemap - {theme}", key="treemap_title")
         show_data = st.checkbox("Afficher les données préparées", value=True)
+        top = st.number_input("Enfants affichés par nœud (0 = tous) :", min_value=0, value=DEFAULT_TOP,
+                              help="Les plus petits enfants de chaque nœud sont regroupés en « Autres »",
+                              key="treemap_top")
     
     # Génération du graphique
     if st.button("🗺️ Générer le Treemap", type="primary"):
@@ -222,15 +224,15 @@ def run(df):
             # Génération du graphique
             if chart_library == "Plotly (Interactif)":
                 if chart_type == "Treemap":
-                    fig = plot_treemap_plotly(df_clean, hierarchy_cols, value_column, title, color_column)
+                    fig = plot_treemap_plotly(df_clean, hierarchy_cols, value_column, title, color_column, top)
                 else:  # Sunburst
-                    fig = plot_sunburst_plotly(df_clean, hierarchy_cols, value_column, title)
+                    fig = plot_sunburst_plotly(df_clean, hierarchy_cols, value_column, title, top)
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
             else:  # Matplotlib
                 if chart_type == "Treemap":
-                    fig = plot_treemap_matplotlib(df_clean, hierarchy_cols, value_column, title)
+                    fig = plot_treemap_matplotlib(df_clean, hierarchy_cols, value_column, title, top)
                     st.pyplot(fig)
                     plt.close(fig)
                 else:
@@ -240,9 +242,10 @@ def run(df):
             if show_data:
                 st.subheader("📊 Données Préparées")
                 
-                # Agrégation pour montrer la structure
+                # Agrégation pour montrer la structure (feuilles de la table des nœuds en cache)
                 if len(hierarchy_cols) > 1:
-                    aggregation = df_clean.groupby(hierarchy_cols)[value_column].agg(['sum', 'count']).reset_index()
+                    nodes = treemap_nodes(df_clean, hierarchy_cols, value_column)
+                    aggregation = nodes[nodes["level"] == len(hierarchy_cols) - 1][hierarchy_cols + ['value', 'count']]
                     aggregation.columns = hierarchy_cols + ['Total', 'Nombre d\'éléments']
                     st.dataframe(aggregation)
                 else:
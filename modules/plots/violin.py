@@ -2,32 +2,52 @@
 # modules/plots/violin.py
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 import matplotlib.pyplot as plt
-import seaborn as sns
+from plotly.subplots import make_subplots
 
-def plot_violin_plotly(df, x_col, y_col, title="Diagramme Violon"):
-    """Version Plotly - Violin Plot interactif"""
-    fig = px.violin(df, x=x_col, y=y_col, 
-                    title=title,
-                    box=True,  # Affiche la boîte à moustaches à l'intérieur
-                    points="all",  # Affiche tous les points de données
-                    color=x_col,
-                    hover_data=df.columns)
+from utils import kde
+
+# Au-delà de ce nombre de lignes, les points individuels ne sont plus superposés au violon
+POINTS_LIMIT = 5000
+
+def plot_violin_plotly(df, x_col, y_col, title="Diagramme Violon", points=True, bw="scott"):
+    """Version Plotly - Violin Plot interactif (densités précalculées par KDE binnée)"""
+    curves = kde.violin_curves(df[y_col], df[x_col], column=y_col, bw=bw)
+    boxes = kde.inner_box(df[y_col], df[x_col])
+    
+    fig = go.Figure(kde.violin_traces(curves, boxes, colors=px.colors.qualitative.Plotly))
+    
+    # Points de données, uniquement pour les petits jeux (sinon le graphique embarque toutes les lignes)
+    if points and len(df) <= POINTS_LIMIT:
+        positions = {category: i for i, category in enumerate(curves)}
+        x = df[x_col].map(positions).to_numpy(dtype="float64")
+        fig.add_trace(go.Scatter(
+            x=x + np.random.uniform(-0.15, 0.15, len(df)), y=df[y_col],
+            mode="markers", marker=dict(size=4, color="rgba(60,60,60,0.5)"),
+            name="Données", hoverinfo="y",
+        ))
     
     fig.update_layout(
-        xaxis_title=x_col,
+        title=title,
+        xaxis=dict(title=x_col, tickmode="array", tickvals=list(range(len(curves))),
+                   ticktext=[str(category) for category in curves]),
         yaxis_title=y_col,
         showlegend=False
     )
     return fig
 
-def plot_violin_seaborn(df, x_col, y_col, title="Diagramme Violon"):
-    """Version Seaborn/Matplotlib - Violin Plot"""
+def plot_violin_seaborn(df, x_col, y_col, title="Diagramme Violon", bw="scott"):
+    """Version Matplotlib - Violin Plot (densités précalculées par KDE binnée)"""
     fig, ax = plt.subplots(figsize=(10, 6))
     
-    sns.violinplot(data=df, x=x_col, y=y_col, ax=ax, inner="box", palette="Set2")
+    curves = kde.violin_curves(df[y_col], df[x_col], column=y_col, bw=bw)
+    kde.draw_violins(ax, curves, kde.inner_box(df[y_col], df[x_col]), colors=plt.get_cmap("Set2").colors)
     
+    ax.set_xticks(range(len(curves)))
+    ax.set_xticklabels([str(category) for category in curves])
     ax.set_title(title, fontsize=14, fontweight='bold')
     ax.set_xlabel(x_col)
     ax.set_ylabel(y_col)
@@ -37,17 +57,26 @@ def plot_violin_seaborn(df, x_col, y_col, title="Diagramme Violon"):
     plt.tight_layout()
     return fig
 
-def plot_violin_comparison(df, x_col, y_columns, title="Comparaison Violon Multiple"):
-    """Version pour comparer plusieurs variables numériques"""
-    # Préparer les données pour Plotly (format long)
-    df_melted = df.melt(id_vars=[x_col], value_vars=y_columns, 
-                        var_name='Variable', value_name='Valeur')
+def plot_violin_comparison(df, x_col, y_columns, title="Comparaison Violon Multiple", bw="scott"):
+    """Version pour comparer plusieurs variables numériques (un panneau par variable)"""
+    rows = (len(y_columns) + 1) // 2
+    fig = make_subplots(rows=rows, cols=2 if len(y_columns) > 1 else 1,
+                        subplot_titles=[f"Variable={y_col}" for y_col in y_columns])
     
-    fig = px.violin(df_melted, x=x_col, y='Valeur', color='Variable',
-                    title=title, box=True, points=False,
-                    facet_col='Variable', facet_col_wrap=2)
+    for i, y_col in enumerate(y_columns):
+        curves = kde.violin_curves(df[y_col], df[x_col], column=y_col, bw=bw)
+        color = px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)]
+        traces = kde.violin_traces(curves, kde.inner_box(df[y_col], df[x_col]), colors=[color],
+                                   legendgroup=y_col, showlegend=False)
+        for trace in traces:
+            fig.add_trace(trace, row=i // 2 + 1, col=i % 2 + 1)
+        # Une seule entrée de légende par variable
+        fig.data[-len(traces)].update(name=y_col, showlegend=True)
+        fig.update_xaxes(tickmode="array", tickvals=list(range(len(curves))),
+                         ticktext=[str(category) for category in curves], title_text=x_col,
+                         row=i // 2 + 1, col=i % 2 + 1)
     
-    fig.update_layout(showlegend=True)
+    fig.update_layout(title=title, showlegend=True)
     return fig
 
 def run(df):
@@ -136,7 +165,9 @@ def run(df):
     # Options avancées
     with st.expander("⚙️ Options avancées"):
         show_stats = st.checkbox("Afficher les statistiques descriptives", value=True)
-        show_points = st.checkbox("Afficher les points de données", value=False)
+        show_points = st.checkbox("Afficher les points de données", value=False,
+                                  help=f"Jusqu'à {POINTS_LIMIT:,} lignes")
+        bandwidth = st.selectbox("Largeur de bande (KDE) :", ["scott", "silverman"], key="violon_bw")
     
     # Génération du graphique
     if st.button("🎯 Générer le Diagramme Violon", type="primary"):
@@ -155,10 +186,10 @@ def run(df):
                 
                 # Génération du graphique
                 if chart_library == "Plotly (Interactif)":
-                    fig = plot_violin_plotly(df_clean, x_column, y_column, title)
+                    fig = plot_violin_plotly(df_clean, x_column, y_column, title, points=show_points, bw=bandwidth)
                     st.plotly_chart(fig, use_container_width=True)
                 else:
-                    fig = plot_violin_seaborn(df_clean, x_column, y_column, title)
+                    fig = plot_violin_seaborn(df_clean, x_column, y_column, title, bw=bandwidth)
                     st.pyplot(fig)
                     plt.close(fig)
                 
@@ -186,7 +217,7 @@ def run(df):
                     return
                 
                 # Génération du graphique
-                fig = plot_violin_comparison(df_clean, x_column, y_columns, title)
+                fig = plot_violin_comparison(df_clean, x_column, y_columns, title, bw=bandwidth)
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Statistiques comparatives
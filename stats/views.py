@@ -1,16 +1,17 @@
 from django.shortcuts import render
 from django.http import HttpResponse
-import pandas as pd
+
+from datasets import store
+from utils import column_stats
 
 def index(request):
-    if "data" not in request.session:
+    handle = store.session_handle(request)
+    if handle is None:
         return HttpResponse("Aucune donnée disponible. Importez d'abord un fichier dans 📂 Datasets.")
 
-    # Récupération du DataFrame
-    df = pd.read_json(request.session["data"])
-
-    # Calcul des statistiques descriptives
-    stats = df.describe(include="all").transpose().reset_index()
+    # Statistiques descriptives : résumé calculé une seule fois par dataset, puis relu
+    summary = column_stats.dataset_summary(handle["digest"])
+    stats = column_stats.describe_summary(summary).transpose().reset_index()
     stats = stats.fillna("")
 
     # Traduction des noms de colonnes
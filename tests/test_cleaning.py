@@ -32,7 +32,7 @@ def run_tests():
     print(df3.head())
 
     # 4. Pipeline complet
-    df4 = cleaning.prepare_dataset(df, missing_strategy="mean")
+    df4, _ = cleaning.prepare_dataset(df, missing_strategy="mean")
     print("\n=== Pipeline complet ===")
     print(df4.head())
 
@@ -0,0 +1,74 @@
+# tests/test_column_stats.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import column_stats, dataset_store
+
+
+def _frame(n=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "x": rng.lognormal(size=n),
+        "small": rng.integers(0, 50, size=n),
+        "cat": rng.choice(["a", "b", "c", "d"], size=n, p=[0.4, 0.3, 0.2, 0.1]),
+    })
+
+
+def _summary(df):
+    return column_stats.update_summary(column_stats.empty_summary(), df)
+
+
+def test_merge_of_halves_matches_single_pass():
+    df = _frame()
+    half = len(df) // 2
+    single = _summary(df)
+    merged = column_stats.merge_summaries(_summary(df.iloc[:half]), _summary(df.iloc[half:]))
+
+    assert merged['rows'] == single['rows'] == len(df)
+    for col in ("x", "small"):
+        a, b = merged['columns'][col], single['columns'][col]
+        assert a.count == b.count == len(df)
+        assert a.mean == pytest.approx(b.mean, rel=1e-12)
+        assert a.m2 == pytest.approx(b.m2, rel=1e-9)
+        assert (a.min, a.max) == (b.min, b.max)
+        # Écart-type identique à pandas
+        assert a.describe()["std"] == pytest.approx(df[col].std(), rel=1e-9)
+
+
+def test_merged_quantiles_within_tolerance():
+    df = _frame()
+    half = len(df) // 2
+    merged = column_stats.merge_summaries(_summary(df.iloc[:half]), _summary(df.iloc[half:]))
+    q = [0.1, 0.25, 0.5, 0.75, 0.9]
+
+    # Peu de valeurs distinctes : quantiles exacts
+    np.testing.assert_allclose(merged['columns']["small"].quantile(q), df["small"].quantile(q))
+    # Beaucoup de valeurs distinctes : t-digest, erreur en rang de l'ordre du pourcent
+    estimates = merged['columns']["x"].quantile(q)
+    ranks = np.searchsorted(np.sort(df["x"].to_numpy()), estimates) / len(df)
+    np.testing.assert_allclose(ranks, q, atol=0.01)
+
+
+def test_merged_categorical_counts():
+    df = _frame()
+    half = len(df) // 2
+    merged = column_stats.merge_summaries(_summary(df.iloc[:half]), _summary(df.iloc[half:]))
+    stats = merged['columns']["cat"].describe()
+    assert stats["unique"] == 4
+    assert (stats["top"], stats["freq"]) == ("a", int((df["cat"] == "a").sum()))
+
+
+def test_extend_summary_keeps_parent(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "STORE_DIR", str(tmp_path))
+    df = _frame()
+    parent, new_rows = df.iloc[:15_000], df.iloc[15_000:]
+    dataset_store.save_dataset(parent, "parent")
+
+    extended = column_stats.extend_summary("parent", "child", new_rows)
+    single = _summary(df)
+    assert column_stats.load_summary("child")['rows'] == extended['rows'] == len(df)
+    assert column_stats.load_summary("parent")['rows'] == len(parent)
+    assert extended['columns']["x"].mean == pytest.approx(single['columns']["x"].mean, rel=1e-12)
+    assert extended['columns']["x"].m2 == pytest.approx(single['columns']["x"].m2, rel=1e-9)
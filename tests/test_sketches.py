@@ -0,0 +1,60 @@
+# tests/test_sketches.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.sketches import DistinctCounter, TDigest, TopK
+
+
+def test_tdigest_quantiles():
+    values = np.random.default_rng(0).normal(size=100_000)
+    digest = TDigest().update(values)
+    q = np.array([0.01, 0.1, 0.5, 0.9, 0.99])
+    ranks = np.searchsorted(np.sort(values), digest.quantile(q)) / values.size
+    np.testing.assert_allclose(ranks, q, atol=0.005)
+    assert digest.count == values.size
+    assert digest.quantile(0) == values.min() and digest.quantile(1) == values.max()
+
+
+def test_tdigest_merge_and_nan():
+    values = np.random.default_rng(1).exponential(size=50_000)
+    merged = TDigest().update(values[:25_000]).merge(TDigest().update(np.r_[values[25_000:], np.nan]))
+    assert merged.count == values.size
+    assert merged.quantile(0.5) == pytest.approx(np.median(values), rel=0.02)
+    assert np.isnan(TDigest().quantile(0.5))
+
+
+def test_distinct_counter_exact_then_hll():
+    counter = DistinctCounter(exact_limit=1000)
+    counter.update(np.arange(500)).update(np.arange(250, 750))
+    assert counter.estimate() == 750
+    assert counter.registers is None
+
+    counter.update(np.arange(100_000))
+    assert counter.registers is not None
+    assert counter.estimate() == pytest.approx(100_000, rel=0.03)
+
+
+def test_distinct_counter_merge():
+    left = DistinctCounter(exact_limit=100).update([f"v{i}" for i in range(5_000)])
+    right = DistinctCounter(exact_limit=100).update([f"v{i}" for i in range(2_500, 7_500)])
+    assert left.merge(right).estimate() == pytest.approx(7_500, rel=0.03)
+    exact = DistinctCounter().update(["a", "b"]).merge(DistinctCounter().update(["b", "c"]))
+    assert exact.estimate() == 3
+
+
+def test_topk_exact_and_truncated():
+    values = pd.Series(["a"] * 50 + ["b"] * 30 + ["c"] * 20)
+    top = TopK().update(values[:60]).merge(TopK().update(values[60:]))
+    assert top.most_common() == ("a", 50)
+    assert top.error == 0
+    assert TopK().most_common() == (None, 0)
+
+    # Capacité dépassée : la valeur dominante reste en tête, effectif sous-estimé d'au plus `error`
+    values = np.r_[np.zeros(1_000, dtype=int), np.arange(1, 5_000)]
+    top = TopK(capacity=16)
+    for block in np.array_split(values, 10):
+        top.update(block)
+    value, freq = top.most_common()
+    assert value == 0 and 1_000 - top.error <= freq <= 1_000
@@ -11,6 +11,7 @@ urlpatterns = [
     path("bubble/", views.bubble_chart_view, name="bubble"),
     path("radar/", views.radar_chart_view, name="radar"),
     path("treemap/", views.treemap_view, name="treemap"),
+    path("api/<str:kind>/", views.api_figure, name="timeseries_api"),
 
 
 ]
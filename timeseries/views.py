@@ -1,24 +1,29 @@
-
 from django.shortcuts import render
 import plotly.express as px
 import pandas as pd
 from django.http import HttpResponse
 
-def line_view(request):
-    data = {
-        "annee": [2015, 2016, 2017, 2018, 2019, 2020],
-        "seismes": [5, 7, 6, 8, 4, 9]
-    }
-    df = pd.DataFrame(data)
+from core import charts, figure_api
+from utils import hierarchy
 
-    fig = px.line(
+def _line_figure(df):
+    return px.line(
         df,
         x="annee",
         y="seismes",
         title="Évolution du nombre de séismes par année",
         markers=True
     )
-    graph_html = fig.to_html(full_html=False)
+
+
+def line_view(request):
+    data = {
+        "annee": [2015, 2016, 2017, 2018, 2019, 2020],
+        "seismes": [5, 7, 6, 8, 4, 9]
+    }
+    df = pd.DataFrame(data)
+
+    graph_html = charts.render_figure("timeseries.line", df, _line_figure)
     return render(request, "timeseries/line.html", {"graph": graph_html})
 
 
@@ -27,22 +32,34 @@ def line_view(request):
 def index(request):
     return HttpResponse("⏳ Page Séries temporelles")
 
+def _timeseries_figure(df):
+    return px.area(
+        df,
+        x="date",
+        y="magnitude",
+        title="Magnitudes au fil du temps",
+        markers=True
+    )
+
+
 def timeseries_view(request):
     data = {
-        "date": pd.date_range(start="2020-01-01", periods=10, freq="M"),
+        "date": pd.date_range(start="2020-01-01", periods=10, freq=pd.offsets.MonthEnd()),
         "magnitude": [6.5, 6.7, 7.0, 6.8, 7.2, 6.9, 7.1, 6.6, 7.3, 6.8]
     }
     df = pd.DataFrame(data)
 
-    fig = px.area(
+    graph_html = charts.render_figure("timeseries.timeseries", df, _timeseries_figure)
+    return render(request, "timeseries/timeseries.html", {"graph": graph_html})
+
+
+def _stacked_area_figure(df):
+    return px.area(
         df,
-        x="date",
-        y="magnitude",
-        title="Magnitudes au fil du temps",
-        markers=True
+        x="annee",
+        y=["Region A", "Region B", "Region C"],
+        title="Évolution des séismes par région (aires empilées)"
     )
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "timeseries/timeseries.html", {"graph": graph_html})
 
 
 def stacked_area_view(request):
@@ -54,29 +71,14 @@ def stacked_area_view(request):
     }
     df = pd.DataFrame(data)
 
-    fig = px.area(
-        df,
-        x="annee",
-        y=["Region A", "Region B", "Region C"],
-        title="Évolution des séismes par région (aires empilées)"
-    )
-    graph_html = fig.to_html(full_html=False)
+    graph_html = charts.render_figure("timeseries.stacked_area", df, _stacked_area_figure)
     return render(request, "timeseries/stacked_area.html", {"graph": graph_html})
 
 import plotly.graph_objects as go
 import pandas as pd
 from django.shortcuts import render
 
-def candlestick_view(request):
-    # Exemple de données type "finance" ou mesures journalières
-    df = pd.DataFrame({
-        "date": pd.date_range(start="2020-01-01", periods=10, freq="D"),
-        "open": [6.5, 6.7, 6.8, 7.0, 6.9, 7.1, 6.8, 6.6, 6.9, 7.2],
-        "high": [6.8, 6.9, 7.0, 7.2, 7.1, 7.3, 7.0, 6.9, 7.1, 7.4],
-        "low":  [6.3, 6.5, 6.6, 6.8, 6.7, 6.9, 6.6, 6.4, 6.7, 7.0],
-        "close":[6.7, 6.8, 6.9, 7.1, 6.8, 7.0, 6.7, 6.8, 7.0, 7.3]
-    })
-
+def _candlestick_figure(df):
     fig = go.Figure(data=[go.Candlestick(
         x=df["date"],
         open=df["open"],
@@ -90,24 +92,28 @@ def candlestick_view(request):
         xaxis_title="Date",
         yaxis_title="Valeur"
     )
+    return fig
 
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "timeseries/candlestick.html", {"graph": graph_html})
 
+def candlestick_view(request):
+    # Exemple de données type "finance" ou mesures journalières
+    df = pd.DataFrame({
+        "date": pd.date_range(start="2020-01-01", periods=10, freq="D"),
+        "open": [6.5, 6.7, 6.8, 7.0, 6.9, 7.1, 6.8, 6.6, 6.9, 7.2],
+        "high": [6.8, 6.9, 7.0, 7.2, 7.1, 7.3, 7.0, 6.9, 7.1, 7.4],
+        "low":  [6.3, 6.5, 6.6, 6.8, 6.7, 6.9, 6.6, 6.4, 6.7, 7.0],
+        "close":[6.7, 6.8, 6.9, 7.1, 6.8, 7.0, 6.7, 6.8, 7.0, 7.3]
+    })
 
-def multi_line_view(request):
-    data = {
-        "annee": [2015, 2016, 2017, 2018, 2019, 2020],
-        "Region A": [5, 7, 6, 8, 4, 9],
-        "Region B": [3, 4, 5, 6, 2, 5],
-        "Region C": [2, 3, 4, 3, 3, 4],
-    }
-    df = pd.DataFrame(data)
+    graph_html = charts.render_figure("timeseries.candlestick", df, _candlestick_figure)
+    return render(request, "timeseries/candlestick.html", {"graph": graph_html})
 
+
+def _multi_line_figure(df):
     # Transformation en format long pour Plotly Express
     df_long = df.melt(id_vars="annee", var_name="Région", value_name="Séismes")
 
-    fig = px.line(
+    return px.line(
         df_long,
         x="annee",
         y="Séismes",
@@ -116,20 +122,22 @@ def multi_line_view(request):
         title="📈 Multi-Line Chart - Séismes par région"
     )
 
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "timeseries/multi_line.html", {"graph": graph_html})
-
 
-def bubble_chart_view(request):
+def multi_line_view(request):
     data = {
         "annee": [2015, 2016, 2017, 2018, 2019, 2020],
-        "magnitude": [6.5, 6.7, 7.0, 6.8, 7.2, 6.9],
-        "profondeur": [10, 30, 20, 25, 15, 40],  # taille des bulles
-        "region": ["Nord", "Sud", "Est", "Ouest", "Nord", "Sud"]
+        "Region A": [5, 7, 6, 8, 4, 9],
+        "Region B": [3, 4, 5, 6, 2, 5],
+        "Region C": [2, 3, 4, 3, 3, 4],
     }
     df = pd.DataFrame(data)
 
-    fig = px.scatter(
+    graph_html = charts.render_figure("timeseries.multi_line", df, _multi_line_figure)
+    return render(request, "timeseries/multi_line.html", {"graph": graph_html})
+
+
+def _bubble_chart_figure(df):
+    return px.scatter(
         df,
         x="annee",
         y="magnitude",
@@ -139,19 +147,20 @@ def bubble_chart_view(request):
         title="🎈 Bubble Chart - Magnitude vs Année (taille = profondeur)"
     )
 
-    graph_html = fig.to_html(full_html=False)
-    return render(request, "timeseries/bubble.html", {"graph": graph_html})
 
-def radar_chart_view(request):
-    # Exemple de données : 3 régions comparées sur 5 critères
-    categories = ["Séismes", "Magnitude", "Profondeur", "Population exposée", "Infrastructures"]
-    df = pd.DataFrame({
-        "Critère": categories,
-        "Région A": [80, 70, 60, 50, 65],
-        "Région B": [60, 65, 70, 55, 60],
-        "Région C": [70, 75, 65, 60, 70],
-    })
+def bubble_chart_view(request):
+    data = {
+        "annee": [2015, 2016, 2017, 2018, 2019, 2020],
+        "magnitude": [6.5, 6.7, 7.0, 6.8, 7.2, 6.9],
+        "profondeur": [10, 30, 20, 25, 15, 40],  # taille des bulles
+        "region": ["Nord", "Sud", "Est", "Ouest", "Nord", "Sud"]
+    }
+    df = pd.DataFrame(data)
+
+    graph_html = charts.render_figure("timeseries.bubble", df, _bubble_chart_figure)
+    return render(request, "timeseries/bubble.html", {"graph": graph_html})
 
+def _radar_chart_figure(df):
     # Transformation en format long
     df_long = df.melt(id_vars=["Critère"], var_name="Région", value_name="Valeur")
 
@@ -166,11 +175,30 @@ def radar_chart_view(request):
     )
 
     fig.update_traces(fill="toself")  # Remplir les zones
+    return fig
+
+
+def radar_chart_view(request):
+    # Exemple de données : 3 régions comparées sur 5 critères
+    categories = ["Séismes", "Magnitude", "Profondeur", "Population exposée", "Infrastructures"]
+    df = pd.DataFrame({
+        "Critère": categories,
+        "Région A": [80, 70, 60, 50, 65],
+        "Région B": [60, 65, 70, 55, 60],
+        "Région C": [70, 75, 65, 60, 70],
+    })
 
-    graph_html = fig.to_html(full_html=False)
+    graph_html = charts.render_figure("timeseries.radar", df, _radar_chart_figure)
     return render(request, "timeseries/radar.html", {"graph": graph_html})
 
 
+def _treemap_figure(df):
+    # Niveaux agrégés côté serveur : la figure ne contient que les nœuds
+    nodes = hierarchy.aggregate_nodes(df, ["Continent", "Pays"], "Séismes", color="Séismes")
+    return hierarchy.hierarchy_figure(nodes, "treemap", colorscale="RdBu",
+                                      title="🌳 Treemap - Répartition des séismes par continent et pays")
+
+
 def treemap_view(request):
     data = {
         "Continent": ["Amérique", "Amérique", "Amérique", "Europe", "Europe", "Asie", "Asie"],
@@ -179,14 +207,10 @@ def treemap_view(request):
     }
     df = pd.DataFrame(data)
 
-    fig = px.treemap(
-        df,
-        path=["Continent", "Pays"],  # hiérarchie
-        values="Séismes",
-        color="Séismes",
-        color_continuous_scale="RdBu",
-        title="🌳 Treemap - Répartition des séismes par continent et pays"
-    )
-
-    graph_html = fig.to_html(full_html=False)
+    graph_html = charts.render_figure("timeseries.treemap", df, _treemap_figure)
     return render(request, "timeseries/treemap.html", {"graph": graph_html})
+
+
+def api_figure(request, kind):
+    """Série temporelle JSON rééchantillonnée côté serveur (types : core.figure_api.TIMESERIES_KINDS)"""
+    return figure_api.figure_response(request, "timeseries", kind, figure_api.TIMESERIES_KINDS)
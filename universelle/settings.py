@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+import plotly
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -91,6 +94,29 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# Figures Plotly déjà rendues : mémoire locale (éviction des moins récemment utilisées)
+# par défaut, ou fichiers partagés entre processus avec FIGURE_CACHE_BACKEND=file
+FIGURE_CACHE_BACKEND = os.environ.get("FIGURE_CACHE_BACKEND", "locmem")
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'figures': {
+        'BACKEND': ('django.core.cache.backends.filebased.FileBasedCache' if FIGURE_CACHE_BACKEND == "file"
+                    else 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': str(BASE_DIR / '.figure_cache') if FIGURE_CACHE_BACKEND == "file" else 'figures',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 200,
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -127,6 +153,12 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# plotly.js est servi une seule fois comme fichier statique (static/plotly/plotly.min.js),
+# directement depuis le paquet Python plotly installé : même version que les figures
+STATICFILES_DIRS = [
+    ("plotly", os.path.join(os.path.dirname(plotly.__file__), "package_data")),
+]
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
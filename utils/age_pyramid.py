@@ -0,0 +1,89 @@
+# utils/age_pyramid.py - PYRAMIDE DES ÂGES PAR COMPTAGE VECTORISÉ
+#
+# Les effectifs sont tenus par genre et par année d'âge dans un seul tableau,
+# rempli par np.bincount (âge entier x genre factorisé), bloc par bloc.
+# Les tranches d'âge se déduisent de ce tableau par sommes de colonnes et
+# toutes les statistiques (effectifs, parts, âges moyens) en sont tirées :
+# les données ne sont lues qu'une fois, quelle que soit leur taille.
+
+import numpy as np
+import pandas as pd
+
+from utils import dataset_store, grouping, histograms
+
+GENDERS = ("Homme", "Femme")
+
+# Lignes traitées par bloc pour un DataFrame déjà en mémoire
+CHUNK_ROWS = 1_000_000
+
+
+class AgePyramid:
+    """
+    Effectifs par genre (GENDERS) et par année d'âge entre 0 et max_age, mis à jour bloc par bloc.
+    `gender_mapping` associe chaque valeur de genre (en minuscules) à 'Homme' ou 'Femme' ;
+    les autres valeurs sont ignorées.
+    """
+
+    def __init__(self, gender_mapping, max_age):
+        self.mapping = {str(key).lower(): GENDERS.index(value) for key, value in gender_mapping.items()
+                        if value in GENDERS}
+        self.max_age = int(max_age)
+        self.counts = np.zeros((len(GENDERS), self.max_age + 1), dtype=np.int64)
+        self.age_sums = np.zeros(len(GENDERS))
+
+    def _gender_codes(self, genders):
+        # Correspondance calculée sur les valeurs distinctes seulement (-1 : ignorée ou manquante)
+        codes, uniques = grouping.factorize(genders)
+        lookup = np.array([self.mapping.get(str(value).lower(), -1) for value in uniques] + [-1], dtype=np.intp)
+        return lookup[codes]
+
+    def update(self, ages, genders):
+        ages = histograms.float_values(pd.Series(ages))
+        genders = self._gender_codes(genders)
+        valid = (genders >= 0) & (ages >= 0) & (ages <= self.max_age)
+        ages, genders = ages[valid], genders[valid]
+
+        size = self.max_age + 1
+        flat = genders * size + ages.astype(np.intp)
+        self.counts += np.bincount(flat, minlength=len(GENDERS) * size).reshape(len(GENDERS), size)
+        self.age_sums += np.bincount(genders, weights=ages, minlength=len(GENDERS))
+        return self
+
+    def binned(self, bin_size):
+        """Début de chaque tranche et effectifs par genre et par tranche (GENDERS x tranches)"""
+        starts = np.arange(0, self.max_age + 1, int(bin_size))
+        return starts, np.add.reduceat(self.counts, starts, axis=1)
+
+    @property
+    def totals(self):
+        """Effectif de chaque genre"""
+        return self.counts.sum(axis=1)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def mean_ages(self):
+        """Âge moyen de chaque genre (NaN sans effectif), calculé sur les âges exacts"""
+        totals = self.totals
+        return np.where(totals > 0, self.age_sums / np.maximum(totals, 1), np.nan)
+
+
+def pyramid_from_chunks(chunks, age_col, gender_col, gender_mapping, max_age):
+    """Pyramide d'une suite de DataFrames (blocs d'un fichier, tranches d'un dataset...)"""
+    pyramid = AgePyramid(gender_mapping, max_age)
+    for chunk in chunks:
+        pyramid.update(chunk[age_col], chunk[gender_col])
+    return pyramid
+
+
+def frame_pyramid(df, age_col, gender_col, gender_mapping, max_age, chunk_rows=CHUNK_ROWS):
+    """Pyramide d'un DataFrame en mémoire, traité par blocs (temporaires de taille bornée)"""
+    chunks = (df.iloc[start:start + chunk_rows] for start in range(0, len(df), chunk_rows))
+    return pyramid_from_chunks(chunks, age_col, gender_col, gender_mapping, max_age)
+
+
+def dataset_pyramid(digest, age_col, gender_col, gender_mapping, max_age):
+    """Pyramide d'un dataset du cache, lu tranche par tranche (mémoire bornée)"""
+    batches = dataset_store.iter_dataset_batches(digest, columns=[age_col, gender_col])
+    return pyramid_from_chunks(batches, age_col, gender_col, gender_mapping, max_age)
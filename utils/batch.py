@@ -0,0 +1,370 @@
+# utils/batch.py - NETTOYAGE PAR LOTS (LIGNE DE COMMANDE)
+
+import argparse
+import fnmatch
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils import cleaning, ingestion, parallel
+from utils.sketches import TDigest
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow absent : sortie CSV
+    pa = None
+
+DEFAULT_OPTIONS = {
+    'missing_strategy': 'mean',
+    'remove_duplicates_flag': True,
+    'convert_types_flag': True,
+    'remove_outliers_flag': False,
+    'outlier_threshold': 1.5,
+}
+
+# Valeurs de remplissage qui ne dépendent pas des données (les dates restent NaT)
+CONSTANT_FILLS = {'zero': 0, 'empty': '', 'unknown': 'Unknown'}
+
+
+def list_csv_files(input_dir, pattern="*.csv"):
+    """Fichiers CSV d'un dossier, les plus gros en premier (meilleure répartition sur les workers)"""
+    paths = [os.path.join(input_dir, name) for name in os.listdir(input_dir)
+             if fnmatch.fnmatch(name.lower(), pattern.lower())]
+    paths = [path for path in paths if os.path.isfile(path)]
+    return sorted(paths, key=os.path.getsize, reverse=True)
+
+
+def output_path(path, output_dir):
+    extension = ".arrow" if pa is not None else ".csv"
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_dir, f"{name}_clean{extension}")
+
+
+def _drop_mask(chunk, plan):
+    """Lignes conservées après la stratégie "drop" des valeurs manquantes"""
+    keep = np.ones(len(chunk), dtype=bool)
+    for col in plan['drop_missing']:
+        keep &= chunk[col].notna().to_numpy()
+    return keep
+
+
+def _is_outlier_candidate(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def collect_statistics(path, params, options):
+    """
+    Première passe sur le fichier, bloc par bloc.
+    Le plan est construit sur le premier bloc ; les statistiques fusionnables
+    (sommes, t-digests, effectifs) donnent des valeurs de remplissage et des
+    bornes IQR valables pour tout le fichier.
+    """
+    plan = None
+    sums, counts, medians, modes = {}, {}, {}, {}
+    outlier_digests = {}
+    dtype_kinds = {}
+    rows = 0
+
+    for chunk in ingestion.iter_csv_chunks(path, params):
+        if plan is None:
+            plan = cleaning.build_cleaning_plan(
+                chunk,
+                missing_strategy=options['missing_strategy'],
+                remove_duplicates_flag=options['remove_duplicates_flag'],
+                convert_types_flag=options['convert_types_flag'],
+                remove_outliers_flag=options['remove_outliers_flag'],
+                outlier_threshold=options['outlier_threshold'],
+                fill_all_columns=True,
+            )
+        rows += len(chunk)
+        keep = _drop_mask(chunk, plan)
+
+        for col, rule in plan['fill'].items():
+            if rule in ('mean', 'median'):
+                values = pd.to_numeric(chunk[col], errors='coerce')[keep]
+                if rule == 'mean':
+                    sums[col] = sums.get(col, 0.0) + float(values.sum())
+                    counts[col] = counts.get(col, 0) + int(values.count())
+                else:
+                    medians.setdefault(col, TDigest()).update(values.to_numpy(dtype='float64', na_value=np.nan))
+            elif rule == 'mode':
+                value_counts = chunk[col][keep].value_counts()
+                modes[col] = value_counts if col not in modes else modes[col].add(value_counts, fill_value=0)
+
+        for col in chunk.columns:
+            dtype_kinds.setdefault(col, set()).add(chunk[col].dtype.kind)
+
+        if plan['outlier_threshold'] is not None:
+            for col in chunk.columns:
+                series = chunk[col]
+                if plan['convert'].get(col) == 'numeric':
+                    series = cleaning.convert_column(series, 'numeric')
+                if _is_outlier_candidate(series):
+                    digest = outlier_digests.setdefault(col, TDigest())
+                    digest.update(series.to_numpy(dtype='float64', na_value=np.nan)[keep])
+
+    if plan is None:
+        return None
+
+    fill_values = {}
+    for col, rule in plan['fill'].items():
+        if rule == 'mean':
+            fill_values[col] = sums[col] / counts[col] if counts.get(col) else np.nan
+        elif rule == 'median':
+            fill_values[col] = float(medians[col].quantile(0.5))
+        elif rule == 'mode':
+            fill_values[col] = modes[col].idxmax() if len(modes[col]) else 'Unknown'
+        elif rule in CONSTANT_FILLS:
+            fill_values[col] = CONSTANT_FILLS[rule]
+
+    bounds = {}
+    for col, digest in outlier_digests.items():
+        q1, q3 = digest.quantile([0.25, 0.75])
+        lower, upper, active = cleaning.iqr_bounds(q1, q3, plan['outlier_threshold'])
+        if active:
+            bounds[col] = (float(lower), float(upper))
+
+    # Types unifiés : un entier devenu décimal dans un bloc l'est pour tout le fichier ;
+    # une colonne tantôt numérique, tantôt texte est comparée en texte pour les doublons
+    hash_dtypes = {}
+    for col, kinds in dtype_kinds.items():
+        if kinds <= set('iuf'):
+            hash_dtypes[col] = 'float64' if 'f' in kinds or len(kinds) > 1 else 'int64'
+        elif len(kinds) > 1:
+            hash_dtypes[col] = object
+    dtypes = {col: dtype for col, dtype in hash_dtypes.items()
+              if col not in plan['convert'] and dtype is not object}
+
+    return {'plan': plan, 'fill_values': fill_values, 'bounds': bounds, 'dtypes': dtypes,
+            'hash_dtypes': hash_dtypes, 'rows': rows}
+
+
+def _seen_before(hashes, seen):
+    """Empreintes déjà rencontrées dans les blocs précédents (`seen` est trié)"""
+    if seen.size == 0:
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.minimum(np.searchsorted(seen, hashes), seen.size - 1)
+    return seen[positions] == hashes
+
+
+def clean_chunks(path, params, statistics, report):
+    """
+    Seconde passe : applique le plan à chaque bloc avec les valeurs calculées
+    sur tout le fichier. Les doublons sont détectés entre blocs par empreinte
+    de ligne (hash 64 bits) ; seul le tableau trié des empreintes reste en mémoire.
+    """
+    plan = statistics['plan']
+    fill_values = statistics['fill_values']
+    bounds = statistics['bounds']
+    dtypes = statistics['dtypes']
+    hash_dtypes = statistics['hash_dtypes']
+    names = dict(plan['columns'])
+    seen = np.empty(0, dtype=np.uint64)
+
+    for chunk in ingestion.iter_csv_chunks(path, params):
+        keep = _drop_mask(chunk, plan)
+        report['missing_dropped'] += int(len(chunk) - keep.sum())
+
+        for col, value in fill_values.items():
+            series = chunk[col]
+            missing = series.isna().to_numpy()
+            if missing.any() and not pd.isna(value):
+                chunk[col] = series.fillna(value)
+                report['missing_filled'] += int(missing[keep].sum())
+
+        # Types unifiés avant le calcul des empreintes : une même ligne a la même empreinte dans tous les blocs
+        for col, dtype in dtypes.items():
+            if chunk[col].dtype != dtype and not (dtype == 'int64' and chunk[col].isna().any()):
+                chunk[col] = chunk[col].astype(dtype)
+
+        if plan['remove_duplicates']:
+            positions = np.flatnonzero(keep)
+            rows = chunk.iloc[positions]
+            cast = {col: dtype for col, dtype in hash_dtypes.items()
+                    if rows[col].dtype != dtype and not (dtype == 'int64' and rows[col].isna().any())}
+            hashes = pd.util.hash_pandas_object(rows.astype(cast) if cast else rows, index=False).to_numpy()
+            duplicated = pd.Series(hashes).duplicated().to_numpy() | _seen_before(hashes, seen)
+            seen = np.union1d(seen, hashes[~duplicated])
+            keep[positions[duplicated]] = False
+            report['duplicates_removed'] += int(duplicated.sum())
+
+        for col, target_type in plan['convert'].items():
+            chunk[col] = cleaning.convert_column(chunk[col], target_type)
+
+        if bounds:
+            rows_before = int(keep.sum())
+            for col, (lower, upper) in bounds.items():
+                values = chunk[col].to_numpy(dtype='float64', na_value=np.nan)
+                with np.errstate(invalid='ignore'):
+                    keep &= (values >= lower) & (values <= upper)
+            report['outliers_removed'] += rows_before - int(keep.sum())
+
+        chunk = chunk[keep] if not keep.all() else chunk
+        yield chunk.rename(columns=names)
+
+
+def _arrow_schema(table):
+    """Schéma de sortie fixé au premier bloc (colonnes vides typées en texte)"""
+    fields = [field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+              for field in table.schema]
+    return pa.schema(fields)
+
+
+def write_chunks(chunks, path):
+    """
+    Écrit les blocs nettoyés au fur et à mesure : fichier Arrow IPC
+    (relu par mappage mémoire, comme utils.dataset_store), ou CSV sans pyarrow.
+    Retourne le nombre de lignes écrites.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    rows = 0
+    sink = writer = None
+    try:
+        for chunk in chunks:
+            if pa is None:
+                chunk.to_csv(tmp_path, mode="a", header=writer is None, index=False)
+                writer = True
+            elif writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                schema = _arrow_schema(table)
+                sink = pa.OSFile(tmp_path, "wb")
+                writer = pa.ipc.new_file(sink, schema)
+                writer.write_table(table.cast(schema))
+            else:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    except BaseException:
+        if sink is not None:
+            sink.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    if sink is not None:
+        writer.close()
+        sink.close()
+    if writer is not None:
+        # Remplacement atomique : jamais de fichier de sortie partiel
+        os.replace(tmp_path, path)
+    return rows
+
+
+def clean_file(path, output_dir, options=None, budget_bytes=ingestion.CHUNK_BUDGET_BYTES):
+    """
+    Nettoie un CSV en flux (deux passes bornées en mémoire) et écrit la sortie colonnaire.
+    Retourne un rapport avec le temps passé et le débit.
+    """
+    options = {**DEFAULT_OPTIONS, **(options or {})}
+    started = time.perf_counter()
+    report = {
+        'file': path,
+        'output': None,
+        'bytes': os.path.getsize(path),
+        'rows_in': 0,
+        'rows_out': 0,
+        'missing_filled': 0,
+        'missing_dropped': 0,
+        'duplicates_removed': 0,
+        'outliers_removed': 0,
+        'error': None,
+    }
+
+    params = ingestion.sniff_csv(path, budget_bytes)
+    statistics = collect_statistics(path, params, options)
+    if statistics is not None:
+        report['rows_in'] = statistics['rows']
+        os.makedirs(output_dir, exist_ok=True)
+        destination = output_path(path, output_dir)
+        report['rows_out'] = write_chunks(clean_chunks(path, params, statistics, report), destination)
+        report['output'] = destination
+
+    report['elapsed'] = time.perf_counter() - started
+    return report
+
+
+def _clean_file_task(path, output_dir, options, budget_bytes):
+    """Tâche d'un worker : une erreur sur un fichier n'arrête pas le lot"""
+    started = time.perf_counter()
+    try:
+        return clean_file(path, output_dir, options, budget_bytes)
+    except Exception as e:
+        return {'file': path, 'output': None, 'bytes': os.path.getsize(path), 'rows_in': 0, 'rows_out': 0,
+                'error': f"{type(e).__name__}: {e}", 'elapsed': time.perf_counter() - started}
+
+
+def clean_directory(input_dir, output_dir, pattern="*.csv", workers=None, options=None,
+                    budget_bytes=ingestion.CHUNK_BUDGET_BYTES):
+    """
+    Nettoie tous les CSV d'un dossier, un fichier par processus.
+    Le budget mémoire s'applique à chaque worker.
+    """
+    if workers is None:
+        workers = parallel.default_workers()
+    tasks = [(path, output_dir, options, budget_bytes) for path in list_csv_files(input_dir, pattern)]
+    return parallel.run_tasks(_clean_file_task, tasks, workers)
+
+
+def format_summary(reports, elapsed=None):
+    """Tableau texte : temps et débit par fichier, puis total"""
+    lines = [f"{'Fichier':<40} {'Lignes':>10} {'Sortie':>10} {'Temps (s)':>10} {'Mo/s':>8} {'Lignes/s':>11}"]
+    for report in sorted(reports, key=lambda r: os.path.basename(r['file'])):
+        name = os.path.basename(report['file'])[:40]
+        if report['error']:
+            lines.append(f"{name:<40} ERREUR : {report['error']}")
+            continue
+        seconds = max(report['elapsed'], 1e-9)
+        lines.append(f"{name:<40} {report['rows_in']:>10} {report['rows_out']:>10} {report['elapsed']:>10.2f} "
+                     f"{report['bytes'] / seconds / 1e6:>8.1f} {report['rows_in'] / seconds:>11.0f}")
+
+    total_bytes = sum(r['bytes'] for r in reports)
+    total_rows = sum(r['rows_in'] for r in reports)
+    failed = sum(1 for r in reports if r['error'])
+    lines.append(f"{len(reports)} fichiers, {failed} en erreur, {total_rows} lignes, {total_bytes / 1e6:.1f} Mo")
+    if elapsed is not None:
+        seconds = max(elapsed, 1e-9)
+        lines.append(f"Durée totale : {elapsed:.2f} s ({total_bytes / seconds / 1e6:.1f} Mo/s, "
+                     f"{total_rows / seconds:.0f} lignes/s)")
+    return "\n".join(lines)
+
+
+def run_batch(input_dir, output_dir, pattern="*.csv", workers=None, options=None,
+              budget_bytes=ingestion.CHUNK_BUDGET_BYTES):
+    """Lance le lot et affiche le résumé ; retourne les rapports par fichier"""
+    started = time.perf_counter()
+    reports = clean_directory(input_dir, output_dir, pattern, workers, options, budget_bytes)
+    print(format_summary(reports, time.perf_counter() - started))
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nettoyage par lots d'un dossier de fichiers CSV")
+    parser.add_argument("input_dir", help="Dossier contenant les CSV à nettoyer")
+    parser.add_argument("output_dir", help="Dossier de sortie des fichiers nettoyés")
+    parser.add_argument("--pattern", default="*.csv", help="Motif des fichiers à traiter (défaut : *.csv)")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : tous les cœurs)")
+    parser.add_argument("--missing", default="mean", choices=["mean", "median", "zero", "drop"],
+                        help="Stratégie pour les valeurs numériques manquantes")
+    parser.add_argument("--keep-duplicates", action="store_true", help="Ne pas supprimer les doublons")
+    parser.add_argument("--no-convert", action="store_true", help="Ne pas convertir les types")
+    parser.add_argument("--outliers", action="store_true", help="Supprimer les valeurs aberrantes (IQR)")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Seuil IQR des valeurs aberrantes")
+    parser.add_argument("--budget-mb", type=int, default=ingestion.CHUNK_BUDGET_BYTES // (1024 * 1024),
+                        help="Budget mémoire par bloc et par worker, en Mo")
+    args = parser.parse_args(argv)
+
+    options = {
+        'missing_strategy': args.missing,
+        'remove_duplicates_flag': not args.keep_duplicates,
+        'convert_types_flag': not args.no_convert,
+        'remove_outliers_flag': args.outliers,
+        'outlier_threshold': args.threshold,
+    }
+    reports = run_batch(args.input_dir, args.output_dir, args.pattern, args.workers, options,
+                        args.budget_mb * 1024 * 1024)
+    return 1 if any(r['error'] for r in reports) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+# utils/boxstats.py - RÉSUMÉS DE BOÎTES À MOUSTACHES CALCULÉS CÔTÉ SERVEUR
+#
+# Quartiles, moustaches et valeurs aberrantes de chaque groupe en une passe groupée
+# (quantiles par groupby, moustaches par min / max des valeurs dans les clôtures).
+# Les graphiques sont tracés à partir de ces résumés : seules cinq valeurs par boîte
+# et un échantillon borné de valeurs aberrantes sont envoyés au navigateur.
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils import grouping
+
+# Valeurs aberrantes tracées au plus par groupe (les extrêmes sont toujours conservés)
+MAX_OUTLIERS = 500
+
+# Clôtures à whis x IQR des quartiles (convention de Tukey, comme matplotlib et Plotly)
+DEFAULT_WHIS = 1.5
+
+STATS_COLUMNS = ["count", "mean", "lower", "q1", "median", "q3", "upper", "outliers"]
+
+
+def _sample_outliers(values, limit, rng):
+    """Au plus `limit` valeurs (limit >= 2), dont le minimum et le maximum"""
+    if values.size <= limit:
+        return values
+    extremes = [values.argmin(), values.argmax()]
+    rest = np.setdiff1d(np.arange(values.size), extremes)
+    keep = np.concatenate([extremes, rng.choice(rest, limit - 2, replace=False)])
+    return values[np.sort(keep)]
+
+
+def box_summary(values, groups=None, whis=DEFAULT_WHIS, max_outliers=MAX_OUTLIERS, rng=None):
+    """
+    Résumé de chaque groupe (un seul groupe si `groups` vaut None) :
+    - DataFrame indexé par catégorie (ordre d'apparition) : count, mean, lower / upper (moustaches),
+      q1, median, q3, outliers (nombre total de valeurs aberrantes)
+    - dict catégorie -> échantillon des valeurs aberrantes (au plus max_outliers, 0 pour aucun)
+    """
+    values = np.asarray(values, dtype="float64")
+    if groups is None:
+        codes, categories = np.zeros(values.size, dtype=np.intp), pd.Index([None])
+    else:
+        codes, categories = grouping.factorize(groups)
+    valid = (codes >= 0) & np.isfinite(values)
+    values, codes = values[valid], codes[valid]
+    if values.size == 0:
+        return pd.DataFrame(columns=STATS_COLUMNS, dtype="float64"), {}
+    rng = np.random.default_rng(0) if rng is None else rng
+
+    series = pd.Series(values)
+    grouped = series.groupby(codes)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    stats = pd.DataFrame({"count": grouped.size(), "mean": grouped.mean(),
+                          "q1": quartiles[0.25], "median": quartiles[0.5], "q3": quartiles[0.75]})
+
+    iqr = stats["q3"] - stats["q1"]
+    low_fence = (stats["q1"] - whis * iqr).to_numpy()[np.searchsorted(stats.index, codes)]
+    high_fence = (stats["q3"] + whis * iqr).to_numpy()[np.searchsorted(stats.index, codes)]
+    inside = (values >= low_fence) & (values <= high_fence)
+
+    # Moustaches : valeurs extrêmes restées dans les clôtures
+    kept = series[inside].groupby(codes[inside])
+    stats["lower"] = kept.min()
+    stats["upper"] = kept.max()
+    stats["outliers"] = np.bincount(codes[~inside], minlength=len(categories))[stats.index]
+
+    outliers = {}
+    if max_outliers and (~inside).any():
+        outlier_categories, samples = grouping.split_by(codes[~inside], values[~inside])
+        outliers = {categories[code]: _sample_outliers(sample, max_outliers, rng)
+                    for code, sample in zip(outlier_categories, samples)}
+
+    stats.index = categories[stats.index]
+    return stats[STATS_COLUMNS], outliers
+
+
+def bxp_stats(stats, outliers, labels=True):
+    """Résumés au format de matplotlib Axes.bxp (une entrée par boîte)"""
+    return [{"label": str(category) if labels else None, "med": row["median"], "q1": row["q1"],
+             "q3": row["q3"], "whislo": row["lower"], "whishi": row["upper"], "mean": row["mean"],
+             "fliers": outliers.get(category, np.zeros(0))}
+            for category, row in stats.iterrows()]
+
+
+def box_traces(stats, outliers, name=None, horizontal=False, color=None):
+    """
+    Traces Plotly : une trace Box à statistiques précalculées (q1 / median / q3 / clôtures)
+    pour toutes les boîtes, plus l'échantillon de valeurs aberrantes en marqueurs.
+    """
+    labels = [str(category) if category is not None else (name or "") for category in stats.index]
+    box = dict(q1=stats["q1"], median=stats["median"], q3=stats["q3"], mean=stats["mean"],
+               lowerfence=stats["lower"], upperfence=stats["upper"], name=name,
+               marker_color=color, boxpoints=False)
+    box["y" if horizontal else "x"] = labels
+    traces = [go.Box(orientation="h" if horizontal else "v", **box)]
+
+    if outliers:
+        positions = np.concatenate([[label] * len(outliers[category])
+                                    for label, category in zip(labels, stats.index) if category in outliers])
+        points = np.concatenate([outliers[category] for category in stats.index if category in outliers])
+        scatter = dict(mode="markers", marker=dict(size=5, color=color, symbol="circle-open"),
+                       name="Valeurs aberrantes", showlegend=False)
+        scatter["x"], scatter["y"] = (points, positions) if horizontal else (positions, points)
+        traces.append(go.Scatter(**scatter))
+    return traces
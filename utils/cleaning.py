@@ -1,13 +1,81 @@
 
 # utils/cleaning.py - VERSION COMPLÈTEMENT RÉVISÉE
 
+import time
+import warnings
+import weakref
+
 import pandas as pd
 import numpy as np
-import streamlit as st
 
-def detect_data_types(df):
-    """Détecte automatiquement les types de données avec plus de précision"""
-    results = {
+from utils import parallel
+from utils.sketches import TDigest, estimate_distinct, sample_positions
+
+# Taille de l'échantillon utilisé pour sonder les colonnes texte
+PROFILE_SAMPLE_SIZE = 10_000
+
+# Sous-échantillon réellement parsé pour confirmer une colonne de dates
+DATE_PROBE_SIZE = 500
+
+# En dessous de ce nombre de lignes, le comptage exact des valeurs distinctes reste bon marché
+APPROX_DISTINCT_MIN_ROWS = 100_000
+
+# Formats de date numériques reconnus avant tout parsing complet
+DATE_PATTERN = (r'^\s*(\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})'
+                r'([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$')
+
+# Valeurs parsées quand la regex échoue (dates écrites en toutes lettres : "12 Jan 2020"...)
+DATE_FALLBACK_SIZE = 50
+
+# Nombres seuls : jamais pris pour des dates par le parsing de secours
+NUMBER_PATTERN = r'^\s*[-+]?\d+([.,]\d+)?\s*$'
+
+# Profils déjà calculés, indexés par id du DataFrame (invalidés à sa destruction)
+_PROFILE_CACHE = {}
+
+
+def _looks_like_datetime(sample):
+    """
+    Sonde regex sur l'échantillon, puis parsing d'une petite partie seulement.
+    Si la regex échoue, une petite partie de l'échantillon est parsée directement :
+    la colonne est retenue si toutes ces valeurs sont des dates.
+    """
+    if sample.empty:
+        return False
+
+    text = sample.astype(str)
+    if text.str.match(DATE_PATTERN).all():
+        probe = text.iloc[::max(1, len(text) // DATE_PROBE_SIZE)]
+    else:
+        probe = text.iloc[::max(1, len(text) // DATE_FALLBACK_SIZE)]
+        if probe.str.match(NUMBER_PATTERN).any():
+            return False
+    return pd.to_datetime(probe, errors='coerce', format='mixed').notna().all()
+
+
+def _distinct_count(series, sample, n_values):
+    """Nombre de valeurs distinctes, estimé sur l'échantillon pour les grandes colonnes"""
+    if len(series) < APPROX_DISTINCT_MIN_ROWS:
+        return series.nunique()
+    return estimate_distinct(sample, n_values)
+
+
+def _profile_signature(df):
+    return (tuple(df.columns), len(df), tuple(str(t) for t in df.dtypes))
+
+
+def profile_dataset(df):
+    """
+    Profil des colonnes calculé une seule fois par DataFrame :
+    types détectés, valeurs manquantes et cardinalité par colonne.
+    """
+    key = id(df)
+    signature = _profile_signature(df)
+    cached = _PROFILE_CACHE.get(key)
+    if cached is not None and cached[0]() is df and cached[1] == signature:
+        return cached[2]
+
+    types = {
         'numeric': [],
         'categorical': [],
         'datetime': [],
@@ -15,166 +83,158 @@ def detect_data_types(df):
         'boolean': [],
         'problematic': []
     }
-    
+    missing = df.isna().sum()
+    columns = {}
+    n_rows = len(df)
+    positions = sample_positions(n_rows, PROFILE_SAMPLE_SIZE)
+
     for col in df.columns:
-        # Nettoyer le nom de colonne d'abord
-        col_clean = str(col).strip().lower().replace(" ", "_").replace("-", "_")
-        
-        # Vérifier les types pandas
-        dtype = df[col].dtype
-        
-        # Numérique
-        if pd.api.types.is_numeric_dtype(df[col]):
-            results['numeric'].append(col)
-        
-        # Booléen
-        elif pd.api.types.is_bool_dtype(df[col]):
-            results['boolean'].append(col)
-        
-        # Date/Time
-        elif pd.api.types.is_datetime64_any_dtype(df[col]):
-            results['datetime'].append(col)
-        
-        # Catégoriel ou texte
-        elif pd.api.types.is_object_dtype(df[col]):
-            # Essayer de convertir en datetime
-            try:
-                pd.to_datetime(df[col], errors='raise')
-                results['datetime'].append(col)
-            except:
-                # Vérifier si c'est catégoriel (peu de valeurs uniques)
-                unique_ratio = df[col].nunique() / len(df)
-                if unique_ratio < 0.1:  # Moins de 10% de valeurs uniques
-                    results['categorical'].append(col)
-                else:
-                    results['text'].append(col)
-        
+        series = df[col]
+        distinct = None
+
+        # Numérique (les booléens y sont aussi rangés, comme auparavant)
+        if pd.api.types.is_numeric_dtype(series):
+            kind = 'numeric'
+        elif pd.api.types.is_bool_dtype(series):
+            kind = 'boolean'
+        elif pd.api.types.is_datetime64_any_dtype(series):
+            kind = 'datetime'
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            kind = 'categorical'
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            sample = series.take(positions).dropna()
+            if _looks_like_datetime(sample):
+                kind = 'datetime'
+            else:
+                # Catégoriel si moins de 10% de valeurs uniques
+                distinct = _distinct_count(series, sample, n_rows - int(missing[col]))
+                kind = 'categorical' if n_rows and distinct / n_rows < 0.1 else 'text'
         else:
-            results['problematic'].append(col)
-    
-    return results
+            kind = 'problematic'
+
+        types[kind].append(col)
+        columns[col] = {'kind': kind, 'missing': int(missing[col]), 'distinct': distinct}
+
+    profile = {'types': types, 'columns': columns, 'rows': n_rows}
+    _PROFILE_CACHE[key] = (weakref.ref(df, lambda _, key=key: _PROFILE_CACHE.pop(key, None)),
+                           signature, profile)
+    return profile
+
+
+def detect_data_types(df, profile=None):
+    """Détecte automatiquement les types de données (via le profil mis en cache)"""
+    if profile is None:
+        profile = profile_dataset(df)
+    return {kind: list(cols) for kind, cols in profile['types'].items()}
+
+def clean_column_name(col, position=0):
+    """Nettoie un nom de colonne (position utilisée si le nom devient vide)"""
+    # Conversion en string et nettoyage
+    col_str = str(col).strip()
+    
+    # Remplacer les caractères problématiques
+    col_clean = (col_str
+                .lower()
+                .replace(" ", "_")
+                .replace("-", "_")
+                .replace(".", "_")
+                .replace(",", "_")
+                .replace("(", "")
+                .replace(")", "")
+                .replace("/", "_")
+                .replace("\\", "_")
+                .replace("%", "percent")
+                .replace("$", "usd")
+                .replace("€", "eur")
+                .replace("&", "and"))
+    
+    # Supprimer les underscores multiples
+    while "__" in col_clean:
+        col_clean = col_clean.replace("__", "_")
+    
+    # Supprimer les underscores en début/fin
+    col_clean = col_clean.strip("_")
+    
+    # Si le nom est vide après nettoyage, utiliser un nom par défaut
+    if not col_clean:
+        col_clean = f"column_{position}"
+    
+    return col_clean
+
+def unique_column_names(columns):
+    """
+    Noms nettoyés de toutes les colonnes, rendus uniques : deux en-têtes qui donnent
+    le même nom (ex. 'Price' et 'price') deviennent price et price_1.
+    Retourne (noms, {en-tête d'origine: nom suffixé} pour les collisions).
+    """
+    names = [clean_column_name(col, i) for i, col in enumerate(columns)]
+    taken = set(names)
+    seen = set()
+    collisions = {}
+    for i, name in enumerate(names):
+        if name in seen:
+            suffix = 1
+            while f"{name}_{suffix}" in taken:
+                suffix += 1
+            names[i] = f"{name}_{suffix}"
+            taken.add(names[i])
+            collisions[columns[i]] = names[i]
+        seen.add(names[i])
+    return names, collisions
 
 def clean_column_names(df):
-    """Nettoie les noms de colonnes de manière plus robuste"""
+    """Nettoie les noms de colonnes de manière plus robuste (noms uniques)"""
     df_clean = df.copy()
-    
-    new_columns = []
-    for col in df_clean.columns:
-        # Conversion en string et nettoyage
-        col_str = str(col).strip()
-        
-        # Remplacer les caractères problématiques
-        col_clean = (col_str
-                    .lower()
-                    .replace(" ", "_")
-                    .replace("-", "_")
-                    .replace(".", "_")
-                    .replace(",", "_")
-                    .replace("(", "")
-                    .replace(")", "")
-                    .replace("/", "_")
-                    .replace("\\", "_")
-                    .replace("%", "percent")
-                    .replace("$", "usd")
-                    .replace("€", "eur")
-                    .replace("&", "and"))
-        
-        # Supprimer les underscores multiples
-        while "__" in col_clean:
-            col_clean = col_clean.replace("__", "_")
-        
-        # Supprimer les underscores en début/fin
-        col_clean = col_clean.strip("_")
-        
-        # Si le nom est vide après nettoyage, utiliser un nom par défaut
-        if not col_clean:
-            col_clean = f"column_{len(new_columns)}"
-        
-        new_columns.append(col_clean)
-    
-    df_clean.columns = new_columns
+    df_clean.columns = unique_column_names(list(df_clean.columns))[0]
     return df_clean
 
-def handle_missing_values_advanced(df, numeric_strategy='mean', categorical_strategy='mode', custom_values=None):
-    """Gestion avancée des valeurs manquantes"""
+def handle_missing_values_advanced(df, numeric_strategy='mean', categorical_strategy='mode', custom_values=None,
+                                   profile=None):
+    """
+    Gestion avancée des valeurs manquantes.
+    Retourne (df_nettoyé, rapport) ; le rapport liste l'action faite sur chaque colonne.
+    """
+    if profile is None:
+        profile = profile_dataset(df)
     df_clean = df.copy()
-    data_types = detect_data_types(df_clean)
     
-    missing_summary = df_clean.isnull().sum()
-    total_missing = missing_summary.sum()
+    missing_summary = pd.Series({col: info['missing'] for col, info in profile['columns'].items()}, dtype='int64')
+    total_missing = int(missing_summary.sum())
+    report = {'missing_total': total_missing, 'missing': [], 'missing_remaining': 0}
     
     if total_missing == 0:
-        return df_clean, "Aucune valeur manquante détectée"
+        return df_clean, report
     
-    st.info(f"🔍 {total_missing} valeurs manquantes détectées")
-    
-    # Traitement par type de données
-    for col in df_clean.columns:
-        if df_clean[col].isnull().any():
-            missing_count = df_clean[col].isnull().sum()
+    # Traitement par type de données (seules les colonnes incomplètes sont parcourues)
+    for col in missing_summary[missing_summary > 0].index:
+        if col in df_clean.columns and df_clean[col].isnull().any():
+            missing_count = int(df_clean[col].isnull().sum())
             
             # Valeur personnalisée prioritaire
             if custom_values and col in custom_values:
-                fill_value = custom_values[col]
-                df_clean[col].fillna(fill_value, inplace=True)
-                st.write(f"✅ {col}: {missing_count} valeurs → '{fill_value}'")
-            
-            # Numérique
-            elif col in data_types['numeric']:
-                if numeric_strategy == 'mean':
-                    fill_value = df_clean[col].mean()
-                elif numeric_strategy == 'median':
-                    fill_value = df_clean[col].median()
-                elif numeric_strategy == 'zero':
-                    fill_value = 0
-                elif numeric_strategy == 'drop':
-                    df_clean = df_clean.dropna(subset=[col])
-                    st.write(f"🗑️ {col}: {missing_count} lignes supprimées")
-                    continue
-                else:
-                    fill_value = 0
-                
-                df_clean[col].fillna(fill_value, inplace=True)
-                st.write(f"✅ {col}: {missing_count} valeurs → {fill_value:.2f}")
-            
-            # Catégoriel
-            elif col in data_types['categorical']:
-                if categorical_strategy == 'mode':
-                    fill_value = df_clean[col].mode()[0] if not df_clean[col].mode().empty else 'Unknown'
-                elif categorical_strategy == 'unknown':
-                    fill_value = 'Unknown'
-                elif categorical_strategy == 'drop':
-                    df_clean = df_clean.dropna(subset=[col])
-                    st.write(f"🗑️ {col}: {missing_count} lignes supprimées")
-                    continue
-                else:
-                    fill_value = 'Unknown'
-                
-                df_clean[col].fillna(fill_value, inplace=True)
-                st.write(f"✅ {col}: {missing_count} valeurs → '{fill_value}'")
-            
-            # Date
-            elif col in data_types['datetime']:
-                df_clean[col].fillna(pd.NaT, inplace=True)
-                st.write(f"✅ {col}: {missing_count} dates → NaT")
+                rule = 'custom'
+            else:
+                rule = _fill_rule(profile['columns'][col]['kind'], numeric_strategy, categorical_strategy)
             
-            # Texte
-            elif col in data_types['text']:
-                df_clean[col].fillna('', inplace=True)
-                st.write(f"✅ {col}: {missing_count} valeurs → ''")
+            if rule == 'drop':
+                df_clean = df_clean.dropna(subset=[col])
+                report['missing'].append({'column': col, 'count': missing_count, 'action': 'drop'})
+                continue
             
-            # Autres types
+            if rule == 'custom':
+                fill_value = custom_values[col]
             else:
-                df_clean[col].fillna('Unknown', inplace=True)
-                st.write(f"✅ {col}: {missing_count} valeurs → 'Unknown'")
-    
-    remaining_missing = df_clean.isnull().sum().sum()
-    message = f"🎉 Nettoyage terminé : {total_missing} → {remaining_missing} valeurs manquantes"
-    
-    return df_clean, message
+                fill_value = _fill_value(df_clean[col], rule, np.ones(len(df_clean), dtype=bool))
+            if rule != 'nat':
+                df_clean[col] = df_clean[col].fillna(fill_value)
+            report['missing'].append({'column': col, 'count': missing_count, 'action': 'fill',
+                                      'value': fill_value, 'kind': rule})
+    
+    report['missing_remaining'] = int(df_clean.isnull().sum().sum())
+    return df_clean, report
 
 def remove_duplicates_advanced(df, subset=None, keep='first'):
-    """Suppression avancée des doublons"""
+    """Suppression avancée des doublons ; retourne (df_nettoyé, rapport)"""
     before = len(df)
     
     if subset:
@@ -182,20 +242,13 @@ def remove_duplicates_advanced(df, subset=None, keep='first'):
     else:
         df_clean = df.drop_duplicates(keep=keep)
     
-    after = len(df_clean)
-    duplicates_removed = before - after
-    
-    if duplicates_removed > 0:
-        st.success(f"🧹 {duplicates_removed} doublons supprimés")
-    else:
-        st.info("🔍 Aucun doublon détecté")
-    
-    return df_clean
+    return df_clean, {'duplicates_removed': before - len(df_clean)}
 
-def convert_data_types_advanced(df, conversions=None):
-    """Conversion avancée des types de données"""
+def convert_data_types_advanced(df, conversions=None, profile=None):
+    """Conversion avancée des types de données ; retourne (df_nettoyé, rapport)"""
+    data_types = detect_data_types(df, profile)
     df_clean = df.copy()
-    data_types = detect_data_types(df_clean)
+    report = {'conversions': {}, 'conversion_errors': {}}
     
     # Conversions automatiques si aucune spécifiée
     if not conversions:
@@ -203,142 +256,441 @@ def convert_data_types_advanced(df, conversions=None):
         
         # Dates
         for col in data_types['datetime']:
-            try:
-                df_clean[col] = pd.to_datetime(df_clean[col], errors='coerce')
-                conversions[col] = 'datetime'
-            except:
-                pass
+            conversions[col] = 'datetime'
         
         # Numériques avec virgules
         for col in data_types['text']:
-            # Essayer de convertir les nombres avec virgules
             sample = df_clean[col].dropna().head(10)
-            if not sample.empty:
-                if sample.astype(str).str.replace(',', '.').str.match(r'^-?\d*\.?\d+$').any():
-                    try:
-                        df_clean[col] = pd.to_numeric(df_clean[col].astype(str).str.replace(',', '.'), errors='coerce')
-                        conversions[col] = 'numeric'
-                    except:
-                        pass
+            if not sample.empty and sample.astype(str).str.replace(',', '.').str.match(NUMERIC_TEXT_PATTERN).any():
+                conversions[col] = 'numeric'
     
-    # Appliquer les conversions spécifiées
-    if conversions:
-        for col, target_type in conversions.items():
-            if col in df_clean.columns:
-                try:
-                    if target_type == 'numeric':
-                        df_clean[col] = pd.to_numeric(df_clean[col], errors='coerce')
-                    elif target_type == 'datetime':
-                        df_clean[col] = pd.to_datetime(df_clean[col], errors='coerce')
-                    elif target_type == 'category':
-                        df_clean[col] = df_clean[col].astype('category')
-                    elif target_type == 'string':
-                        df_clean[col] = df_clean[col].astype(str)
-                    
-                    st.write(f"🔧 {col} converti en {target_type}")
-                except Exception as e:
-                    st.warning(f"⚠️ Impossible de convertir {col} en {target_type}: {e}")
+    for col, target_type in conversions.items():
+        if col in df_clean.columns:
+            try:
+                if target_type == 'numeric':
+                    df_clean[col] = convert_column(df_clean[col], 'numeric')
+                elif target_type == 'datetime':
+                    df_clean[col] = pd.to_datetime(df_clean[col], errors='coerce')
+                elif target_type == 'category':
+                    df_clean[col] = df_clean[col].astype('category')
+                elif target_type == 'string':
+                    df_clean[col] = df_clean[col].astype(str)
+                
+                report['conversions'][col] = target_type
+            except Exception as e:
+                report['conversion_errors'][col] = f"{target_type}: {e}"
     
-    return df_clean
+    return df_clean, report
 
-def remove_outliers(df, columns=None, method='iqr', threshold=1.5):
-    """Supprime les valeurs aberrantes"""
+def _outlier_columns(df, columns=None):
+    """Colonnes numériques (hors booléens) candidates au filtrage des valeurs aberrantes"""
     if columns is None:
-        data_types = detect_data_types(df)
-        columns = data_types['numeric']
+        # Le type pandas suffit ici : inutile de relancer l'inférence complète
+        columns = df.columns
+    return [col for col in columns
+            if col in df.columns and pd.api.types.is_numeric_dtype(df[col])
+            and not pd.api.types.is_bool_dtype(df[col])]
+
+
+def iqr_bounds(q1, q3, threshold=1.5):
+    """Bornes IQR par colonne ; les colonnes d'IQR nul ou indéfini ne filtrent rien"""
+    q1 = np.asarray(q1, dtype='float64')
+    q3 = np.asarray(q3, dtype='float64')
+    iqr = q3 - q1
+    active = iqr > 0  # Éviter division par zéro
+    return q1 - threshold * iqr, q3 + threshold * iqr, active
+
+
+def outlier_mask(values, threshold=1.5, keep=None, approximate=False):
+    """
+    Masque des valeurs à conserver pour une matrice (lignes × colonnes).
+    Tous les quartiles sont calculés en un seul appel vectorisé, sur les lignes `keep`.
+    Retourne (masque 2D, bornes basses, bornes hautes).
+    """
+    sample = values if keep is None or keep.all() else values[keep]
+
+    if approximate:
+        quartiles = np.array([TDigest().update(sample[:, j]).quantile([0.25, 0.75])
+                              for j in range(sample.shape[1])]).T
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # colonnes entièrement vides
+            quartiles = np.nanquantile(sample, [0.25, 0.75], axis=0)
+
+    lower, upper, active = iqr_bounds(quartiles[0], quartiles[1], threshold)
+    with np.errstate(invalid='ignore'):
+        inside = (values >= lower) & (values <= upper)
+    inside[:, ~active] = True
+    return inside, lower, upper
+
+
+def remove_outliers(df, columns=None, method='iqr', threshold=1.5, approximate=False):
+    """
+    Supprime les valeurs aberrantes en une seule passe :
+    quartiles de toutes les colonnes calculés ensemble sur les données d'origine,
+    puis un seul masque combiné (le résultat ne dépend plus de l'ordre des colonnes).
+    Retourne (df_nettoyé, rapport).
+    """
+    columns = _outlier_columns(df, columns)
     
     if not columns:
-        return df
-    
-    df_clean = df.copy()
-    initial_count = len(df_clean)
+        return df, {'outliers': {}, 'outliers_removed': 0}
     
-    for col in columns:
-        if col in df_clean.columns and pd.api.types.is_numeric_dtype(df_clean[col]):
-            Q1 = df_clean[col].quantile(0.25)
-            Q3 = df_clean[col].quantile(0.75)
-            IQR = Q3 - Q1
-            
-            if IQR > 0:  # Éviter division par zéro
-                lower_bound = Q1 - threshold * IQR
-                upper_bound = Q3 + threshold * IQR
-                
-                before = len(df_clean)
-                df_clean = df_clean[(df_clean[col] >= lower_bound) & (df_clean[col] <= upper_bound)]
-                outliers_removed = before - len(df_clean)
-                
-                if outliers_removed > 0:
-                    st.write(f"🎯 {col}: {outliers_removed} valeurs aberrantes supprimées")
+    values = df[columns].to_numpy(dtype='float64', na_value=np.nan)
+    inside, _, _ = outlier_mask(values, threshold, approximate=approximate)
+    keep = inside.all(axis=1)
     
-    final_count = len(df_clean)
-    total_removed = initial_count - final_count
-    
-    if total_removed > 0:
-        st.success(f"📊 {total_removed} valeurs aberrantes supprimées au total")
-    
-    return df_clean
+    report = {
+        'outliers': {col: int(n) for col, n in zip(columns, (~inside).sum(axis=0)) if n > 0},
+        'outliers_removed': int((~keep).sum()),
+    }
+    return df[keep], report
+
+
+def outlier_bounds_chunked(chunks, columns=None, threshold=1.5, compression=200):
+    """
+    Première passe sur un flux de blocs : un t-digest par colonne.
+    Retourne {colonne: (borne basse, borne haute)} pour les colonnes à filtrer.
+    """
+    digests = {}
+    for chunk in chunks:
+        for col in _outlier_columns(chunk, columns):
+            digest = digests.setdefault(col, TDigest(compression))
+            digest.update(chunk[col].to_numpy(dtype='float64', na_value=np.nan))
+
+    bounds = {}
+    for col, digest in digests.items():
+        q1, q3 = digest.quantile([0.25, 0.75])
+        lower, upper, active = iqr_bounds(q1, q3, threshold)
+        if active:
+            bounds[col] = (float(lower), float(upper))
+    return bounds
+
+
+def filter_outliers_chunked(chunks, bounds):
+    """Seconde passe : applique les bornes bloc par bloc, mémoire bornée"""
+    for chunk in chunks:
+        keep = np.ones(len(chunk), dtype=bool)
+        for col, (lower, upper) in bounds.items():
+            values = chunk[col].to_numpy(dtype='float64', na_value=np.nan)
+            with np.errstate(invalid='ignore'):
+                keep &= (values >= lower) & (values <= upper)
+        yield chunk[keep]
+
+
+NUMERIC_TEXT_PATTERN = r'^-?\d*\.?\d+$'
+
+
+def _fill_rule(kind, numeric_strategy, categorical_strategy):
+    """Règle de remplissage d'une colonne selon son type détecté"""
+    if kind == 'numeric':
+        return numeric_strategy if numeric_strategy in ('mean', 'median', 'zero', 'drop') else 'zero'
+    if kind == 'categorical':
+        return categorical_strategy if categorical_strategy in ('mode', 'unknown', 'drop') else 'unknown'
+    if kind == 'datetime':
+        return 'nat'
+    if kind == 'text':
+        return 'empty'
+    return 'unknown'
+
+
+def build_cleaning_plan(df, missing_strategy="mean", categorical_strategy="mode", remove_duplicates_flag=True,
+                        convert_types_flag=True, remove_outliers_flag=False, outlier_threshold=1.5,
+                        profile=None, fill_all_columns=False):
+    """
+    Construit un plan de nettoyage déclaratif à partir des options choisies.
+    Aucune donnée n'est modifiée : le plan est exécuté par execute_cleaning_plan.
+    `fill_all_columns` prévoit une règle pour chaque colonne, même sans manquant
+    dans `df` (utile quand le plan est construit sur le premier bloc d'un fichier).
+    """
+    if profile is None:
+        profile = profile_dataset(df)
+
+    plan = {
+        'columns': [],
+        'missing_total': sum(info['missing'] for info in profile['columns'].values()),
+        'drop_missing': [],
+        'fill': {},
+        'remove_duplicates': remove_duplicates_flag,
+        'convert': {},
+        'outlier_threshold': outlier_threshold if remove_outliers_flag else None,
+    }
+
+    names, plan['renamed'] = unique_column_names(list(df.columns))
+    for col, name in zip(df.columns, names):
+        info = profile['columns'][col]
+        plan['columns'].append((col, name))
+
+        if info['missing'] or fill_all_columns:
+            rule = _fill_rule(info['kind'], missing_strategy, categorical_strategy)
+            if rule == 'drop':
+                plan['drop_missing'].append(col)
+            else:
+                plan['fill'][col] = rule
+
+        if convert_types_flag:
+            if info['kind'] == 'datetime':
+                plan['convert'][col] = 'datetime'
+            elif info['kind'] == 'text':
+                # Nombres écrits avec des virgules
+                sample = df[col].dropna().head(10)
+                if not sample.empty and sample.astype(str).str.replace(',', '.').str.match(NUMERIC_TEXT_PATTERN).any():
+                    plan['convert'][col] = 'numeric'
+
+    return plan
+
+
+def _fill_value(series, rule, keep):
+    """Valeur de remplissage calculée sur les lignes conservées"""
+    if rule in ('mean', 'median'):
+        kept = series[keep]
+        return kept.mean() if rule == 'mean' else kept.median()
+    if rule == 'zero':
+        return 0
+    if rule == 'mode':
+        mode = series[keep].mode()
+        return mode.iloc[0] if not mode.empty else 'Unknown'
+    if rule == 'empty':
+        return ''
+    if rule == 'nat':
+        # Les dates manquantes restent NaT
+        return pd.NaT
+    return 'Unknown'
+
+
+def convert_column(series, target_type):
+    """Conversion d'une colonne vers 'datetime' ou 'numeric' (virgule décimale acceptée)"""
+    if target_type == 'datetime':
+        return pd.to_datetime(series, errors='coerce')
+    return pd.to_numeric(series.astype(str).str.replace(',', '.'), errors='coerce')
+
+
+def _clean_column(series, rule, keep, dedupe, target_type):
+    """
+    Travail indépendant d'une colonne : remplissage, codes de doublons, conversion.
+    Retourne (série, entrée du rapport, manquants restants, codes, conversion réussie).
+    """
+    entry = None
+    if rule is not None:
+        missing_count = int(series.isna().to_numpy()[keep].sum())
+        if missing_count:
+            fill_value = _fill_value(series, rule, keep)
+            if rule != 'nat':
+                series = series.fillna(fill_value)
+            entry = {'column': series.name, 'count': missing_count, 'action': 'fill',
+                     'value': fill_value, 'kind': rule}
+    remaining = int(series.isna().to_numpy()[keep].sum())
+
+    codes = pd.factorize(series, use_na_sentinel=False)[0].astype(np.int64) if dedupe else None
+
+    converted = False
+    if target_type is not None:
+        try:
+            series = convert_column(series, target_type)
+            converted = True
+        except Exception:
+            pass
+
+    return series, entry, remaining, codes, converted
+
+
+def _clean_column_task(name, values, rule, keep_spec, dedupe, target_type):
+    """Tâche exécutée dans un worker ; les colonnes numériques arrivent en mémoire partagée"""
+    keep, keep_shm = parallel.attach(keep_spec)
+    shared = isinstance(values, tuple)
+    if shared:
+        array, values_shm = parallel.attach(values)
+        series = pd.Series(array, name=name, copy=False)
+    else:
+        series = values.reset_index(drop=True)
+
+    series, entry, remaining, codes, converted = _clean_column(series, rule, keep, dedupe, target_type)
+
+    if shared:
+        # Résultat réécrit en place dans le segment partagé : rien à renvoyer par le pipe
+        if series.dtype == array.dtype:
+            array[...] = series.to_numpy()
+            series = None
+        del array
+        values_shm.close()
+    del keep
+    keep_shm.close()
+    return series, entry, remaining, codes, converted
+
+
+def _is_shareable(series):
+    return isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf'
+
+
+def execute_cleaning_plan(df, plan, workers=1):
+    """
+    Exécute le plan en une seule passe par colonne, sans copie intermédiaire du DataFrame.
+    Les filtrages de lignes (manquants, doublons, aberrants) sont combinés dans un masque
+    appliqué une seule fois à la fin.
+    Avec workers > 1, les colonnes sont réparties sur un pool de processus.
+    Retourne (df_nettoyé, rapport).
+    """
+    started = time.perf_counter()
+    n_rows = len(df)
+    report = {
+        'initial_shape': df.shape,
+        'missing_total': plan['missing_total'],
+        'missing': [],
+        'duplicates_removed': None,
+        'conversions': {},
+        'outliers': {},
+        'outliers_removed': 0,
+        'renamed': plan.get('renamed', {}),
+        'workers': workers,
+    }
+
+    # 1. Lignes supprimées pour valeurs manquantes (stratégie "drop")
+    keep = np.ones(n_rows, dtype=bool)
+    for col in plan['drop_missing']:
+        missing = df[col].isna().to_numpy()
+        report['missing'].append({'column': col, 'count': int(missing[keep].sum()), 'action': 'drop'})
+        keep &= ~missing
+
+    # 2. Passe unique par colonne : remplissage, clé de doublons, conversion
+    if workers > 1:
+        results = _run_parallel_columns(df, plan, keep, workers)
+    else:
+        results = [_clean_column(df[col], plan['fill'].get(col), keep, plan['remove_duplicates'],
+                                 plan['convert'].get(col))
+                   for col, _ in plan['columns']]
+
+    columns_out = {}
+    row_key = None
+    remaining_missing = 0
+
+    for (col, new_name), (series, entry, remaining, codes, converted) in zip(plan['columns'], results):
+        if entry is not None:
+            report['missing'].append(entry)
+        remaining_missing += remaining
+
+        if codes is not None:
+            if row_key is None:
+                row_key = codes
+            else:
+                row_key = pd.factorize(row_key * (int(codes.max(initial=0)) + 1) + codes)[0].astype(np.int64)
+
+        if converted:
+            report['conversions'][new_name] = plan['convert'][col]
+
+        columns_out[new_name] = series
+
+    report['missing_remaining'] = remaining_missing
+
+    # 3. Doublons parmi les lignes conservées
+    if row_key is not None:
+        duplicated = pd.Series(np.where(keep, row_key, -1)).duplicated().to_numpy() & keep
+        report['duplicates_removed'] = int(duplicated.sum())
+        keep &= ~duplicated
+
+    # 4. Valeurs aberrantes (IQR) : quartiles de toutes les colonnes en un appel, un seul masque
+    threshold = plan['outlier_threshold']
+    if threshold is not None:
+        numeric = [name for name, series in columns_out.items()
+                   if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)]
+        if numeric and keep.any():
+            values = np.column_stack([columns_out[name].to_numpy(dtype='float64', na_value=np.nan)
+                                      for name in numeric])
+            inside, _, _ = outlier_mask(values, threshold, keep=keep)
+            del values
+            for name, outside in zip(numeric, (keep[:, None] & ~inside).sum(axis=0)):
+                if outside:
+                    report['outliers'][name] = int(outside)
+            rows_before = int(keep.sum())
+            keep &= inside.all(axis=1)
+            report['outliers_removed'] = rows_before - int(keep.sum())
+
+    # 5. Assemblage final : une seule copie des données
+    if keep.all():
+        df_clean = pd.DataFrame(columns_out, index=df.index)
+    else:
+        index = df.index[keep]
+        df_clean = pd.DataFrame({name: series.array[keep] for name, series in columns_out.items()}, index=index)
+
+    report['final_shape'] = df_clean.shape
+    report['elapsed'] = time.perf_counter() - started
+    return df_clean, report
+
+
+def _run_parallel_columns(df, plan, keep, workers):
+    """Répartit les colonnes sur les workers (colonnes numériques en mémoire partagée)"""
+    shared_arrays = []
+    try:
+        shared_keep = parallel.SharedArray.from_array(keep)
+        shared_arrays.append(shared_keep)
+
+        tasks = []
+        targets = []
+        for col, _ in plan['columns']:
+            series = df[col]
+            shared = None
+            values = series
+            if _is_shareable(series):
+                shared = parallel.SharedArray.from_array(series.to_numpy())
+                shared_arrays.append(shared)
+                values = shared.spec
+            targets.append((col, shared))
+            tasks.append((col, values, plan['fill'].get(col), shared_keep.spec, plan['remove_duplicates'],
+                          plan['convert'].get(col)))
+
+        results = parallel.run_tasks(_clean_column_task, tasks, workers)
+
+        merged = []
+        for (col, shared), (series, entry, remaining, codes, converted) in zip(targets, results):
+            if series is None:
+                # Colonne remplie en place par le worker : recopiée avant libération du segment
+                series = pd.Series(shared.array.copy(), index=df.index, name=col)
+            else:
+                series.index = df.index
+            merged.append((series, entry, remaining, codes, converted))
+        return merged
+    finally:
+        for shared in shared_arrays:
+            shared.release()
+
+
+def benchmark_cleaning(df, plan, workers):
+    """Exécute le plan en séquentiel puis en parallèle et mesure le gain"""
+    _, serial_report = execute_cleaning_plan(df, plan, workers=1)
+    df_clean, parallel_report = execute_cleaning_plan(df, plan, workers=workers)
+    parallel_report['serial_elapsed'] = serial_report['elapsed']
+    parallel_report['speedup'] = serial_report['elapsed'] / max(parallel_report['elapsed'], 1e-9)
+    return df_clean, parallel_report
+
 
 def prepare_dataset(df, missing_strategy="mean", remove_duplicates_flag=True, 
-                   convert_types_flag=True, remove_outliers_flag=False, outlier_threshold=1.5):
+                   convert_types_flag=True, remove_outliers_flag=False, outlier_threshold=1.5,
+                   workers=1, compare_serial=False):
     """
-    Pipeline de nettoyage COMPLET et ROBUSTE
+    Pipeline de nettoyage COMPLET et ROBUSTE, sans interface :
+    plan déclaratif exécuté en une seule passe, éventuellement sur plusieurs processus.
+    Retourne (df_nettoyé, rapport) ; l'affichage est fait par utils.cleaning_ui.
     """
-    st.subheader("🔍 Analyse des données initiales")
-    st.write(f"📊 Dimensions initiales : {df.shape[0]} lignes × {df.shape[1]} colonnes")
-    
-    # 1. Nettoyage des noms de colonnes
-    st.subheader("1. 🧹 Nettoyage des noms de colonnes")
-    df_clean = clean_column_names(df)
-    st.write("✅ Noms de colonnes standardisés")
-    
-    # 2. Détection des types de données
-    st.subheader("2. 🔍 Analyse des types de données")
-    data_types = detect_data_types(df_clean)
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        st.metric("Colonnes numériques", len(data_types['numeric']))
-    with col2:
-        st.metric("Colonnes catégorielles", len(data_types['categorical']))
-    with col3:
-        st.metric("Colonnes date/heure", len(data_types['datetime']))
-    
-    # 3. Gestion des valeurs manquantes
-    st.subheader("3. 🎯 Gestion des valeurs manquantes")
-    df_clean, missing_message = handle_missing_values_advanced(
-        df_clean, 
-        numeric_strategy=missing_strategy,
-        categorical_strategy='mode'
+    profile = profile_dataset(df)
+    plan = build_cleaning_plan(
+        df,
+        missing_strategy=missing_strategy,
+        categorical_strategy='mode',
+        remove_duplicates_flag=remove_duplicates_flag,
+        convert_types_flag=convert_types_flag,
+        remove_outliers_flag=remove_outliers_flag,
+        outlier_threshold=outlier_threshold,
+        profile=profile
     )
-    st.success(missing_message)
-    
-    # 4. Suppression des doublons
-    if remove_duplicates_flag:
-        st.subheader("4. 🧹 Suppression des doublons")
-        df_clean = remove_duplicates_advanced(df_clean)
     
-    # 5. Conversion des types
-    if convert_types_flag:
-        st.subheader("5. 🔧 Conversion des types de données")
-        df_clean = convert_data_types_advanced(df_clean)
-    
-    # 6. Suppression des valeurs aberrantes
-    if remove_outliers_flag:
-        st.subheader("6. 📊 Suppression des valeurs aberrantes")
-        df_clean = remove_outliers(df_clean, threshold=outlier_threshold)
-    
-    # Résumé final
-    st.subheader("🎉 Résumé du nettoyage")
-    col1, col2 = st.columns(2)
-    with col1:
-        st.metric("Lignes initiales", df.shape[0])
-        st.metric("Colonnes initiales", df.shape[1])
-    with col2:
-        st.metric("Lignes finales", df_clean.shape[0])
-        st.metric("Colonnes finales", df_clean.shape[1])
-    
-    rows_removed = df.shape[0] - df_clean.shape[0]
-    if rows_removed > 0:
-        st.info(f"📉 {rows_removed} lignes supprimées pendant le nettoyage")
+    if workers > 1 and compare_serial:
+        df_clean, report = benchmark_cleaning(df, plan, workers)
+    else:
+        df_clean, report = execute_cleaning_plan(df, plan, workers=workers)
     
-    return df_clean
\ No newline at end of file
+    report['data_types'] = detect_data_types(df, profile)
+    report['options'] = {
+        'remove_duplicates': remove_duplicates_flag,
+        'convert_types': convert_types_flag,
+        'remove_outliers': remove_outliers_flag,
+    }
+    return df_clean, report
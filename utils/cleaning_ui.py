@@ -0,0 +1,122 @@
+# utils/cleaning_ui.py - AFFICHAGE STREAMLIT DU NETTOYAGE
+
+import streamlit as st
+
+from utils import cleaning
+
+
+def _write_lines(lines):
+    """Un seul élément Streamlit pour toutes les lignes (un message au lieu d'un par colonne)"""
+    if lines:
+        st.markdown("  \n".join(lines))
+
+
+def format_missing_entry(entry):
+    """Ligne lisible pour une colonne traitée par la gestion des manquants"""
+    if entry['action'] == 'drop':
+        return f"🗑️ {entry['column']}: {entry['count']} lignes supprimées"
+    if entry['kind'] in ('mean', 'median', 'zero'):
+        return f"✅ {entry['column']}: {entry['count']} valeurs → {entry['value']:.2f}"
+    if entry['kind'] == 'nat':
+        return f"✅ {entry['column']}: {entry['count']} dates → NaT"
+    return f"✅ {entry['column']}: {entry['count']} valeurs → '{entry['value']}'"
+
+
+def render_data_types(data_types):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Colonnes numériques", len(data_types['numeric']))
+    with col2:
+        st.metric("Colonnes catégorielles", len(data_types['categorical']))
+    with col3:
+        st.metric("Colonnes date/heure", len(data_types['datetime']))
+
+
+def render_missing(report):
+    if report['missing_total'] == 0:
+        st.success("Aucune valeur manquante détectée")
+        return
+
+    st.info(f"🔍 {report['missing_total']} valeurs manquantes détectées")
+    _write_lines([format_missing_entry(entry) for entry in report['missing']])
+    st.success(f"🎉 Nettoyage terminé : {report['missing_total']} → {report['missing_remaining']} valeurs manquantes")
+
+
+def render_duplicates(report):
+    if report['duplicates_removed']:
+        st.success(f"🧹 {report['duplicates_removed']} doublons supprimés")
+    else:
+        st.info("🔍 Aucun doublon détecté")
+
+
+def render_conversions(report):
+    _write_lines([f"🔧 {col} converti en {target_type}" for col, target_type in report['conversions'].items()])
+    for col, error in report.get('conversion_errors', {}).items():
+        st.warning(f"⚠️ Impossible de convertir {col} en {error}")
+
+
+def render_outliers(report):
+    _write_lines([f"🎯 {col}: {outliers} valeurs aberrantes" for col, outliers in report['outliers'].items()])
+    if report['outliers_removed'] > 0:
+        st.success(f"📊 {report['outliers_removed']} valeurs aberrantes supprimées au total")
+
+
+def render_cleaning_report(report):
+    """Affiche le rapport complet retourné par cleaning.prepare_dataset"""
+    rows, columns = report['initial_shape']
+    st.subheader("🔍 Analyse des données initiales")
+    st.write(f"📊 Dimensions initiales : {rows} lignes × {columns} colonnes")
+
+    st.subheader("1. 🧹 Nettoyage des noms de colonnes")
+    st.write("✅ Noms de colonnes standardisés")
+    _write_lines([f"⚠️ {col} renommée en {name} (nom déjà utilisé)" for col, name in report.get('renamed', {}).items()])
+
+    st.subheader("2. 🔍 Analyse des types de données")
+    render_data_types(report['data_types'])
+
+    st.subheader("3. 🎯 Gestion des valeurs manquantes")
+    render_missing(report)
+
+    options = report['options']
+    if options['remove_duplicates']:
+        st.subheader("4. 🧹 Suppression des doublons")
+        render_duplicates(report)
+
+    if options['convert_types']:
+        st.subheader("5. 🔧 Conversion des types de données")
+        render_conversions(report)
+
+    if options['remove_outliers']:
+        st.subheader("6. 📊 Suppression des valeurs aberrantes")
+        render_outliers(report)
+
+    # Résumé final
+    final_rows, final_columns = report['final_shape']
+    st.subheader("🎉 Résumé du nettoyage")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Lignes initiales", rows)
+        st.metric("Colonnes initiales", columns)
+    with col2:
+        st.metric("Lignes finales", final_rows)
+        st.metric("Colonnes finales", final_columns)
+
+    rows_removed = rows - final_rows
+    if rows_removed > 0:
+        st.info(f"📉 {rows_removed} lignes supprimées pendant le nettoyage")
+
+    if 'speedup' in report:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Séquentiel", f"{report['serial_elapsed']:.2f} s")
+        with col2:
+            st.metric(f"Parallèle ({report['workers']} processus)", f"{report['elapsed']:.2f} s")
+        with col3:
+            st.metric("Accélération", f"×{report['speedup']:.2f}")
+
+
+def prepare_dataset(df, **options):
+    """Nettoyage complet avec affichage Streamlit ; retourne le DataFrame nettoyé"""
+    df_clean, report = cleaning.prepare_dataset(df, **options)
+    render_cleaning_report(report)
+    return df_clean
@@ -0,0 +1,221 @@
+# utils/column_stats.py - STATISTIQUES DESCRIPTIVES INCRÉMENTALES
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from utils import dataset_store
+from utils.sketches import DistinctCounter, TDigest, TopK
+
+# Incrémenté quand le format des résumés change (les anciens sont recalculés)
+SUMMARY_VERSION = 1
+
+# En dessous de ce nombre de valeurs distinctes, les quantiles restent exacts
+EXACT_QUANTILE_DISTINCT = 4096
+
+# Ordre des statistiques de DataFrame.describe(include="all")
+DESCRIBE_ROWS = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+class ColumnSummary:
+    """
+    Résumé fusionnable d'une colonne, mis à jour bloc par bloc :
+    - numérique / date : effectif, moyenne et M2 (variance), min, max, quantiles
+      (exacts via les effectifs tant qu'il y a peu de valeurs distinctes, sinon t-digest)
+    - autre : nombre de distincts et valeurs les plus fréquentes
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.digest = TDigest() if kind != 'categorical' else None
+        self.value_counts = pd.Series(dtype='int64') if kind != 'categorical' else None
+        self.distinct = DistinctCounter() if kind == 'categorical' else None
+        self.top = TopK() if kind == 'categorical' else None
+
+    @staticmethod
+    def kind_of(series):
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return 'datetime'
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return 'numeric'
+        return 'categorical'
+
+    def _values(self, series):
+        series = series.dropna()
+        if self.kind == 'datetime':
+            return series.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+        if self.kind == 'numeric':
+            return series.to_numpy(dtype='float64')
+        return series
+
+    def update(self, series):
+        values = self._values(series)
+        if len(values) == 0:
+            return self
+
+        if self.kind == 'categorical':
+            self.count += len(values)
+            self.distinct.update(values)
+            self.top.update(values)
+            return self
+
+        other = ColumnSummary(self.kind)
+        other.count = values.size
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        other.digest.update(values)
+        other.value_counts = pd.Series(values).value_counts(sort=False)
+        return self.merge(other)
+
+    def merge(self, other):
+        """Fusion de deux résumés (formule de Chan pour la moyenne et M2)"""
+        if other.count == 0:
+            return self
+        if self.kind == 'categorical':
+            self.distinct.merge(other.distinct)
+            self.top.merge(other.top)
+            self.count += other.count
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.digest.merge(other.digest)
+        if self.value_counts is not None and other.value_counts is not None:
+            counts = self.value_counts.add(other.value_counts, fill_value=0).astype('int64')
+            self.value_counts = counts if len(counts) <= EXACT_QUANTILE_DISTINCT else None
+        else:
+            self.value_counts = None
+        return self
+
+    def quantile(self, q):
+        """Quantiles (interpolation linéaire comme pandas quand les effectifs sont connus)"""
+        if self.value_counts is None:
+            return self.digest.quantile(q)
+
+        counts = self.value_counts.sort_index()
+        values = counts.index.to_numpy(dtype='float64')
+        ends = np.cumsum(counts.to_numpy())
+        position = (ends[-1] - 1) * np.asarray(q, dtype='float64')
+        lower, upper = np.floor(position), np.ceil(position)
+        low = values[np.searchsorted(ends, lower, side='right')]
+        high = values[np.searchsorted(ends, upper, side='right')]
+        return low + (position - lower) * (high - low)
+
+    def describe(self):
+        """Statistiques au format de DataFrame.describe"""
+        stats = {"count": float(self.count)}
+        if self.kind == 'categorical':
+            top, freq = self.top.most_common()
+            stats.update({"unique": self.distinct.estimate(), "top": top, "freq": freq if top is not None else None})
+            return stats
+        if self.count == 0:
+            return stats
+
+        q1, median, q3 = self.quantile([0.25, 0.5, 0.75])
+        if self.kind == 'datetime':
+            to_date = lambda v: pd.Timestamp(int(round(v))).round('us')
+            stats.update({"mean": to_date(self.mean), "min": to_date(self.min), "25%": to_date(q1),
+                          "50%": to_date(median), "75%": to_date(q3), "max": to_date(self.max)})
+            return stats
+
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        stats.update({"mean": self.mean, "std": std, "min": self.min, "25%": q1, "50%": median,
+                      "75%": q3, "max": self.max})
+        return stats
+
+
+def empty_summary():
+    return {'version': SUMMARY_VERSION, 'rows': 0, 'columns': {}}
+
+
+def update_summary(summary, df):
+    """Ajoute un bloc de lignes au résumé (sans relire les blocs précédents)"""
+    for col in df.columns:
+        column = summary['columns'].get(col)
+        if column is None:
+            column = summary['columns'][col] = ColumnSummary(ColumnSummary.kind_of(df[col]))
+        column.update(df[col])
+    summary['rows'] += len(df)
+    return summary
+
+
+def merge_summaries(summary, other):
+    """Fusionne deux résumés (par exemple calculés sur des fichiers ou des workers différents)"""
+    for col, column in other['columns'].items():
+        if col in summary['columns']:
+            summary['columns'][col].merge(column)
+        else:
+            summary['columns'][col] = column
+    summary['rows'] += other['rows']
+    return summary
+
+
+def describe_summary(summary):
+    """DataFrame équivalent à df.describe(include="all") (quartiles et distincts approchés)"""
+    stats = {col: column.describe() for col, column in summary['columns'].items()}
+    present = {key for column_stats in stats.values() for key in column_stats}
+    rows = [key for key in DESCRIBE_ROWS if key in present]
+    return pd.DataFrame(stats, index=rows, columns=list(summary['columns']))
+
+
+def summary_path(digest):
+    """Résumé enregistré à côté du dataset dans le cache"""
+    return os.path.join(dataset_store.STORE_DIR, f"{digest}.stats.pkl")
+
+
+def save_summary(summary, digest):
+    path = summary_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(summary, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_summary(digest):
+    """Résumé enregistré, ou None s'il n'existe pas ou date d'une autre version"""
+    try:
+        with open(summary_path(digest), "rb") as f:
+            summary = pickle.load(f)
+    except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+        return None
+    return summary if summary.get('version') == SUMMARY_VERSION else None
+
+
+def dataset_summary(digest):
+    """
+    Résumé d'un dataset du cache : relu s'il existe, sinon calculé
+    en une seule passe sur les tranches mappées en mémoire, puis enregistré.
+    """
+    summary = load_summary(digest)
+    if summary is None:
+        summary = empty_summary()
+        for batch in dataset_store.iter_dataset_batches(digest):
+            update_summary(summary, batch)
+        save_summary(summary, digest)
+    return summary
+
+
+def extend_summary(parent_digest, new_digest, new_rows):
+    """
+    Résumé d'un dataset obtenu en ajoutant `new_rows` au dataset `parent_digest` :
+    seules les nouvelles lignes sont lues, le résumé du parent est fusionné avec le leur.
+    Il est enregistré sous `new_digest` (empreinte du nouveau contenu) ; celui du parent reste inchangé.
+    """
+    summary = merge_summaries(dataset_summary(parent_digest), update_summary(empty_summary(), new_rows))
+    save_summary(summary, new_digest)
+    return summary
@@ -0,0 +1,253 @@
+# utils/dataset_store.py - CACHE COLONNAIRE DES DATASETS IMPORTÉS
+
+import hashlib
+import os
+
+import pandas as pd
+
+from utils import ingestion
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow absent : cache au format pickle (sans mappage mémoire)
+    pa = None
+
+# Dossier du cache, partagé entre sessions et redémarrages du serveur
+STORE_DIR = os.environ.get("VISUAL_DATASET_STORE", ".dataset_store")
+
+HASH_BLOCK_BYTES = 1024 * 1024
+
+# Incrémenté quand la façon de lire les fichiers change (les anciens caches sont relus)
+STORE_VERSION = 2
+
+
+def hash_upload(source):
+    """Empreinte SHA-256 du contenu d'un fichier importé (lu par blocs)"""
+    digest = hashlib.sha256()
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    source.seek(0)
+    for block in iter(lambda: source.read(HASH_BLOCK_BYTES), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def dataset_path(digest):
+    """Chemin du fichier du cache correspondant à une empreinte"""
+    extension = "arrow" if pa is not None else "pkl"
+    return os.path.join(STORE_DIR, f"{digest}.v{STORE_VERSION}.{extension}")
+
+
+def has_dataset(digest):
+    return os.path.exists(dataset_path(digest))
+
+
+def _arrow_table(df):
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Colonnes objet mélangeant nombres et texte (fréquent dans les fichiers Excel)
+        mixed = {col: "string" for col in df.columns if df[col].dtype == object}
+        return pa.Table.from_pandas(df.astype(mixed), preserve_index=False)
+
+
+def save_dataset(df, digest):
+    """Écrit le DataFrame au format Arrow IPC non compressé (mappable en mémoire)"""
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = dataset_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    if pa is None:
+        df.to_pickle(tmp_path)
+    else:
+        table = _arrow_table(df)
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    # Remplacement atomique : un lecteur concurrent ne voit jamais un fichier partiel
+    os.replace(tmp_path, path)
+    return path
+
+
+def _is_number(data_type):
+    return pa.types.is_integer(data_type) or pa.types.is_floating(data_type)
+
+
+def _is_text(data_type):
+    return pa.types.is_string(data_type) or pa.types.is_large_string(data_type)
+
+
+def _widen(field, other):
+    """Type commun à deux blocs : réel pour des nombres de types différents, texte sinon"""
+    if pa.types.is_null(other.type):
+        return field
+    if pa.types.is_null(field.type):
+        return other
+    if _is_number(field.type) and _is_number(other.type):
+        return field.with_type(pa.float64())
+    return field.with_type(pa.string())
+
+
+def _csv_schema(table, schema=None):
+    """Schéma fixe du fichier : celui du premier bloc, élargi si un bloc suivant ne s'y conforme pas"""
+    if schema is None:
+        fields = list(table.schema)
+    else:
+        fields = [field if field.type == other.type else _widen(field, other)
+                  for field, other in zip(schema, table.schema)]
+    return pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                      for field in fields])
+
+
+def _chunk_table(chunk, schema):
+    """Bloc converti au schéma fixe du fichier (colonnes passées en texte converties d'abord)"""
+    text = {field.name: "string" for field in schema
+            if _is_text(field.type) and not isinstance(chunk[field.name].dtype, pd.StringDtype)}
+    if text:
+        chunk = chunk.astype(text)
+    return pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def _write_csv_chunks(source, tmp_path, params, schema):
+    """
+    Écrit les blocs du CSV dans un seul fichier Arrow IPC au schéma `schema`.
+    Retourne None si tous les blocs s'y conforment, sinon le schéma élargi à réessayer.
+    """
+    sink = writer = None
+    try:
+        for chunk in ingestion.iter_csv_chunks(source, params):
+            if writer is None:
+                schema = _csv_schema(_arrow_table(chunk), schema)
+                sink = pa.OSFile(tmp_path, "wb")
+                writer = pa.ipc.new_file(sink, schema)
+            try:
+                table = _chunk_table(chunk, schema)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                return _csv_schema(_arrow_table(chunk), schema)
+            writer.write_table(table)
+        if writer is None:
+            # Fichier sans aucune ligne : schéma tiré de l'en-tête seul
+            header = ingestion.read_csv_chunked(source, params, max_rows=0)
+            sink = pa.OSFile(tmp_path, "wb")
+            writer = pa.ipc.new_file(sink, _csv_schema(_arrow_table(header)))
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+
+
+def save_csv(source, digest):
+    """
+    Écrit un CSV dans le cache bloc par bloc (ingestion.iter_csv_chunks) : la mémoire
+    occupée ne dépend que de ingestion.CHUNK_BUDGET_BYTES, pas de la taille du fichier.
+    Le schéma est fixé au premier bloc ; si un bloc suivant ne s'y conforme pas
+    (valeurs manquantes dans une colonne entière, texte dans une colonne numérique),
+    il est élargi et le fichier est réécrit depuis le début.
+    """
+    if pa is None:
+        return save_dataset(ingestion.read_csv_chunked(source), digest)
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    path = dataset_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    params = ingestion.sniff_csv(source)
+
+    schema = None
+    try:
+        while True:
+            schema = _write_csv_chunks(source, tmp_path, params, schema)
+            if schema is None:
+                break
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Remplacement atomique : un lecteur concurrent ne voit jamais un fichier partiel
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_dataset(digest, columns=None):
+    """Relit un dataset du cache par mappage mémoire, sans parser de CSV"""
+    if pa is None:
+        df = pd.read_pickle(dataset_path(digest))
+        return df if columns is None else df[columns]
+
+    with pa.memory_map(dataset_path(digest), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def dataset_columns(digest):
+    """Noms des colonnes, lus dans le schéma sans charger les données"""
+    if pa is None:
+        return open_dataset(digest).columns.tolist()
+    with pa.memory_map(dataset_path(digest), "r") as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def dataset_num_rows(digest):
+    """Nombre de lignes, sans convertir les données"""
+    if pa is None:
+        return len(open_dataset(digest))
+    with pa.memory_map(dataset_path(digest), "r") as source:
+        reader = pa.ipc.open_file(source)
+        return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+
+
+def read_rows(digest, start, length):
+    """Lignes [start, start + length) ; seule cette tranche est convertie"""
+    if pa is None:
+        return open_dataset(digest).iloc[start:start + length]
+    with pa.memory_map(dataset_path(digest), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+        return table.slice(start, length).to_pandas()
+
+
+def iter_dataset_batches(digest, batch_rows=50_000, columns=None):
+    """
+    Relit un dataset par tranches de lignes.
+    Les tranches sont des vues sur le fichier mappé : seule la tranche courante
+    est convertie en DataFrame, la mémoire reste bornée quelle que soit la taille.
+    """
+    if pa is None:
+        df = open_dataset(digest, columns)
+        for start in range(0, len(df), batch_rows):
+            yield df.iloc[start:start + batch_rows]
+        return
+
+    with pa.memory_map(dataset_path(digest), "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, batch_rows):
+                yield batch.slice(start, batch_rows).to_pandas()
+
+
+def load_dataset(source, digest=None, columns=None):
+    """
+    Retourne le DataFrame d'un fichier importé (seulement `columns` si elles sont données).
+    Le CSV n'est parsé qu'une seule fois par contenu, bloc par bloc ; ensuite le cache est relu.
+    """
+    if digest is None:
+        digest = hash_upload(source)
+
+    if not has_dataset(digest):
+        save_csv(source, digest)
+
+    return open_dataset(digest, columns)
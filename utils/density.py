@@ -0,0 +1,125 @@
+# utils/density.py - NUAGES DE POINTS RASTERISÉS (GRILLE DE DENSITÉ)
+#
+# Au-delà d'un certain nombre de points, un nuage n'est plus tracé point par point :
+# les points sont comptés sur une grille 2D (bincount vectorisé) et affichés en image.
+
+import base64
+import io
+import os
+
+import matplotlib
+import matplotlib.image
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils import grouping, histograms
+
+# Nombre de points au-delà duquel le nuage est rasterisé (variable d'environnement RASTER_THRESHOLD)
+RASTER_THRESHOLD = int(os.environ.get("RASTER_THRESHOLD", 50_000))
+
+GRID_WIDTH = 400
+GRID_HEIGHT = 300
+
+
+def should_rasterize(n_points, threshold=None):
+    return n_points > (RASTER_THRESHOLD if threshold is None else threshold)
+
+
+def _axis_edges(values, size, value_range):
+    if value_range is None:
+        return histograms.bin_edges(values, size)
+    return np.histogram_bin_edges(np.asarray(value_range, dtype="float64"), bins=size)
+
+
+def density_grid(x, y, width=GRID_WIDTH, height=GRID_HEIGHT, x_range=None, y_range=None, groups=None):
+    """
+    Effectifs des points par pixel : tableau (hauteur, largeur), ligne 0 en bas.
+    Avec `groups`, une grille par catégorie : (catégories, tableau catégories x hauteur x largeur).
+    Retourne aussi les bornes en x et en y.
+    """
+    x = histograms.float_values(pd.Series(x))
+    y = histograms.float_values(pd.Series(y))
+    x_edges = _axis_edges(x, width, x_range)
+    y_edges = _axis_edges(y, height, y_range)
+
+    ix, x_valid = histograms.bin_indices(x, x_edges)
+    iy, y_valid = histograms.bin_indices(y, y_edges)
+    col = np.full(x.size, -1, dtype=np.intp)
+    row = np.full(y.size, -1, dtype=np.intp)
+    col[x_valid] = ix
+    row[y_valid] = iy
+    valid = (col >= 0) & (row >= 0)
+    pixels = row[valid] * width + col[valid]
+
+    if groups is None:
+        grid = np.bincount(pixels, minlength=width * height).reshape(height, width)
+        return grid, x_edges, y_edges
+
+    codes, categories = grouping.factorize(groups, sort=True)
+    codes = codes[valid]
+    keep = codes >= 0
+    flat = codes[keep] * (width * height) + pixels[keep]
+    grids = np.bincount(flat, minlength=len(categories) * width * height)
+    return (categories, grids.reshape(len(categories), height, width)), x_edges, y_edges
+
+
+def shade(grid):
+    """Intensité 0..1 par pixel (échelle logarithmique, pour voir à la fois les zones denses et isolées)"""
+    scaled = np.log1p(grid.astype("float64"))
+    top = scaled.max()
+    return scaled / top if top > 0 else scaled
+
+
+def rgba_image(grid, color):
+    """Image RGBA d'une grille : couleur unique, opacité selon la densité (pixels vides transparents)"""
+    image = np.zeros(grid.shape + (4,))
+    image[..., :3] = color[:3]
+    alpha = shade(grid)
+    image[..., 3] = np.where(grid > 0, 0.15 + 0.85 * alpha, 0.0)
+    return image
+
+
+def category_image(grids, colors):
+    """
+    Image RGBA de grilles par catégorie : couleur de chaque pixel = moyenne des couleurs
+    pondérée par les effectifs, opacité selon la densité totale.
+    """
+    colors = np.asarray(colors, dtype="float64")[:, :3]
+    total = grids.sum(axis=0)
+    mix = np.tensordot(grids.astype("float64"), colors, axes=(0, 0))
+    image = np.zeros(total.shape + (4,))
+    filled = total > 0
+    image[filled, :3] = mix[filled] / total[filled, None]
+    image[..., 3] = np.where(filled, 0.15 + 0.85 * shade(total), 0.0)
+    return image
+
+
+def density_png(image):
+    """Image RGBA encodée en PNG, en URI data: pour Plotly (ligne 0 du tableau = première ligne du PNG)"""
+    buffer = io.BytesIO()
+    matplotlib.image.imsave(buffer, np.clip(image, 0, 1), format="png")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+def density_figure(grid, x_edges, y_edges, title=None, xaxis_title=None, yaxis_title=None, cmap="viridis"):
+    """
+    Nuage rasterisé pour Plotly : une image PNG de la grille (quelques dizaines de Ko)
+    au lieu d'un marqueur par point.
+    """
+    intensity = shade(grid)
+    image = matplotlib.colormaps[cmap](intensity)
+    image[..., 3] = np.where(grid > 0, 1.0, 0.0)
+
+    fig = go.Figure(go.Image(
+        source=density_png(image),
+        x0=(x_edges[0] + x_edges[1]) / 2, dx=x_edges[1] - x_edges[0],
+        y0=(y_edges[0] + y_edges[1]) / 2, dy=y_edges[1] - y_edges[0],
+        hoverinfo="skip",
+    ))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    # Axe y croissant vers le haut (inversé par défaut pour les images) : la ligne 0 (y minimal) est en bas ;
+    # pixels non carrés (par défaut plotly.js lie l'échelle de y à celle de x pour une image)
+    fig.update_yaxes(autorange=True, scaleanchor=False)
+    fig.update_xaxes(constrain="domain")
+    return fig
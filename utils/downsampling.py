@@ -0,0 +1,125 @@
+# utils/downsampling.py - RÉDUCTION DES POINTS D'UNE SÉRIE AVANT AFFICHAGE
+#
+# Un graphique n'affiche pas plus de points qu'il n'a de pixels : au-delà,
+# on ne garde qu'une sélection de points qui préserve l'allure de la courbe.
+# - "minmax" : minimum et maximum de chaque tranche de pixels (enveloppe exacte, pics conservés)
+# - "lttb"   : Largest-Triangle-Three-Buckets (un point par tranche, forme visuelle conservée)
+
+import numpy as np
+import pandas as pd
+
+# Nombre de points visés par défaut (environ deux par pixel d'un graphique large)
+DEFAULT_POINTS = 2000
+
+METHODS = ("minmax", "lttb")
+LABELS = {"minmax": "Min/Max (enveloppe)", "lttb": "LTTB", None: "Aucune"}
+
+
+def _as_float(values):
+    """Abscisses ou ordonnées en float64 (les dates en nanosecondes)"""
+    values = pd.Series(values) if not isinstance(values, pd.Series) else values
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").astype(np.int64).astype(np.float64)
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values, errors="coerce")
+    return values.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def _first_in_segments(mask, segment):
+    """Indice de la première position vraie de chaque segment"""
+    positions = np.flatnonzero(mask)
+    _, first = np.unique(segment[positions], return_index=True)
+    return positions[first]
+
+
+def minmax_indices(x, y, n_out=DEFAULT_POINTS):
+    """
+    Indices des minimum et maximum de chaque tranche (n_out / 2 tranches régulières en x),
+    plus le premier et le dernier point. Les abscisses doivent être triées.
+    """
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n <= n_out:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    bucket = np.zeros(n, dtype=np.intp) if span <= 0 else \
+        np.minimum(((x - x[0]) * (n_buckets / span)).astype(np.intp), n_buckets - 1)
+
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    low = np.minimum.reduceat(y, starts)[segment]
+    high = np.maximum.reduceat(y, starts)[segment]
+
+    mins = _first_in_segments(y == low, segment)
+    maxs = _first_in_segments(y == high, segment)
+    return np.unique(np.concatenate([[0, n - 1], mins, maxs]))
+
+
+def lttb_indices(x, y, n_out=DEFAULT_POINTS):
+    """
+    Largest-Triangle-Three-Buckets : dans chaque tranche, le point qui forme le plus grand
+    triangle avec le point retenu précédemment et la moyenne de la tranche suivante.
+    Une itération par tranche, le calcul des aires est vectorisé.
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    x_sums = np.r_[0.0, np.cumsum(x)]
+    y_sums = np.r_[0.0, np.cumsum(y)]
+    sizes = np.diff(edges)
+    x_means = (x_sums[edges[1:]] - x_sums[edges[:-1]]) / sizes
+    y_means = (y_sums[edges[1:]] - y_sums[edges[:-1]]) / sizes
+    # Après la dernière tranche, le triangle s'appuie sur le dernier point
+    x_means = np.r_[x_means[1:], x[-1]]
+    y_means = np.r_[y_means[1:], y[-1]]
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - x_means[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (y_means[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(x, y, n_out=DEFAULT_POINTS, method="minmax"):
+    """
+    Indices des points à tracer (triés). La réduction porte sur les lignes où x et y sont
+    renseignés ; la première ligne de chaque suite de manquants est conservée pour que
+    la courbe reste coupée au même endroit. La série est gardée entière si elle est déjà
+    assez petite ou si les abscisses ne sont pas triées.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode de réduction inconnue : {method}")
+    x, y = _as_float(x), _as_float(y)
+    n = len(y)
+    finite = ~np.isnan(x) & ~np.isnan(y)
+    positions = np.flatnonzero(finite)
+    if n <= n_out or (np.diff(x[positions]) < 0).any():
+        return np.arange(n)
+
+    if method == "lttb":
+        idx = lttb_indices(x[positions], y[positions], n_out)
+    else:
+        idx = minmax_indices(x[positions], y[positions], n_out)
+    gaps = np.flatnonzero(~finite & np.r_[True, finite[:-1]])
+    return np.union1d(positions[idx], gaps)
+
+
+def downsample_frame(df, x_col, y_cols, n_out=DEFAULT_POINTS, method="minmax"):
+    """
+    Lignes à tracer pour plusieurs séries partageant la même abscisse :
+    union des points retenus pour chaque série (les pics de chacune sont conservés).
+    """
+    if len(df) <= n_out:
+        return df
+    y_cols = [y_cols] if isinstance(y_cols, str) else list(y_cols)
+    per_series = max(n_out // len(y_cols), 3)
+    keep = np.unique(np.concatenate([downsample_indices(df[x_col], df[col], per_series, method)
+                                     for col in y_cols]))
+    return df.iloc[keep]
@@ -0,0 +1,60 @@
+# utils/grouping.py - DÉCOUPAGE PAR CATÉGORIE EN UN SEUL PASSAGE
+#
+# Au lieu de filtrer le DataFrame une fois par catégorie (df[df[col] == cat],
+# coût catégories x lignes), la clé est factorisée une fois, les lignes sont
+# triées par code (tri stable) et chaque groupe est une tranche contiguë.
+
+import numpy as np
+import pandas as pd
+
+
+def factorize(keys, sort=False):
+    """Codes entiers (-1 pour les manquants) et catégories, dans l'ordre d'apparition par défaut (comme unique())"""
+    if not isinstance(keys, (pd.Series, pd.Index, np.ndarray)):
+        keys = pd.Series(keys)
+    return pd.factorize(keys, sort=sort)
+
+
+def group_order(keys, sort=False):
+    """
+    Catégories, permutation qui regroupe les lignes par catégorie (ordre d'origine conservé
+    dans chaque groupe) et bornes de chaque groupe dans cette permutation.
+    Les clés manquantes sont écartées.
+    """
+    codes, categories = factorize(keys, sort=sort)
+    order = np.argsort(codes, kind="stable")
+    order = order[np.count_nonzero(codes < 0):]
+    counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+    ends = np.cumsum(counts)
+    return categories, order, ends - counts, ends
+
+
+def _take(values, positions):
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.iloc[positions]
+    return np.asarray(values)[positions]
+
+
+def split_by(keys, values, sort=False):
+    """
+    Valeurs de chaque catégorie : (catégories, liste de tranches dans le même ordre).
+    `values` peut être un tableau, une Series ou un DataFrame (aligné position par position sur `keys`).
+    """
+    categories, order, starts, ends = group_order(keys, sort=sort)
+    ordered = _take(values, order)
+    if isinstance(ordered, (pd.Series, pd.DataFrame)):
+        return categories, [ordered.iloc[start:end] for start, end in zip(starts, ends)]
+    return categories, [ordered[start:end] for start, end in zip(starts, ends)]
+
+
+def pivot_values(rows, columns, values, fill=0.0):
+    """
+    Tableau (lignes x colonnes) d'une table déjà agrégée (une valeur par couple),
+    rempli en une affectation vectorisée. Retourne (catégories lignes, catégories colonnes, tableau).
+    """
+    row_codes, row_categories = factorize(rows)
+    col_codes, col_categories = factorize(columns)
+    table = np.full((len(row_categories), len(col_categories)), fill, dtype="float64")
+    valid = (row_codes >= 0) & (col_codes >= 0)
+    table[row_codes[valid], col_codes[valid]] = np.asarray(values, dtype="float64")[valid]
+    return row_categories, col_categories, table
@@ -0,0 +1,195 @@
+# utils/hierarchy.py - AGRÉGATION HIÉRARCHIQUE ET DISPOSITION DES TREEMAPS
+#
+# Les feuilles sont agrégées par un seul groupby multi-clés, puis chaque niveau
+# supérieur est agrégé à partir de cette table (quelques milliers de lignes au plus),
+# et non plus à partir des lignes brutes. La table des nœuds (id, parent, valeur...)
+# est mise en cache ; treemap, sunburst et disposition matplotlib sont construits
+# à partir d'elle. Le mode top-N regroupe les petits enfants de chaque nœud en « Autres ».
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+OTHER_LABEL = "Autres"
+
+# Séparateur des identifiants de nœuds (comme plotly.express)
+SEPARATOR = "/"
+
+# Tables de nœuds déjà calculées : (empreinte des données, hiérarchie, valeur, couleur) -> nœuds
+CACHE_SIZE = 32
+_NODES = OrderedDict()
+
+
+def _fingerprint(df):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    return digest.hexdigest()
+
+
+def _join_ids(frame, path):
+    ids = frame[path[0]].astype(str)
+    for col in path[1:]:
+        ids = ids + SEPARATOR + frame[col].astype(str)
+    return ids
+
+
+def aggregate_nodes(df, path, value=None, color=None):
+    """
+    Table des nœuds de tous les niveaux : colonnes de la hiérarchie (vides sous le niveau du nœud),
+    id, parent, label, level, value (somme, ou nombre de lignes sans `value`), count
+    et color (moyenne de `color` pondérée par la valeur).
+    """
+    path = list(path)
+    data = pd.DataFrame({col: df[col] for col in path})
+    data["value"] = pd.to_numeric(df[value], errors="coerce") if value else 1.0
+    data["count"] = 1
+    if color:
+        data["weighted"] = pd.to_numeric(df[color], errors="coerce") * data["value"]
+    sums = ["value", "count"] + (["weighted"] if color else [])
+
+    # Feuilles : un seul groupby sur les lignes brutes, puis agrégation niveau par niveau
+    leaves = data.groupby(path, sort=False, observed=True, dropna=True)[sums].sum().reset_index()
+    levels = []
+    for depth in range(len(path), 0, -1):
+        level = leaves if depth == len(path) else leaves.groupby(path[:depth], sort=False, observed=True)[sums].sum().reset_index()
+        level["level"] = depth - 1
+        level["label"] = level[path[depth - 1]].astype(str)
+        level["id"] = _join_ids(level, path[:depth])
+        level["parent"] = _join_ids(level, path[:depth - 1]) if depth > 1 else ""
+        levels.append(level)
+
+    nodes = pd.concat(levels[::-1], ignore_index=True)
+    if color:
+        nodes["color"] = nodes["weighted"] / nodes["value"].where(nodes["value"] != 0)
+        nodes = nodes.drop(columns="weighted")
+    return nodes
+
+
+def node_table(df, path, value=None, color=None):
+    """Table des nœuds, mise en cache par (données, hiérarchie, valeur, couleur)"""
+    columns = list(dict.fromkeys(list(path) + [col for col in (value, color) if col]))
+    key = (_fingerprint(df[columns]), tuple(path), value, color)
+    if key in _NODES:
+        _NODES.move_to_end(key)
+        return _NODES[key]
+    nodes = aggregate_nodes(df, path, value, color)
+    _NODES[key] = nodes
+    while len(_NODES) > CACHE_SIZE:
+        _NODES.popitem(last=False)
+    return nodes
+
+
+def prune(nodes, top):
+    """
+    Garde les `top` plus grands enfants de chaque nœud (et les `top` plus grandes racines) ;
+    les autres sont regroupés en un nœud « Autres » par parent, sans descendants.
+    """
+    if not top:
+        return nodes
+    has_color = "color" in nodes
+    kept_parents = {""}
+    result = []
+    for level, rows in nodes.groupby("level", sort=True):
+        rows = rows[rows["parent"].isin(kept_parents)]
+        rank = rows.groupby("parent", sort=False)["value"].rank(method="first", ascending=False)
+        kept, merged = rows[rank <= top], rows[rank > top]
+        result.append(kept)
+        kept_parents = set(kept["id"])
+        if merged.empty:
+            continue
+
+        merged = merged.assign(weighted=merged["color"] * merged["value"] if has_color else 0.0)
+        other = merged.groupby("parent", sort=False)[["value", "count", "weighted"]].sum().reset_index()
+        other["id"] = np.where(other["parent"] == "", OTHER_LABEL, other["parent"] + SEPARATOR + OTHER_LABEL)
+        other["label"] = OTHER_LABEL
+        other["level"] = level
+        if has_color:
+            other["color"] = other["weighted"] / other["value"].where(other["value"] != 0)
+        result.append(other.drop(columns="weighted"))
+    return pd.concat(result, ignore_index=True)
+
+
+def leaf_mask(nodes):
+    """Nœuds sans enfant"""
+    return ~nodes["id"].isin(set(nodes["parent"]))
+
+
+def squarify(sizes, x, y, width, height):
+    """
+    Disposition « squarified » (Bruls et al.) de valeurs positives triées par ordre décroissant
+    dans le rectangle (x, y, width, height) : les rangées sont allongées tant que le pire
+    rapport d'aspect s'améliore. Retourne un tableau n x 4 (x, y, largeur, hauteur).
+    """
+    sizes = np.asarray(sizes, dtype="float64")
+    rects = np.zeros((sizes.size, 4))
+    total = sizes.sum()
+    if sizes.size == 0 or total <= 0:
+        return rects
+    sizes = sizes * (width * height / total)
+
+    i = 0
+    while i < sizes.size:
+        short = min(width, height)
+        end, row_sum = i + 1, sizes[i]
+        worst = max(short ** 2 / row_sum, row_sum / short ** 2)
+        while end < sizes.size:
+            new_sum = row_sum + sizes[end]
+            new_worst = max(short ** 2 * sizes[i] / new_sum ** 2, new_sum ** 2 / (short ** 2 * sizes[end]))
+            if new_worst > worst:
+                break
+            end, row_sum, worst = end + 1, new_sum, new_worst
+
+        # Rangée posée le long du petit côté
+        thickness = row_sum / short if short > 0 else 0.0
+        lengths = sizes[i:end] / thickness if thickness > 0 else np.zeros(end - i)
+        offsets = np.concatenate(([0.0], np.cumsum(lengths)[:-1]))
+        if width >= height:
+            rects[i:end] = np.column_stack([np.full(end - i, x), y + offsets, np.full(end - i, thickness), lengths])
+            x, width = x + thickness, width - thickness
+        else:
+            rects[i:end] = np.column_stack([x + offsets, np.full(end - i, y), lengths, np.full(end - i, thickness)])
+            y, height = y + thickness, height - thickness
+        i = end
+    return rects
+
+
+def layout(nodes, width=100.0, height=100.0):
+    """
+    Rectangles imbriqués de chaque nœud (enfants disposés dans le rectangle de leur parent).
+    Retourne les nœuds de valeur positive avec les colonnes x, y, dx, dy et root (id de la racine).
+    """
+    nodes = nodes[nodes["value"] > 0].sort_values(["level", "value"], ascending=[True, False])
+    ids, parents, values = nodes["id"].to_numpy(), nodes["parent"].to_numpy(), nodes["value"].to_numpy()
+    levels = nodes["level"].to_numpy()
+    rects = np.zeros((len(nodes), 4))
+    roots = np.empty(len(nodes), dtype=object)
+
+    boxes, root_of = {"": (0.0, 0.0, width, height)}, {}
+    for level in np.unique(levels):
+        positions = np.flatnonzero(levels == level)
+        placed = {}
+        for parent, idx in pd.Series(positions).groupby(parents[positions], sort=False):
+            if parent not in boxes:
+                continue
+            idx = idx.to_numpy()
+            rects[idx] = squarify(values[idx], *boxes[parent])
+            roots[idx] = ids[idx] if parent == "" else root_of[parent]
+            placed.update(zip(ids[idx], map(tuple, rects[idx])))
+        root_of.update(zip(ids[positions], roots[positions]))
+        boxes = placed
+    return nodes.assign(x=rects[:, 0], y=rects[:, 1], dx=rects[:, 2], dy=rects[:, 3], root=roots)
+
+
+def hierarchy_figure(nodes, kind="treemap", title=None, colorscale="Viridis"):
+    """Treemap ou sunburst Plotly construit depuis la table des nœuds (valeurs des parents déjà agrégées)"""
+    trace = dict(ids=nodes["id"], labels=nodes["label"], parents=nodes["parent"], values=nodes["value"],
+                 branchvalues="total")
+    if "color" in nodes:
+        trace["marker"] = dict(colors=nodes["color"], colorscale=colorscale, showscale=True)
+    fig = go.Figure(go.Treemap(**trace) if kind == "treemap" else go.Sunburst(**trace))
+    fig.update_layout(title=title, margin=dict(t=50, l=25, r=25, b=25))
+    return fig
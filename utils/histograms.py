@@ -0,0 +1,136 @@
+# utils/histograms.py - HISTOGRAMMES CALCULÉS CÔTÉ SERVEUR
+#
+# Les valeurs sont réparties en classes régulières avec np.bincount ;
+# seuls les effectifs (une valeur par classe) sont envoyés au graphique.
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from utils import column_stats, dataset_store, grouping
+
+DEFAULT_BINS = 30
+
+
+def float_values(series):
+    """Valeurs en float64 (NaN pour les manquantes ou non numériques)"""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors="coerce")
+    return series.to_numpy(dtype="float64", na_value=np.nan)
+
+
+def bin_edges(values, bins=DEFAULT_BINS):
+    """Bornes de classes régulières entre le minimum et le maximum des valeurs finies"""
+    values = np.asarray(values, dtype="float64")
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return np.linspace(0.0, 1.0, bins + 1)
+    return np.histogram_bin_edges(np.array([values.min(), values.max()]), bins=bins)
+
+
+def bin_indices(values, edges):
+    """
+    Classe de chaque valeur pour des bornes régulières (même convention que np.histogram :
+    la dernière classe inclut sa borne droite). Retourne (indices, masque des valeurs classées).
+    """
+    n = len(edges) - 1
+    valid = (values >= edges[0]) & (values <= edges[-1])
+    inside = values[valid]
+    idx = ((inside - edges[0]) * (n / (edges[-1] - edges[0]))).astype(np.intp)
+    idx[idx == n] -= 1
+    # Corrige les arrondis au voisinage des bornes
+    idx[inside < edges[idx]] -= 1
+    idx[(inside >= edges[idx + 1]) & (idx != n - 1)] += 1
+    return idx, valid
+
+
+def histogram_counts(values, edges, weights=None):
+    """Effectifs (ou sommes de poids) par classe"""
+    values = np.asarray(values, dtype="float64")
+    if weights is not None:
+        weights = np.asarray(weights, dtype="float64")
+        values = np.where(np.isfinite(weights), values, np.nan)
+    idx, valid = bin_indices(values, edges)
+    return np.bincount(idx, weights=None if weights is None else weights[valid], minlength=len(edges) - 1)
+
+
+def grouped_histogram_counts(values, groups, edges, weights=None):
+    """
+    Effectifs par catégorie et par classe en un seul bincount.
+    Retourne (catégories, tableau catégories x classes).
+    """
+    values = np.asarray(values, dtype="float64")
+    codes, categories = grouping.factorize(groups, sort=True)
+    values = np.where(codes >= 0, values, np.nan)
+    if weights is not None:
+        weights = np.asarray(weights, dtype="float64")
+        values = np.where(np.isfinite(weights), values, np.nan)
+
+    n = len(edges) - 1
+    idx, valid = bin_indices(values, edges)
+    flat = codes[valid] * n + idx
+    counts = np.bincount(flat, weights=None if weights is None else weights[valid],
+                         minlength=len(categories) * n)
+    return categories, counts.reshape(len(categories), n)
+
+
+def histogram(series, bins=DEFAULT_BINS, weights=None):
+    """Histogramme d'une colonne en mémoire : (effectifs, bornes)"""
+    values = float_values(series)
+    edges = bin_edges(values, bins)
+    return histogram_counts(values, edges, weights), edges
+
+
+@lru_cache(maxsize=256)
+def column_edges(digest, column, bins=DEFAULT_BINS):
+    """
+    Bornes d'une colonne d'un dataset du cache, calculées depuis son résumé enregistré
+    (min / max) : aucune relecture des données, et mises en cache par colonne.
+    """
+    summary = column_stats.dataset_summary(digest)["columns"].get(column)
+    if summary is None or summary.kind != "numeric" or summary.count == 0:
+        raise ValueError(f"La colonne '{column}' n'est pas numérique")
+    edges = np.histogram_bin_edges(np.array([summary.min, summary.max]), bins=bins)
+    edges.flags.writeable = False
+    return edges
+
+
+def dataset_histogram(digest, column, bins=DEFAULT_BINS, by=None, weights=None):
+    """
+    Histogramme d'un dataset du cache, tranche par tranche (mémoire bornée).
+    Retourne (effectifs, bornes) ; avec `by`, les effectifs sont un dict catégorie -> tableau.
+    """
+    edges = column_edges(digest, column, bins)
+    columns = [col for col in (column, by, weights) if col]
+    totals = np.zeros(bins) if by is None else {}
+
+    for batch in dataset_store.iter_dataset_batches(digest, columns=list(dict.fromkeys(columns))):
+        values = float_values(batch[column])
+        w = float_values(batch[weights]) if weights else None
+        if by is None:
+            totals += histogram_counts(values, edges, w)
+            continue
+        categories, counts = grouped_histogram_counts(values, batch[by].to_numpy(), edges, w)
+        for category, row in zip(categories, counts):
+            totals[category] = totals[category] + row if category in totals else row
+
+    if by is not None:
+        totals = dict(sorted(totals.items(), key=lambda item: str(item[0])))
+    return totals, edges
+
+
+def histogram_figure(counts, edges, title=None, xaxis_title=None, yaxis_title="Effectif"):
+    """Histogramme Plotly sous forme de barres (une trace par catégorie si `counts` est un dict)"""
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    series = counts if isinstance(counts, dict) else {None: counts}
+
+    fig = go.Figure()
+    for name, values in series.items():
+        fig.add_trace(go.Bar(x=centers, y=values, width=widths, name=None if name is None else str(name),
+                             opacity=0.75 if len(series) > 1 else None))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title,
+                      bargap=0, barmode="overlay", showlegend=len(series) > 1)
+    return fig
@@ -0,0 +1,134 @@
+# utils/ingestion.py - LECTURE EN FLUX DES FICHIERS CSV
+
+import codecs
+import csv
+import os
+
+import pandas as pd
+
+# Taille de l'échantillon lu une seule fois pour détecter encodage et séparateur
+SNIFF_BYTES = 64 * 1024
+
+# Budget mémoire visé pour un bloc de lignes déjà parsé
+CHUNK_BUDGET_BYTES = 64 * 1024 * 1024
+
+# Un DataFrame occupe environ 3 fois la taille du texte CSV correspondant
+EXPANSION_FACTOR = 3
+
+MIN_CHUNK_ROWS = 1_000
+DELIMITERS = ",;\t|"
+
+
+def _rewind(source):
+    """Replace un fichier (ou buffer Streamlit) au début s'il le permet"""
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+
+def _read_head(source, size=SNIFF_BYTES):
+    """Lit les premiers octets d'un chemin ou d'un buffer sans le consommer"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read(size)
+
+    _rewind(source)
+    head = source.read(size)
+    _rewind(source)
+
+    if isinstance(head, str):
+        head = head.encode("utf-8")
+    return head
+
+
+def detect_encoding(head):
+    """UTF-8 (avec ou sans BOM) si possible, sinon latin1 qui accepte tous les octets"""
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    try:
+        head.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Un caractère multi-octets peut être coupé en fin d'échantillon
+        if e.reason != "unexpected end of data":
+            return "latin1"
+    return "utf-8"
+
+
+def detect_delimiter(text):
+    """Détecte le séparateur parmi , ; tabulation et | (virgule par défaut)"""
+    # La dernière ligne de l'échantillon est souvent tronquée
+    lines = text.splitlines()[:-1] or text.splitlines()
+    sample = "\n".join(lines[:50])
+
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=DELIMITERS).delimiter
+    except csv.Error:
+        return ","
+
+
+def estimate_chunk_rows(head, budget_bytes=CHUNK_BUDGET_BYTES):
+    """Nombre de lignes par bloc pour rester sous le budget mémoire"""
+    lines = max(head.count(b"\n"), 1)
+    avg_line_bytes = max(len(head) / lines, 1)
+    return max(MIN_CHUNK_ROWS, int(budget_bytes / (avg_line_bytes * EXPANSION_FACTOR)))
+
+
+def sniff_csv(source, budget_bytes=CHUNK_BUDGET_BYTES):
+    """
+    Analyse une seule fois le début du fichier.
+    Retourne les paramètres de lecture : encoding, sep et chunksize.
+    """
+    head = _read_head(source)
+    encoding = detect_encoding(head)
+    text = head.decode(encoding, errors="ignore")
+
+    return {
+        "encoding": encoding,
+        "sep": detect_delimiter(text),
+        "chunksize": estimate_chunk_rows(head, budget_bytes),
+    }
+
+
+def iter_csv_chunks(source, params=None, usecols=None, budget_bytes=CHUNK_BUDGET_BYTES):
+    """
+    Itère sur le CSV par blocs de taille bornée.
+    La mémoire occupée ne dépend que du budget, pas de la taille du fichier.
+    """
+    if params is None:
+        params = sniff_csv(source, budget_bytes)
+
+    _rewind(source)
+    reader = pd.read_csv(
+        source,
+        sep=params["sep"],
+        encoding=params["encoding"],
+        encoding_errors="replace",
+        chunksize=params["chunksize"],
+        usecols=usecols,
+    )
+    with reader:
+        yield from reader
+
+
+def read_csv_chunked(source, params=None, usecols=None, max_rows=None,
+                     budget_bytes=CHUNK_BUDGET_BYTES):
+    """
+    Charge un CSV en un DataFrame, bloc par bloc.
+    `max_rows` arrête la lecture dès que le nombre de lignes est atteint.
+    """
+    chunks = []
+    total = 0
+
+    for chunk in iter_csv_chunks(source, params, usecols, budget_bytes):
+        if max_rows is not None and total + len(chunk) > max_rows:
+            chunk = chunk.iloc[:max_rows - total]
+        chunks.append(chunk)
+        total += len(chunk)
+        if max_rows is not None and total >= max_rows:
+            break
+
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
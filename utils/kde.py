@@ -0,0 +1,202 @@
+# utils/kde.py - ESTIMATION DE DENSITÉ (KDE) BINNÉE PAR FFT
+#
+# Au lieu d'évaluer un noyau gaussien pour chaque couple (point, position de la grille),
+# les valeurs sont réparties sur une grille régulière (binning linéaire) puis lissées
+# par convolution, calculée par FFT pour toutes les catégories à la fois.
+# Coût : O(n + catégories x grille x log(grille)) au lieu de O(n x grille).
+
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils import boxstats, grouping
+
+GRID_SIZE = 512
+
+# Le violon s'étend jusqu'à `cut` largeurs de bande au-delà des valeurs extrêmes (comme seaborn)
+DEFAULT_CUT = 2.0
+
+# Courbes déjà calculées : (empreinte des données, colonne, catégorie, bande passante) -> (y, densité)
+CACHE_SIZE = 512
+_CURVES = OrderedDict()
+
+
+def bandwidths(values, codes, counts, method="scott"):
+    """
+    Largeur de bande gaussienne de chaque catégorie (règle de Scott ou de Silverman,
+    ou facteur numérique), écarts-types calculés par bincount.
+    """
+    n_categories = counts.size
+    sums = np.bincount(codes, weights=values, minlength=n_categories)
+    means = sums / np.maximum(counts, 1)
+    squares = np.bincount(codes, weights=(values - means[codes]) ** 2, minlength=n_categories)
+    std = np.sqrt(squares / np.maximum(counts - 1, 1))
+
+    n = np.maximum(counts, 1).astype("float64")
+    if isinstance(method, (int, float)):
+        factor = np.full(n_categories, float(method))
+    elif method == "silverman":
+        factor = (n * 3 / 4) ** (-1 / 5)
+    else:
+        factor = n ** (-1 / 5)
+    return np.where(std > 0, std * factor, 1.0)
+
+
+def linear_binning(values, codes, lows, steps, size):
+    """
+    Poids de chaque catégorie sur sa grille (size points depuis lows[c], pas steps[c]) :
+    chaque valeur est partagée entre les deux points qui l'encadrent, au prorata de la distance.
+    Un seul bincount pour toutes les catégories. Retourne un tableau catégories x grille.
+    """
+    n_categories = lows.size
+    position = (values - lows[codes]) / steps[codes]
+    left = np.clip(np.floor(position).astype(np.intp), 0, size - 2)
+    frac = np.clip(position - left, 0.0, 1.0)
+    base = codes * size + left
+    counts = np.bincount(base, weights=1.0 - frac, minlength=n_categories * size)
+    counts += np.bincount(base + 1, weights=frac, minlength=n_categories * size)
+    return counts.reshape(n_categories, size)
+
+
+def fft_smooth(binned, steps, widths):
+    """
+    Convolution de chaque ligne par une gaussienne de largeur propre à la ligne
+    (en pas de grille : widths / steps), via la transformée analytique du noyau.
+    Le zéro-padding évite le repliement circulaire.
+    """
+    size = binned.shape[1]
+    spectrum = np.fft.rfft(binned, n=2 * size, axis=1)
+    frequencies = np.fft.rfftfreq(2 * size)
+    sigma = (np.asarray(widths) / np.asarray(steps))[:, None]
+    kernel = np.exp(-0.5 * (2 * np.pi * frequencies[None, :] * sigma) ** 2)
+    smoothed = np.fft.irfft(spectrum * kernel, n=2 * size, axis=1)[:, :size]
+    return np.maximum(smoothed, 0.0)
+
+
+def _densities(values, codes, categories, bw, grid_size, cut):
+    valid = (codes >= 0) & np.isfinite(values)
+    values, codes = values[valid], codes[valid]
+    if values.size == 0:
+        return {}
+
+    n_categories = len(categories)
+    counts = np.bincount(codes, minlength=n_categories)
+    mins = np.zeros(n_categories)
+    maxs = np.zeros(n_categories)
+    present = counts > 0
+    order = np.argsort(codes, kind="stable")
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    mins[present] = np.minimum.reduceat(values[order], starts[present])
+    maxs[present] = np.maximum.reduceat(values[order], starts[present])
+    widths = bandwidths(values, codes, counts, bw)
+
+    # Une grille par catégorie, de même taille : [min - cut x bande, max + cut x bande]
+    lows = mins - cut * widths
+    steps = (maxs + cut * widths - lows) / (grid_size - 1)
+
+    binned = linear_binning(values, codes, lows, steps, grid_size)
+    densities = fft_smooth(binned, steps, widths) / (np.maximum(counts, 1) * steps)[:, None]
+    positions = lows[:, None] + steps[:, None] * np.arange(grid_size)[None, :]
+    return {category: (positions[i], densities[i]) for i, category in enumerate(categories) if present[i]}
+
+
+def category_densities(values, groups, bw="scott", grid_size=GRID_SIZE, cut=DEFAULT_CUT):
+    """
+    Densités de toutes les catégories en une passe vectorisée : {catégorie: (y, densité)}.
+    Chaque courbe couvre [min - cut x bande, max + cut x bande] de sa catégorie.
+    """
+    codes, categories = grouping.factorize(groups)
+    return _densities(np.asarray(values, dtype="float64"), codes, categories, bw, grid_size, cut)
+
+
+def _fingerprint(values, codes, categories):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(values).tobytes())
+    digest.update(codes.astype(np.int64).tobytes())
+    digest.update(repr(list(categories)).encode())
+    return digest.hexdigest()
+
+
+def violin_curves(values, groups, column=None, bw="scott", grid_size=GRID_SIZE, cut=DEFAULT_CUT):
+    """
+    Courbes de densité par catégorie, mises en cache par (données, colonne, catégorie, bande passante) :
+    un nouveau rendu du même graphique ne recalcule rien.
+    Retourne {catégorie: (y, densité)} dans l'ordre d'apparition des catégories
+    (courbe vide pour une catégorie sans valeur).
+    """
+    values = np.asarray(values, dtype="float64")
+    codes, categories = grouping.factorize(groups)
+    key = (_fingerprint(values, codes, categories), column, str(bw), grid_size, cut)
+    if all(key + (category,) in _CURVES for category in categories):
+        for category in categories:
+            _CURVES.move_to_end(key + (category,))
+        return {category: _CURVES[key + (category,)] for category in categories}
+
+    curves = _densities(values, codes, categories, bw, grid_size, cut)
+    empty = (np.zeros(0), np.zeros(0))
+    for category in categories:
+        _CURVES[key + (category,)] = curves.setdefault(category, empty)
+    while len(_CURVES) > CACHE_SIZE:
+        _CURVES.popitem(last=False)
+    return {category: curves[category] for category in categories}
+
+
+def inner_box(values, groups):
+    """Boîte intérieure de chaque catégorie : {catégorie: (moustache basse, q1, médiane, q3, moustache haute)}"""
+    stats, _ = boxstats.box_summary(values, groups, max_outliers=0)
+    return {category: (row["lower"], row["q1"], row["median"], row["q3"], row["upper"])
+            for category, row in stats.iterrows()}
+
+
+def _half_widths(curves, width):
+    """Demi-largeurs des violons : même échelle pour tous (aires égales, comme seaborn)"""
+    peak = max((density.max() for _, density in curves.values() if density.size), default=1.0) or 1.0
+    return {category: density / peak * (width / 2) for category, (_, density) in curves.items()}
+
+
+def draw_violins(ax, curves, boxes=None, colors=None, width=0.8, positions=None, alpha=None):
+    """Violons matplotlib tracés à partir des courbes précalculées (position i pour la i-ème catégorie)"""
+    halves = _half_widths(curves, width)
+    for i, (category, (y, _)) in enumerate(curves.items()):
+        if not y.size:
+            continue
+        position = positions[i] if positions is not None else i
+        color = colors[i % len(colors)] if colors is not None else f"C{i % 10}"
+        ax.fill_betweenx(y, position - halves[category], position + halves[category],
+                         facecolor=color, edgecolor="0.25", linewidth=1, alpha=alpha)
+        if boxes and category in boxes:
+            low, q1, median, q3, high = boxes[category]
+            ax.vlines(position, low, high, color="0.25", linewidth=1.5)
+            ax.vlines(position, q1, q3, color="0.25", linewidth=6)
+            ax.scatter([position], [median], color="white", s=20, zorder=3)
+
+
+def violin_traces(curves, boxes=None, colors=None, width=0.8, name_prefix="", legendgroup=None, showlegend=True):
+    """
+    Traces Plotly des violons précalculés : un contour rempli par catégorie (quelques centaines
+    de points, quel que soit l'effectif) et, si fournie, la boîte intérieure (quartiles précalculés).
+    """
+    halves = _half_widths(curves, width)
+    traces = []
+    for i, (category, (y, _)) in enumerate(curves.items()):
+        if not y.size:
+            continue
+        color = colors[i % len(colors)] if colors is not None else None
+        half = halves[category]
+        traces.append(go.Scatter(
+            x=np.r_[i - half, (i + half)[::-1]], y=np.r_[y, y[::-1]],
+            fill="toself", mode="lines", line=dict(width=1, color=color),
+            name=f"{name_prefix}{category}", legendgroup=legendgroup, showlegend=showlegend,
+            hoverinfo="name",
+        ))
+        if boxes and category in boxes:
+            low, q1, median, q3, high = boxes[category]
+            traces.append(go.Box(
+                x=[i], q1=[q1], median=[median], q3=[q3], lowerfence=[low], upperfence=[high],
+                width=width / 8, fillcolor="rgba(60,60,60,0.8)", line=dict(color="rgb(60,60,60)"),
+                name=f"{name_prefix}{category}", legendgroup=legendgroup, showlegend=False,
+            ))
+    return traces
@@ -0,0 +1,56 @@
+# utils/parallel.py - EXÉCUTION PARALLÈLE ET MÉMOIRE PARTAGÉE
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def default_workers():
+    """Nombre de processus par défaut (tous les cœurs disponibles)"""
+    return os.cpu_count() or 1
+
+
+class SharedArray:
+    """
+    Tableau NumPy placé en mémoire partagée.
+    Le processus principal le crée ; les workers s'y attachent via `spec` sans copie.
+    """
+
+    def __init__(self, shape, dtype):
+        dtype = np.dtype(dtype)
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+        self.spec = (self.shm.name, tuple(shape), dtype.str)
+
+    @classmethod
+    def from_array(cls, values):
+        shared = cls(values.shape, values.dtype)
+        shared.array[...] = values
+        return shared
+
+    def release(self):
+        """Libère le segment (à appeler une fois les résultats recopiés)"""
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach(spec):
+    """Côté worker : vue NumPy sur un segment partagé existant"""
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    # La référence au segment doit vivre aussi longtemps que la vue
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf), shm
+
+
+def run_tasks(func, tasks, workers):
+    """Exécute func(*task) pour chaque tâche, en parallèle si workers > 1"""
+    if workers <= 1 or len(tasks) <= 1:
+        return [func(*task) for task in tasks]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        futures = [pool.submit(func, *task) for task in tasks]
+        return [future.result() for future in futures]
@@ -0,0 +1,214 @@
+# utils/sketches.py - ESTIMATIONS APPROXIMATIVES SUR ÉCHANTILLON
+
+import numpy as np
+import pandas as pd
+
+
+def sample_positions(n_rows, size, seed=0):
+    """Positions triées d'un échantillon aléatoire sans remise (reproductible)"""
+    if n_rows <= size:
+        return np.arange(n_rows)
+    rng = np.random.default_rng(seed)
+    return np.sort(rng.choice(n_rows, size, replace=False))
+
+
+def estimate_distinct(sample, n_total):
+    """
+    Estime le nombre de valeurs distinctes parmi `n_total` valeurs
+    à partir d'un échantillon aléatoire (estimateur Chao1 corrigé du biais) :
+    D ≈ d + f1 * (f1 - 1) / (2 * (f2 + 1)),
+    où d est le nombre de valeurs distinctes de l'échantillon
+    et fj le nombre de valeurs vues exactement j fois.
+    """
+    counts = sample.value_counts(dropna=True).to_numpy()
+    r = int(counts.sum())
+    if r == 0:
+        return 0
+    if r >= n_total:
+        return len(counts)
+
+    f1 = np.count_nonzero(counts == 1)
+    f2 = np.count_nonzero(counts == 2)
+    estimate = len(counts) + f1 * (f1 - 1) / (2 * (f2 + 1))
+    return int(min(round(estimate), n_total))
+
+
+class TDigest:
+    """
+    Résumé de quantiles fusionnable (t-digest), pour données lues par blocs.
+    Chaque mise à jour est vectorisée : les centroïdes sont regroupés par tranche
+    de la fonction d'échelle k1, plus fine aux extrémités de la distribution.
+    """
+
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values, weights=None):
+        """Ajoute un bloc de valeurs (NaN ignorés)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if weights is None:
+            weights = np.ones_like(values)
+        finite = np.isfinite(values)
+        values, weights = values[finite], np.asarray(weights, dtype=np.float64).ravel()[finite]
+        if values.size == 0:
+            return self
+
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, weights]))
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre résumé (par exemple celui d'un autre bloc ou worker)"""
+        if other.weights.size:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means, weights = means[order], weights[order]
+
+        total = weights.sum()
+        # Quantile au centre de chaque centroïde, puis tranche de la fonction d'échelle k1
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        buckets = np.floor(k).astype(np.int64)
+
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Quantile(s) approximatif(s), q dans [0, 1]"""
+        if self.weights.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+
+        total = self.weights.sum()
+        centers = (np.cumsum(self.weights) - self.weights / 2) / total
+        xp = np.r_[0.0, centers, 1.0]
+        fp = np.r_[self.min, self.means, self.max]
+        return np.interp(q, xp, fp)
+
+
+def hash_values(values):
+    """Empreintes 64 bits stables d'un tableau de valeurs quelconques"""
+    values = np.asarray(values)
+    if values.dtype.kind not in 'biufcmM':
+        values = values.astype(object)
+    return pd.util.hash_array(values)
+
+
+class DistinctCounter:
+    """
+    Nombre de valeurs distinctes, fusionnable.
+    Exact tant que le nombre d'empreintes reste sous `exact_limit`,
+    puis HyperLogLog (2**p registres, mise à jour vectorisée).
+    """
+
+    def __init__(self, p=14, exact_limit=4096):
+        self.p = p
+        self.exact_limit = exact_limit
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.registers = None
+
+    def update(self, values):
+        """Ajoute des valeurs (sans NaN) ; seules les valeurs uniques du bloc sont hachées"""
+        self._add_hashes(hash_values(pd.unique(pd.Series(values))))
+        return self
+
+    def merge(self, other):
+        if other.registers is not None:
+            self._to_registers()
+            self.registers = np.maximum(self.registers, other.registers)
+        else:
+            self._add_hashes(other.hashes)
+        return self
+
+    def _add_hashes(self, hashes):
+        if self.registers is None:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if self.hashes.size > self.exact_limit:
+                self._to_registers()
+        else:
+            self._update_registers(hashes)
+
+    def _to_registers(self):
+        if self.registers is None:
+            self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+            self._update_registers(self.hashes)
+            self.hashes = np.empty(0, dtype=np.uint64)
+
+    def _update_registers(self, hashes):
+        if hashes.size == 0:
+            return
+        bits = 64 - self.p
+        index = (hashes >> np.uint64(bits)).astype(np.int64)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # Rang du premier bit à 1 dans les bits restants
+        length = np.zeros(rest.size, dtype=np.int64)
+        nonzero = rest > 0
+        length[nonzero] = np.floor(np.log2(rest[nonzero].astype(np.float64))).astype(np.int64) + 1
+        rank = (bits - length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def estimate(self):
+        if self.registers is None:
+            return int(self.hashes.size)
+        m = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if estimate <= 2.5 * m and zeros:
+            # Petites cardinalités : comptage linéaire
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+
+class TopK:
+    """
+    Valeurs les plus fréquentes, fusionnable (compteurs tronqués à `capacity`).
+    Exact tant qu'il y a moins de `capacity` valeurs distinctes ; sinon chaque
+    effectif est sous-estimé d'au plus `error`.
+    """
+
+    def __init__(self, capacity=256):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype='int64')
+        self.error = 0
+
+    def update(self, values):
+        self._add_counts(pd.Series(values).value_counts(sort=False))
+        return self
+
+    def merge(self, other):
+        self._add_counts(other.counts)
+        self.error += other.error
+        return self
+
+    def _add_counts(self, counts):
+        if counts.empty:
+            return
+        counts = self.counts.add(counts, fill_value=0) if not self.counts.empty else counts
+        counts = counts.astype('int64').sort_values(ascending=False, kind='mergesort')
+        if len(counts) > self.capacity:
+            self.error += int(counts.iloc[self.capacity])
+            counts = counts.iloc[:self.capacity]
+        self.counts = counts
+
+    def most_common(self):
+        """(valeur, effectif) de la valeur la plus fréquente, ou (None, 0)"""
+        if self.counts.empty:
+            return None, 0
+        return self.counts.index[0], int(self.counts.iloc[0])
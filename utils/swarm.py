@@ -0,0 +1,78 @@
+# utils/swarm.py - DISPOSITION EN ESSAIM (BEESWARM) SANS CHEVAUCHEMENT
+#
+# Les points d'une catégorie sont placés par ordre de valeur (balayage) : chaque point
+# prend le décalage horizontal le plus proche du centre qui ne touche aucun point déjà
+# placé. Seuls les points distants de moins d'un diamètre en y sont comparés
+# (fenêtre glissante sur les valeurs triées), d'où un coût proche de O(n log n).
+# Au-delà d'un budget de points, l'essaim est remplacé par une bande de densité.
+
+import numpy as np
+
+# Nombre de points par catégorie au-delà duquel on passe en bande de densité
+SWARM_BUDGET = 2000
+
+# Largeur maximale d'une catégorie (en unités de l'axe des catégories)
+CATEGORY_WIDTH = 0.8
+
+
+def swarm_offsets(y, diameter_y, diameter_x, limit=None):
+    """
+    Décalages horizontaux (unités de l'axe x) tels que deux marqueurs de diamètre
+    (diameter_x, diameter_y) ne se chevauchent pas. `y` n'a pas besoin d'être trié.
+    Retourne None dès qu'un point dépasse `limit` (l'essaim ne tient pas dans sa catégorie).
+    """
+    y = np.asarray(y, dtype="float64")
+    n = y.size
+    order = np.argsort(y, kind="stable")
+    # En unités de diamètre, deux points se touchent quand leur distance est < 1
+    ys = y[order] / diameter_y
+    xs = np.zeros(n)
+    limit = np.inf if limit is None else limit / diameter_x
+
+    start = 0
+    for i in range(1, n):
+        while ys[i] - ys[start] >= 1.0:
+            start += 1
+        if start == i:
+            continue
+        neighbours = xs[start:i]
+        dy = ys[i] - ys[start:i]
+        reach = np.sqrt(1.0 - dy * dy)
+        # Candidats : le centre, ou juste à côté d'un voisin (à gauche ou à droite)
+        candidates = np.concatenate(([0.0], neighbours + reach, neighbours - reach))
+        candidates = candidates[np.argsort(np.abs(candidates), kind="stable")]
+        free = (np.abs(candidates[:, None] - neighbours[None, :]) >= reach[None, :] - 1e-9).all(axis=1)
+        xs[i] = candidates[np.argmax(free)]
+        if abs(xs[i]) > limit:
+            return None
+
+    offsets = np.empty(n)
+    offsets[order] = xs * diameter_x
+    return offsets
+
+
+def density_offsets(y, width=CATEGORY_WIDTH, bins=50, rng=None):
+    """
+    Bande de densité (sina) : décalage aléatoire dont l'amplitude suit la densité
+    locale des valeurs, en une passe vectorisée.
+    """
+    y = np.asarray(y, dtype="float64")
+    rng = np.random.default_rng() if rng is None else rng
+    if y.size == 0:
+        return np.zeros(0)
+    counts, edges = np.histogram(y, bins=bins)
+    idx = np.clip(np.searchsorted(edges, y, side="right") - 1, 0, bins - 1)
+    amplitude = counts[idx] / counts.max() * (width / 2)
+    return rng.uniform(-1.0, 1.0, y.size) * amplitude
+
+
+def category_offsets(y, diameter_y, diameter_x, width=CATEGORY_WIDTH, budget=SWARM_BUDGET, rng=None):
+    """
+    Décalages d'une catégorie : essaim exact jusqu'au budget, bande de densité au-delà
+    ou quand l'essaim déborderait de la largeur de la catégorie.
+    Retourne (décalages, essaim utilisé).
+    """
+    offsets = swarm_offsets(y, diameter_y, diameter_x, limit=width / 2) if len(y) <= budget else None
+    if offsets is None:
+        return density_offsets(y, width, rng=rng), False
+    return offsets, True